@@ -0,0 +1,140 @@
+# core/autocomplete.py
+
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Tuple
+
+from .models import TaskChange
+from .trigrams import normalize_text
+
+
+class PrefixIndex:
+    """Строки с поиском по префиксу: отсортированный массив ключей и bisect
+
+    Ключ — строка в нижнем регистре (ё -> е), так что "отч" находит "Отчёт".
+    Одинаковые строки считаются: строка пропадает из подсказок, когда
+    удалён последний её экземпляр. Показывается написание первого экземпляра.
+    """
+
+    def __init__(self, items: Iterable[str] = ()):
+        self._counts: Dict[str, int] = {}
+        self._display: Dict[str, str] = {}
+        for item in items:
+            self._count(item, 1)
+        self._keys: List[str] = sorted(self._counts)
+
+    @classmethod
+    def from_counts(cls, pairs: Iterable[Tuple[str, int]]) -> "PrefixIndex":
+        """Индекс по парам (строка, сколько раз она встречается)"""
+        index = cls()
+        for text, count in pairs:
+            index._count(text, count)
+        index._keys = sorted(index._counts)
+        return index
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, text: str) -> bool:
+        return self._key(text) in self._counts
+
+    @staticmethod
+    def _key(text: str) -> str:
+        return normalize_text(text.strip())
+
+    def _count(self, text: str, count: int) -> bool:
+        """Учесть строку; True, если её ключ новый"""
+        key = self._key(text)
+        if not key:
+            return False
+        if key in self._counts:
+            self._counts[key] += count
+            return False
+        self._counts[key] = count
+        self._display[key] = text.strip()
+        return True
+
+    def add(self, text: str, count: int = 1):
+        if self._count(text, count):
+            insort(self._keys, self._key(text))
+
+    def discard(self, text: str):
+        """Убрать один экземпляр строки"""
+        key = self._key(text)
+        left = self._counts.get(key)
+        if left is None:
+            return
+        if left > 1:
+            self._counts[key] = left - 1
+            return
+        del self._counts[key]
+        del self._display[key]
+        del self._keys[bisect_left(self._keys, key)]
+
+    def complete(self, prefix: str, limit: int = 10) -> List[str]:
+        """Строки, начинающиеся с prefix, по алфавиту (пустой префикс — все)"""
+        key = self._key(prefix)
+        keys = self._keys
+        result = []
+        for index in range(bisect_left(keys, key), len(keys)):
+            if len(result) >= limit or not keys[index].startswith(key):
+                break
+            result.append(self._display[keys[index]])
+        return result
+
+    def items(self) -> List[str]:
+        """Все строки по алфавиту"""
+        return [self._display[key] for key in self._keys]
+
+
+class TaskAutocomplete:
+    """Подсказки для полей заголовка и категории без запросов к БД
+
+    Индексы строятся один раз при запуске и дальше обновляются по подписке
+    на изменения TodoDatabase. Заголовки архивных задач остаются в
+    подсказках. Изменения других процессов приходят без состояния "до",
+    поэтому от них подсказки только добавляются.
+    """
+
+    def __init__(self, db):
+        self.db = db
+        self.titles = PrefixIndex()
+        self.categories = PrefixIndex()
+        self.load()
+        self.db.subscribe(self._on_task_change)
+
+    def close(self):
+        self.db.unsubscribe(self._on_task_change)
+
+    def load(self):
+        """Построить оба индекса заново"""
+        self.titles = PrefixIndex.from_counts(self.db.get_title_counts())
+        self.reload_categories()
+
+    def complete_title(self, prefix: str, limit: int = 10) -> List[str]:
+        return self.titles.complete(prefix, limit)
+
+    def complete_category(self, prefix: str, limit: int = 10) -> List[str]:
+        return self.categories.complete(prefix, limit)
+
+    def reload_categories(self):
+        """Перечитать категории (после правки списка категорий)"""
+        self.categories = PrefixIndex(self.db.get_categories())
+
+    def _on_task_change(self, change: TaskChange):
+        if change.action == "reload":
+            self.load()
+            return
+        if change.action in ("archive", "restore"):
+            return  # Архив учитывается в подсказках наравне с задачами: счёт не меняется
+        before, after = change.before, change.after
+        if before is not None and (after is None or after.title != before.title):
+            self.titles.discard(before.title)
+        if after is not None:
+            if change.external:
+                if after.title not in self.titles:
+                    self.titles.add(after.title)
+            elif before is None or after.title != before.title:
+                self.titles.add(after.title)
+            if after.category not in self.categories:
+                # add_task и update_task создают категорию сами
+                self.categories.add(after.category)
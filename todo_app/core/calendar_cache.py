@@ -0,0 +1,67 @@
+# core/calendar_cache.py
+
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .models import Task, TaskChange
+
+DaySummary = Tuple[int, Optional[int]]  # (число задач, лучший ранг приоритета)
+
+
+def _due_day(task: Optional[Task]) -> Optional[str]:
+    """День срока задачи ГГГГ-ММ-ДД или None"""
+    if task is None or not task.due_date:
+        return None
+    return task.due_date[:10]
+
+
+class MonthSummaryCache:
+    """Кэш дневных сводок по месяцам с точечной инвалидацией изменённых дней"""
+
+    def __init__(self, db):
+        self.db = db
+        self._months: Dict[Tuple[int, int], Dict[str, DaySummary]] = {}
+        self._listeners: List[Callable[[Optional[Set[str]]], None]] = []
+        self.db.subscribe(self._on_task_change)
+
+    def close(self):
+        """Отписаться от изменений БД"""
+        self.db.unsubscribe(self._on_task_change)
+        self._months.clear()
+
+    def on_days_changed(self, listener: Callable[[Optional[Set[str]]], None]):
+        """Подписаться на пересчёт отдельных дней (для перерисовки ячеек)
+
+        Слушатель получает множество пересчитанных дней или None, если кэш
+        сброшен целиком. Изменения вне закэшированных месяцев не сообщаются.
+        """
+        self._listeners.append(listener)
+
+    def get_month(self, year: int, month: int) -> Dict[str, DaySummary]:
+        """Сводка месяца: из кэша или одним запросом к БД"""
+        key = (year, month)
+        if key not in self._months:
+            self._months[key] = self.db.get_month_summary(year, month)
+        return self._months[key]
+
+    def _on_task_change(self, change: TaskChange):
+        if change.action in ("archive", "reload") or change.external:
+            # Архивация, массовые правки и изменения из других процессов:
+            # прежний срок неизвестен, сбрасываем всё
+            self._months.clear()
+            days = None
+        else:
+            days = {day for day in (_due_day(change.before), _due_day(change.after)) if day}
+            for day in list(days):
+                month = self._months.get((int(day[:4]), int(day[5:7])))
+                if month is None:
+                    days.discard(day)
+                    continue
+                count, rank = self.db.get_day_summary(day)
+                if count:
+                    month[day] = (count, rank)
+                else:
+                    month.pop(day, None)
+            if not days:
+                return
+        for listener in list(self._listeners):
+            listener(days)
@@ -0,0 +1,342 @@
+# core/columnar.py
+
+import array
+from bisect import bisect_left
+from typing import Dict, List, Optional
+
+try:
+    import numpy as np
+except ImportError:  # numpy не обязателен: без него маски считаются по array
+    np = None
+
+from .database import SORT_KEYS, TaskQuery
+from .models import PRIORITY_CODES, STATUS_CODES, Task, TaskChange
+
+
+def _sort_key(store: "ColumnarTaskStore", sort: str):
+    """Ключ сортировки позиции в том же порядке, что и SORT_KEYS (без направления);
+    совпадает с sort_cursor задачи этой позиции"""
+    ids, priority, due, titles = store._ids, store._priority, store._due, store._titles
+    if sort == "priority":
+        return lambda p: (priority[p], due[p] is None, due[p] or "", titles[p], ids[p])
+    if sort == "due_date":
+        return lambda p: (due[p] is None, due[p] or "", priority[p], ids[p])
+    if sort == "created":
+        created = store._created
+        return lambda p: (created[p] or "", ids[p])
+    if sort == "title":
+        return lambda p: (titles[p], ids[p])
+    return lambda p: (ids[p],)
+
+
+class ColumnarTaskStore:
+    """Снимок таблицы tasks в памяти, разложенный по колонкам
+
+    Числовые колонки (id, категория, статус, приоритет, родитель) хранятся
+    в array.array; если установлен numpy, фильтры считаются векторно по
+    представлениям этих буферов без копирования, иначе — проходом по массивам.
+    Для каждого режима сортировки порядок строк вычисляется один раз и
+    живёт до изменения ключей сортировки, так что переключение фильтра —
+    это маска и выборка по готовому порядку, без SQLite и без создания Task.
+
+    Снимок обновляется по подписке на изменения TodoDatabase. Удалённые
+    строки помечаются и вычищаются, когда их становится больше половины.
+    Поиск по тексту, метки, архив и умные списки снимок не считает:
+    query() возвращает None, и выборку нужно делать через
+    TodoDatabase.query_tasks.
+    """
+
+    # Сколько удалённых строк копится до пересборки колонок
+    COMPACT_MIN = 1024
+
+    def __init__(self, db):
+        self.db = db
+        self._clear()
+        self.load()
+        self.db.subscribe(self._on_task_change)
+
+    def close(self):
+        """Отписаться от изменений БД и освободить снимок"""
+        self.db.unsubscribe(self._on_task_change)
+        self._clear()
+
+    @property
+    def vectorized(self) -> bool:
+        """Маски считаются через numpy"""
+        return np is not None
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _clear(self):
+        self._ids = array.array("q")
+        self._category = array.array("i")
+        self._status = array.array("b")
+        self._priority = array.array("b")
+        self._parent = array.array("q")  # 0 — задача верхнего уровня
+        self._alive = array.array("b")
+        self._due: List[Optional[str]] = []
+        self._created: List[Optional[str]] = []
+        self._titles: List[str] = []
+        self._tasks: List[Optional[Task]] = []
+        self._positions: Dict[int, int] = {}
+        self._category_codes: Dict[str, int] = {}
+        self._dead = 0
+        self._invalidate()
+
+    def _invalidate(self):
+        """Сбросить порядки сортировки и колонку сроков для numpy"""
+        self._orders: Dict[str, object] = {}
+        self._due_cache = None
+
+    def load(self):
+        """Загрузить все задачи из БД (строки списка, как их отдаёт query_tasks)"""
+        tasks = self.db.query_tasks(TaskQuery())
+        self._clear()
+        for task in tasks:
+            self._append(task)
+
+    # --- Выборка ---
+
+    @staticmethod
+    def supports(query: TaskQuery) -> bool:
+        """Можно ли посчитать выборку по снимку"""
+        return not (query.search or query.tags or query.exclude_tags or query.include_archive
+                    or query.task_ids or query.exclude_status or query.smart_list is not None)
+
+    def query(self, query: TaskQuery) -> Optional[List[Task]]:
+        """Задачи выборки в порядке сортировки или None, если снимок её не считает"""
+        if not self.supports(query):
+            return None
+        sort = query.sort if query.sort in SORT_KEYS else "oldest"
+        order = self._order(sort)
+        start = 0
+        if query.after is not None:
+            # Первая позиция порядка строго после курсора (как row value в SQL)
+            key = _sort_key(self, sort)
+            cursor = tuple(query.after)
+            if SORT_KEYS[sort][1] == "DESC":
+                past = lambda i: key(order[i]) < cursor
+            else:
+                past = lambda i: key(order[i]) > cursor
+            start = bisect_left(range(len(order)), True, key=past)
+        limit = query.limit
+
+        if np is not None:
+            mask = self._mask_numpy(query)
+            candidates = order[start:]
+            picked = candidates[mask[candidates]]
+            if limit is not None:
+                picked = picked[:limit]
+            return [self._tasks[p] for p in picked.tolist()]
+
+        mask = self._mask_python(query)
+        result = []
+        for position in order[start:] if start else order:
+            if mask[position]:
+                result.append(self._tasks[position])
+                if limit is not None and len(result) >= limit:
+                    break
+        return result
+
+    def _category_code(self, query: TaskQuery) -> Optional[int]:
+        """Код категории фильтра: None — фильтра нет, -1 — такой категории нет"""
+        if not query.category or query.category == "Все":
+            return None
+        return self._category_codes.get(query.category, -1)
+
+    @staticmethod
+    def _code(value: Optional[str], codes: Dict[str, int]) -> Optional[int]:
+        if not value or value == "Все":
+            return None
+        return codes.get(value, -1)
+
+    def _view(self, column: array.array):
+        """Представление numpy над буфером колонки (без копирования)"""
+        return np.frombuffer(column, dtype=column.typecode)
+
+    def _due_values(self):
+        """Сроки как массив numpy-строк и маска заданных сроков (строится лениво)"""
+        if self._due_cache is None:
+            self._due_cache = (
+                np.array([due or "" for due in self._due], dtype=str),
+                np.array([due is not None for due in self._due], dtype=bool),
+            )
+        return self._due_cache
+
+    def _mask_numpy(self, query: TaskQuery):
+        mask = self._view(self._alive) != 0
+        category = self._category_code(query)
+        if category is not None:
+            mask &= self._view(self._category) == category
+        priority = self._code(query.priority, PRIORITY_CODES)
+        if priority is not None:
+            mask &= self._view(self._priority) == priority
+        status = self._code(query.status, STATUS_CODES)
+        if status is not None:
+            mask &= self._view(self._status) == status
+        if query.date_from or query.date_to:
+            due, has_due = self._due_values()
+            mask &= has_due
+            if query.date_from:
+                mask &= due >= query.date_from
+            if query.date_to:
+                mask &= due <= query.date_to
+        if query.parent_id is not None:
+            mask &= self._view(self._parent) == query.parent_id
+        if query.roots_only:
+            mask &= self._view(self._parent) == 0
+        if query.task_id is not None:
+            mask &= self._view(self._ids) == query.task_id
+        return mask
+
+    def _mask_python(self, query: TaskQuery) -> bytearray:
+        positions = [p for p, alive in enumerate(self._alive) if alive]
+        checks = []
+        category = self._category_code(query)
+        if category is not None:
+            checks.append((self._category, category))
+        priority = self._code(query.priority, PRIORITY_CODES)
+        if priority is not None:
+            checks.append((self._priority, priority))
+        status = self._code(query.status, STATUS_CODES)
+        if status is not None:
+            checks.append((self._status, status))
+        if query.parent_id is not None:
+            checks.append((self._parent, query.parent_id))
+        if query.roots_only:
+            checks.append((self._parent, 0))
+        if query.task_id is not None:
+            checks.append((self._ids, query.task_id))
+        for column, value in checks:
+            positions = [p for p in positions if column[p] == value]
+        due = self._due
+        if query.date_from or query.date_to:
+            positions = [p for p in positions if due[p] is not None]
+        if query.date_from:
+            positions = [p for p in positions if due[p] >= query.date_from]
+        if query.date_to:
+            positions = [p for p in positions if due[p] <= query.date_to]
+        mask = bytearray(len(self._ids))
+        for p in positions:
+            mask[p] = 1
+        return mask
+
+    def _order(self, sort: str):
+        """Порядок позиций для режима сортировки"""
+        cached = self._orders.get(sort)
+        if cached is not None:
+            return cached
+        descending = SORT_KEYS[sort][1] == "DESC"
+        if np is not None:
+            order = self._lexsort(sort)
+            if descending:
+                order = order[::-1]
+        else:
+            order = sorted(range(len(self._ids)), key=_sort_key(self, sort), reverse=descending)
+        self._orders[sort] = order
+        return order
+
+    def _lexsort(self, sort: str):
+        """Порядок по возрастанию ключей режима (np.lexsort: последний ключ — главный)"""
+        ids = self._view(self._ids)
+        if sort in ("oldest", "newest"):
+            return np.argsort(ids, kind="stable")
+        if sort == "created":
+            created = np.array([value or "" for value in self._created], dtype=str)
+            return np.lexsort((ids, created))
+        if sort == "title":
+            return np.lexsort((ids, np.array(self._titles, dtype=str)))
+        due, has_due = self._due_values()
+        priority = self._view(self._priority)
+        if sort == "priority":
+            titles = np.array(self._titles, dtype=str)
+            return np.lexsort((ids, titles, due, ~has_due, priority))
+        return np.lexsort((ids, priority, due, ~has_due))  # due_date
+
+    # --- Синхронизация с БД ---
+
+    def _sort_fields(self, position: int) -> tuple:
+        return (self._priority[position], self._due[position],
+                self._titles[position], self._created[position])
+
+    def _append(self, task: Task):
+        position = len(self._ids)
+        self._ids.append(task.id)
+        self._category.append(self._category_codes.setdefault(task.category, len(self._category_codes)))
+        self._status.append(STATUS_CODES.get(task.status, -1))
+        self._priority.append(PRIORITY_CODES.get(task.priority, -1))
+        self._parent.append(task.parent_id or 0)
+        self._alive.append(1)
+        self._due.append(task.due_date)
+        self._created.append(task.created_at)
+        self._titles.append(task.title)
+        self._tasks.append(task)
+        self._positions[task.id] = position
+        self._invalidate()
+
+    def _upsert(self, task: Task):
+        position = self._positions.get(task.id)
+        if position is None:
+            self._append(task)
+            return
+        old_keys = self._sort_fields(position)
+        self._category[position] = self._category_codes.setdefault(
+            task.category, len(self._category_codes)
+        )
+        self._status[position] = STATUS_CODES.get(task.status, -1)
+        self._priority[position] = PRIORITY_CODES.get(task.priority, -1)
+        self._parent[position] = task.parent_id or 0
+        self._due[position] = task.due_date
+        self._created[position] = task.created_at
+        self._titles[position] = task.title
+        self._tasks[position] = task
+        # Смена статуса (самая частая правка) порядок сортировки не трогает
+        if self._sort_fields(position) != old_keys:
+            self._invalidate()
+
+    def _remove(self, task_id: int):
+        position = self._positions.pop(task_id, None)
+        if position is None:
+            return
+        self._alive[position] = 0
+        self._tasks[position] = None
+        self._dead += 1
+        if self._dead >= self.COMPACT_MIN and self._dead * 2 > len(self._ids):
+            tasks = [task for task in self._tasks if task is not None]
+            self._clear()
+            for task in tasks:
+                self._append(task)
+
+    def _refresh(self, task_id: int):
+        """Перечитать строку задачи из БД (или убрать её, если задачи больше нет)"""
+        rows = self.db.query_tasks(TaskQuery(task_id=task_id))
+        if rows:
+            self._upsert(rows[0])
+        else:
+            self._remove(task_id)
+
+    def _parent_of(self, task_id: int) -> int:
+        position = self._positions.get(task_id)
+        return self._parent[position] if position is not None else 0
+
+    def _on_task_change(self, change: TaskChange):
+        if change.action == "reload":
+            self.load()
+            return
+        # Свёртка подзадач родителей зависит от изменённой задачи
+        parents = {self._parent_of(change.task_id)}
+        parents.update(
+            task.parent_id for task in (change.before, change.after)
+            if task is not None and task.parent_id
+        )
+        if change.action in ("delete", "archive"):
+            self._remove(change.task_id)
+        else:
+            self._refresh(change.task_id)
+        seen = {change.task_id}
+        for parent_id in parents:
+            while parent_id and parent_id not in seen:
+                seen.add(parent_id)
+                self._refresh(parent_id)
+                parent_id = self._parent_of(parent_id)
@@ -1,15 +1,387 @@
 # core/database.py
 
+import json
 import sqlite3
-from typing import List, Optional
-from datetime import datetime
-from .models import Task
+import sys
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from datetime import date, datetime, timedelta
+from .models import (
+    PRIORITIES, PRIORITY_CODES, PRIORITY_NONE, STATUS_CODES, STATUS_DONE, STATUSES,
+    SmartList, Task, TaskChange, priority_name, status_name,
+)
+from .trigrams import MAX_TRIGRAMS_PER_EDIT, task_words, within_one_edit, word_trigrams, words
+
+# Колонки задачи в порядке, который ожидает _row_to_task
+TASK_COLUMNS = (
+    "id, title, description, completed, category_id, status, priority, due_date, created_at, "
+    "parent_id"
+)
+
+# Длина превью описания в строках списка: карточка показывает 150 символов,
+# лишний символ говорит о том, что текст обрезан
+DESCRIPTION_PREVIEW_CHARS = 151
+
+# Облегчённая проекция для списков: вместо полного описания — его начало
+LIST_COLUMNS = TASK_COLUMNS.replace(
+    "description", f"substr(description, 1, {DESCRIPTION_PREVIEW_CHARS}) AS description", 1
+)
+
+# Ранг приоритета для сортировки (меньше — важнее): код приоритета и есть ранг
+PRIORITY_RANK_SQL = "priority"
+
+# Версия схемы в PRAGMA user_version: 1 — статус, приоритет и категория хранятся
+# кодами. БД с этой версией при открытии уже не проверяются на старые схемы
+SCHEMA_VERSION = 1
+
+# Схема задач: статус, приоритет и категория — целые коды (см. STATUSES,
+# PRIORITIES и таблицу categories); архив повторяет её с датой архивации
+TASKS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        description TEXT DEFAULT '',
+        completed BOOLEAN NOT NULL CHECK (completed IN (0, 1)) DEFAULT 0,
+        category_id INTEGER,
+        status INTEGER NOT NULL DEFAULT 0,
+        priority INTEGER NOT NULL DEFAULT {priority_none},
+        due_date TEXT,
+        created_at TEXT,
+        completed_at TEXT,
+        parent_id INTEGER
+    )
+"""
+ARCHIVE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {name} (
+        id INTEGER PRIMARY KEY,
+        title TEXT NOT NULL,
+        description TEXT DEFAULT '',
+        completed BOOLEAN NOT NULL DEFAULT 1,
+        category_id INTEGER,
+        status INTEGER NOT NULL DEFAULT {status_done},
+        priority INTEGER NOT NULL DEFAULT {priority_none},
+        due_date TEXT,
+        created_at TEXT,
+        completed_at TEXT,
+        archived_at TEXT,
+        parent_id INTEGER
+    )
+"""
+
+
+def _code_case_sql(column: str, names, default: int) -> str:
+    """CASE, переводящий текстовое значение колонки в код (для миграции)"""
+    whens = " ".join(f"WHEN '{name}' THEN {code}" for code, name in enumerate(names))
+    return f"(CASE {column} {whens} ELSE {default} END)"
+
+
+def _status_code(status: str) -> int:
+    """Код статуса для записи в БД (неизвестный статус — ValueError)"""
+    try:
+        return STATUS_CODES[status]
+    except (KeyError, TypeError):
+        raise ValueError(f"Неизвестный статус: {status!r} (допустимы: {', '.join(STATUSES)})")
+
+# Режимы сортировки: ключи (выражения SQL без NULL, последний — id) и направление.
+# Все ключи режима идут в одном направлении, поэтому курсор keyset-пагинации
+# сравнивается одним row value. Для каждого режима есть индекс с теми же выражениями.
+SORT_KEYS = {
+    "oldest": (("id",), "ASC"),
+    "newest": (("id",), "DESC"),
+    "priority": ((PRIORITY_RANK_SQL, "(due_date IS NULL)", "COALESCE(due_date, '')",
+                  "title", "id"), "ASC"),
+    "due_date": (("(due_date IS NULL)", "COALESCE(due_date, '')", PRIORITY_RANK_SQL,
+                  "id"), "ASC"),
+    "created": (("COALESCE(created_at, '')", "id"), "DESC"),
+    "title": (("title", "id"), "ASC"),
+}
+
+
+
+def sort_cursor(task: Task, sort: str) -> tuple:
+    """Курсор keyset-пагинации: значения ключей SORT_KEYS[sort] у задачи
+
+    Курсор хранит сами значения, а не id: страница продолжается с того же
+    места, даже если задачу курсора удалили или у неё сменились ключи.
+    """
+    due_missing = int(task.due_date is None)
+    priority = PRIORITY_CODES.get(task.priority, PRIORITY_NONE)
+    if sort == "priority":
+        return (priority, due_missing, task.due_date or "", task.title, task.id)
+    if sort == "due_date":
+        return (due_missing, task.due_date or "", priority, task.id)
+    if sort == "created":
+        return (task.created_at or "", task.id)
+    if sort == "title":
+        return (task.title, task.id)
+    return (task.id,)
+
+
+SORT_INDEXES = {
+    "priority": "idx_tasks_sort_priority",
+    "due_date": "idx_tasks_sort_due",
+    "created": "idx_tasks_sort_created",
+    "title": "idx_tasks_sort_title",
+}
+
+# Поддерево задачи: сама задача (глубина 0) и все её потомки по parent_id
+SUBTREE_CTE = """
+    WITH RECURSIVE subtree(id, depth) AS (
+        SELECT id, 0 FROM tasks WHERE id = ?
+        UNION ALL
+        SELECT t.id, s.depth + 1 FROM tasks t JOIN subtree s ON t.parent_id = s.id
+    )
+"""
+
+# Условия WHERE построителя запросов (порядок фиксирован: от него зависят параметры)
+QUERY_CLAUSES = {
+    "search": "(title LIKE ? OR description LIKE ?)",
+    "category": "category_id = (SELECT id FROM categories WHERE name = ?)",
+    "priority": "priority = ?",
+    "status": "status = ?",
+    "exclude_status": "status != ?",
+    "date_from": "due_date >= ?",
+    "date_to": "due_date <= ?",
+    "parent_id": "parent_id = ?",
+    "task_id": "id = ?",
+    "task_ids": "id IN (SELECT value FROM json_each(?))",
+    "roots_only": "parent_id IS NULL",
+    # Проверка строки по первичному ключу состава; для маленьких списков
+    # выгоднее идти от состава (см. SMART_LIST_SPARSE_CLAUSE)
+    "smart_list": "EXISTS (SELECT 1 FROM smart_list_members WHERE list_id = ? AND task_id = id)",
+    # Текст условий по меткам зависит от их числа (см. _tags_clause)
+    "tags": None,
+    "exclude_tags": None,
+}
+
+
+SMART_LIST_SPARSE_CLAUSE = "id IN (SELECT task_id FROM smart_list_members WHERE list_id = ?)"
+
+
+# Условия по меткам: пересечение множеств задач каждой метки (инвертированный
+# индекс task_tags) и исключение задач с любой из запрещённых меток
+TAG_SET_SQL = "SELECT task_id FROM task_tags WHERE tag_id = (SELECT id FROM tags WHERE name = ?)"
+
+
+def _tags_clause(count: int) -> str:
+    return "id IN (" + " INTERSECT ".join([TAG_SET_SQL] * count) + ")"
+
+
+def _exclude_tags_clause(count: int) -> str:
+    placeholders = ", ".join("?" * count)
+    return (
+        "id NOT IN (SELECT task_id FROM task_tags WHERE tag_id IN "
+        f"(SELECT id FROM tags WHERE name IN ({placeholders})))"
+    )
+
+
+def normalize_tag(name: str) -> str:
+    """Имя метки в каноническом виде: без #, пробелов по краям и в нижнем регистре"""
+    return name.strip().lstrip("#").strip().lower()
+
+
+def parse_tag_filter(text: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """Разобрать фильтр меток вида "a b -c": (обязательные, исключённые)"""
+    include, exclude = [], []
+    for token in text.split():
+        target = exclude if token.startswith("-") else include
+        name = normalize_tag(token[1:] if token.startswith("-") else token)
+        if name and name not in target:
+            target.append(name)
+    return tuple(include), tuple(exclude)
+
+
+# Минимальное сходство слова задачи со словом запроса при нечётком поиске
+# (доля общих триграмм, как similarity_threshold в pg_trgm)
+FUZZY_THRESHOLD = 0.3
+
+
+def _is_set(value: Optional[str]) -> bool:
+    """Значение фильтра задано (пустая строка и "Все" означают отсутствие фильтра)"""
+    return bool(value) and value != "Все"
+
+
+@dataclass(frozen=True)
+class TaskQuery:
+    """Выборка задач: поиск, фильтры, диапазон сроков, сортировка и страница"""
+    search: Optional[str] = None
+    category: Optional[str] = None
+    priority: Optional[str] = None
+    status: Optional[str] = None
+    date_from: Optional[str] = None
+    date_to: Optional[str] = None
+    sort: str = "oldest"  # режим из SORT_KEYS
+    limit: Optional[int] = None
+    after: Optional[tuple] = None  # курсор последней задачи предыдущей страницы (sort_cursor)
+    include_archive: bool = False  # искать и среди архивных задач
+    tags: Tuple[str, ...] = ()  # задача должна иметь все эти метки
+    exclude_tags: Tuple[str, ...] = ()  # и ни одной из этих
+    parent_id: Optional[int] = None  # только прямые подзадачи этой задачи
+    roots_only: bool = False  # только задачи верхнего уровня
+    task_id: Optional[int] = None  # только эта задача (проверка, подходит ли она под выборку)
+    task_ids: Tuple[int, ...] = ()  # только задачи из этого набора
+    fuzzy: bool = False  # search — поиск слов с опечатками, по убыванию сходства
+    exclude_status: Optional[str] = None  # все статусы, кроме этого
+    smart_list: Optional[int] = None  # только задачи умного списка (см. SmartList)
+
+    def clause_params(self) -> List[Tuple[str, list]]:
+        """Активные условия WHERE и их параметры в порядке QUERY_CLAUSES"""
+        values = {
+            "search": [f"%{self.search}%"] * 2 if self.search else None,
+            "category": [self.category] if _is_set(self.category) else None,
+            "priority": [PRIORITY_CODES.get(self.priority, -1)] if _is_set(self.priority) else None,
+            "status": [STATUS_CODES.get(self.status, -1)] if _is_set(self.status) else None,
+            "exclude_status": [STATUS_CODES.get(self.exclude_status, -1)]
+            if _is_set(self.exclude_status) else None,
+            "date_from": [self.date_from] if self.date_from else None,
+            "date_to": [self.date_to] if self.date_to else None,
+            "parent_id": [self.parent_id] if self.parent_id is not None else None,
+            "roots_only": [] if self.roots_only else None,
+            "smart_list": [self.smart_list] if self.smart_list is not None else None,
+            "task_id": [self.task_id] if self.task_id is not None else None,
+            "task_ids": [json.dumps(list(self.task_ids))] if self.task_ids else None,
+            "tags": list(self.tags) if self.tags else None,
+            "exclude_tags": list(self.exclude_tags) if self.exclude_tags else None,
+        }
+        return [(name, values[name]) for name in QUERY_CLAUSES if values[name] is not None]
+
+    def compile(self, sparse_smart_list: bool = False) -> Tuple[str, list]:
+        """SQL (из кэша по форме запроса) и параметры
+
+        sparse_smart_list — в умном списке мало задач: выборка идёт от его состава.
+        """
+        clause_params = self.clause_params()
+        sort = self.sort if self.sort in SORT_KEYS else "oldest"
+        sql = _compile_task_query(
+            tuple(name for name, _ in clause_params),
+            sort,
+            self.after is not None,
+            self.limit is not None,
+            self.include_archive,
+            len(self.tags),
+            len(self.exclude_tags),
+            sparse_smart_list,
+        )
+        params = [value for _, values in clause_params for value in values]
+        if self.after is not None:
+            params.append(self.after[0])
+            params.extend(self.after)
+        if self.limit is not None:
+            params.append(self.limit)
+        return sql, params
+
+
+@lru_cache(maxsize=256)
+def _compile_task_query(clauses: Tuple[str, ...], sort: str, has_after: bool,
+                        has_limit: bool, include_archive: bool = False,
+                        tag_count: int = 0, exclude_tag_count: int = 0,
+                        sparse_smart_list: bool = False) -> str:
+    """Собрать SQL для формы запроса (набор условий, сортировка, пагинация)"""
+    keys, direction = SORT_KEYS[sort]
+    conditions = []
+    for name in clauses:
+        if name == "tags":
+            conditions.append(_tags_clause(tag_count))
+        elif name == "exclude_tags":
+            conditions.append(_exclude_tags_clause(exclude_tag_count))
+        elif name == "smart_list" and sparse_smart_list:
+            conditions.append(SMART_LIST_SPARSE_CLAUSE)
+        else:
+            conditions.append(QUERY_CLAUSES[name])
+
+    # Keyset-пагинация: строки строго после курсора в порядке сортировки.
+    # Отдельная граница по первому ключу позволяет SQLite начать поиск
+    # по индексу с курсора, а не сканировать индекс с начала.
+    if has_after:
+        op = "<" if direction == "DESC" else ">"
+        placeholders = ", ".join("?" * len(keys))
+        conditions.append(f"{keys[0]} {op}= ?")
+        conditions.append(f"({', '.join(keys)}) {op} ({placeholders})")
+
+    if include_archive:
+        sql = (
+            f"WITH all_tasks AS (SELECT {TASK_COLUMNS}, 0 AS archived FROM tasks "
+            f"UNION ALL SELECT {TASK_COLUMNS}, 1 FROM tasks_archive) "
+            f"SELECT {LIST_COLUMNS}, archived FROM all_tasks"
+        )
+    else:
+        sql = f"SELECT {LIST_COLUMNS} FROM tasks"
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY " + ", ".join(f"{key} {direction}" for key in keys)
+    if has_limit:
+        sql += " LIMIT ?"
+    return sql
+
 
 class TodoDatabase:
+    # Сколько последних записей журнала task_changes хранить
+    CHANGE_LOG_KEEP = 10000
+    # При стольких изменённых задачах умный список дешевле пересчитать целиком
+    SMART_LIST_REBUILD_AT = 5000
+    # Список с задачами меньше 1/N таблицы выбирается от состава, а не сканом
+    SMART_LIST_SPARSE_RATIO = 50
+
     def __init__(self, db_path: str = "todo.db"):
         self.db_path = db_path
+        self._category_names: Dict[int, str] = {}
+        self._listeners: List[Callable[[TaskChange], None]] = []
         self.init_db()
 
+    def reader(self) -> "TodoDatabase":
+        """Экземпляр той же БД для чтения из другого потока
+
+        У него свой кэш имён категорий и нет подписчиков; схема не
+        проверяется повторно. Писать через него нельзя: изменения не дойдут
+        до подписчиков основного экземпляра.
+        """
+        reader = type(self).__new__(type(self))
+        reader.db_path = self.db_path
+        reader._category_names = {}
+        reader._listeners = []
+        return reader
+
+    def subscribe(self, listener: Callable[[TaskChange], None]):
+        """Подписаться на изменения задач (добавление, правка, статус, удаление)"""
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener: Callable[[TaskChange], None]):
+        """Отписаться от изменений задач"""
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _snapshot(self, task_id: int) -> Optional[Task]:
+        """Состояние задачи до изменения (читаем только если есть подписчики)"""
+        if not self._listeners:
+            return None
+        return self.get_task_by_id(task_id)
+
+    def _notify(self, action: str, task_id: int, before: Optional[Task] = None):
+        """Сообщить подписчикам об изменении задачи (после commit)"""
+        if not self._listeners:
+            return
+        after = (
+            self.get_task_by_id(task_id) if action not in ("delete", "archive", "reload") else None
+        )
+        change = TaskChange(action, task_id, before, after)
+        for listener in list(self._listeners):
+            listener(change)
+
+    def notify_external(self, action: str, task_id: int, after: Optional[Task]):
+        """Передать подписчикам изменение, сделанное другим процессом"""
+        change = TaskChange(action, task_id, None, after, external=True)
+        for listener in list(self._listeners):
+            listener(change)
+
+    def get_changes_since(self, seq: int, conn=None) -> List[Tuple[int, int, str]]:
+        """Записи журнала task_changes после seq: (seq, id задачи, действие)"""
+        sql = "SELECT seq, task_id, action FROM task_changes WHERE seq > ? ORDER BY seq"
+        if conn is not None:
+            return conn.execute(sql, (seq,)).fetchall()
+        with self.get_connection() as conn:
+            return conn.execute(sql, (seq,)).fetchall()
+
     def get_connection(self):
         return sqlite3.connect(self.db_path)
 
@@ -17,18 +389,32 @@ class TodoDatabase:
         with self.get_connection() as conn:
             cursor = conn.cursor()
 
+            # Создаем таблицу категорий
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS categories (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE
+                )
+            """)
+
             # Проверяем существование таблицы и её структуру
             cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='tasks'")
             table_exists = cursor.fetchone()
 
-            if table_exists:
+            cursor.execute("PRAGMA user_version")
+            schema_version = cursor.fetchone()[0]
+
+            if table_exists and schema_version < SCHEMA_VERSION:
                 # Получаем список колонок
                 cursor.execute("PRAGMA table_info(tasks)")
                 columns = [col[1] for col in cursor.fetchall()]
 
-                # Если нет новых колонок, создаем новую таблицу с миграцией данных
-                required_columns = ['category', 'status', 'priority', 'due_date', 'created_at']
+                # Если нет новых колонок, создаем новую таблицу с миграцией данных.
+                # Категория — текстовая category или, после перехода на коды, category_id
+                required_columns = ['status', 'priority', 'due_date', 'created_at']
                 missing_columns = [col for col in required_columns if col not in columns]
+                if "category" not in columns and "category_id" not in columns:
+                    missing_columns.append("category")
 
                 if missing_columns:
                     # Создаем новую таблицу
@@ -60,28 +446,174 @@ class TodoDatabase:
                     conn.commit()
             else:
                 # Создаем таблицу с нуля
-                conn.execute("""
-                    CREATE TABLE IF NOT EXISTS tasks (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
-                        title TEXT NOT NULL,
-                        description TEXT DEFAULT '',
-                        completed BOOLEAN NOT NULL CHECK (completed IN (0, 1)) DEFAULT 0,
-                        category TEXT DEFAULT 'Без категории',
-                        status TEXT DEFAULT 'не выполнено',
-                        priority TEXT DEFAULT 'нет',
-                        due_date TEXT,
-                        created_at TEXT
-                    )
+                cursor.execute(TASKS_TABLE_SQL.format(name="tasks", priority_none=PRIORITY_NONE))
+
+            # Колонки, добавленные после первой версии схемы
+            self._ensure_column(cursor, "tasks", "completed_at", "TEXT")
+            self._ensure_column(cursor, "tasks", "parent_id", "INTEGER")
+
+            # Архив выполненных задач: та же структура, id сохраняется
+            cursor.execute(ARCHIVE_TABLE_SQL.format(
+                name="tasks_archive", status_done=STATUS_DONE, priority_none=PRIORITY_NONE
+            ))
+            self._ensure_column(cursor, "tasks_archive", "parent_id", "INTEGER")
+
+            # Текстовые статус, приоритет и категория старых БД -> целые коды
+            if schema_version < SCHEMA_VERSION:
+                self._migrate_to_codes(cursor, "tasks", TASKS_TABLE_SQL)
+                self._migrate_to_codes(cursor, "tasks_archive", ARCHIVE_TABLE_SQL)
+                cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+            # Справочники кодов: для чтения БД сторонними инструментами
+            for table, names in (("statuses", STATUSES), ("priorities", PRIORITIES)):
+                cursor.execute(
+                    f"CREATE TABLE IF NOT EXISTS {table} (id INTEGER PRIMARY KEY, name TEXT NOT NULL)"
+                )
+                cursor.executemany(
+                    f"INSERT OR REPLACE INTO {table} (id, name) VALUES (?, ?)",
+                    list(enumerate(names)),
+                )
+
+            # Метки: справочник со счётчиком задач и инвертированный индекс
+            # метка -> задачи. Первичный ключ (tag_id, task_id) покрывает выборку
+            # задач метки, обратный индекс — метки задачи.
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS tags (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL UNIQUE,
+                    task_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS task_tags (
+                    tag_id INTEGER NOT NULL,
+                    task_id INTEGER NOT NULL,
+                    PRIMARY KEY (tag_id, task_id)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_task_tags_task ON task_tags (task_id, tag_id)"
+            )
+            # Счётчики задач по меткам поддерживаются триггерами при каждой связи
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_task_tags_insert AFTER INSERT ON task_tags
+                BEGIN
+                    UPDATE tags SET task_count = task_count + 1 WHERE id = NEW.tag_id;
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_task_tags_delete AFTER DELETE ON task_tags
+                BEGIN
+                    UPDATE tags SET task_count = task_count - 1 WHERE id = OLD.tag_id;
+                END
+            """)
+
+            # Журнал изменений задач для других процессов с той же БД:
+            # триггеры пишут id задачи на любую вставку, правку и удаление,
+            # в том числе сделанные сторонними скриптами
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS task_changes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    task_id INTEGER NOT NULL,
+                    action TEXT NOT NULL
+                )
+            """)
+            for event, action, row in (
+                ("INSERT", "add", "NEW"), ("UPDATE", "update", "NEW"), ("DELETE", "delete", "OLD"),
+            ):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_tasks_log_{action} AFTER {event} ON tasks
+                    BEGIN
+                        INSERT INTO task_changes (task_id, action) VALUES ({row}.id, '{action}');
+                    END
                 """)
-                
-            # Создаем таблицу категорий
+            # Смена меток тоже меняет карточку задачи
+            for event, row in (("INSERT", "NEW"), ("DELETE", "OLD")):
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS trg_task_tags_log_{event.lower()}
+                    AFTER {event} ON task_tags
+                    BEGIN
+                        INSERT INTO task_changes (task_id, action) VALUES ({row}.task_id, 'update');
+                    END
+                """)
+            cursor.execute(
+                "DELETE FROM task_changes WHERE seq <= (SELECT MAX(seq) FROM task_changes) - ?",
+                (self.CHANGE_LOG_KEEP,),
+            )
+
+            # Нечёткий поиск: словарь слов заголовков и описаний, триграммы слов
+            # словаря и обратный индекс слово -> задачи (in_title — слово есть
+            # в заголовке). Архивные задачи остаются в индексе (id сохраняется).
+            cursor.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'task_words'"
+            )
+            words_exist = cursor.fetchone() is not None
             cursor.execute("""
-                CREATE TABLE IF NOT EXISTS categories (
+                CREATE TABLE IF NOT EXISTS search_words (
+                    id INTEGER PRIMARY KEY,
+                    word TEXT NOT NULL UNIQUE,
+                    trigram_count INTEGER NOT NULL,
+                    task_count INTEGER NOT NULL DEFAULT 0
+                )
+            """)
+            # Короткие слова запроса сравниваются со словами близкой длины
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_search_words_length ON search_words (length(word))"
+            )
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS word_trigrams (
+                    trigram TEXT NOT NULL,
+                    word_id INTEGER NOT NULL,
+                    PRIMARY KEY (trigram, word_id)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS task_words (
+                    word_id INTEGER NOT NULL,
+                    task_id INTEGER NOT NULL,
+                    in_title INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (word_id, task_id)
+                ) WITHOUT ROWID
+            """)
+            if not words_exist:
+                self._build_search_index(cursor)
+            self._create_search_triggers(cursor)
+
+            # Умные списки: сохранённые фильтры и их состав. Состав догоняет
+            # журнал task_changes (synced_seq — последняя учтённая запись),
+            # число задач поддерживают триггеры на smart_list_members.
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS smart_lists (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    name TEXT NOT NULL UNIQUE
+                    name TEXT NOT NULL UNIQUE,
+                    filters TEXT NOT NULL,
+                    task_count INTEGER NOT NULL DEFAULT 0,
+                    synced_seq INTEGER NOT NULL DEFAULT 0,
+                    synced_on TEXT
                 )
             """)
-            
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS smart_list_members (
+                    list_id INTEGER NOT NULL,
+                    task_id INTEGER NOT NULL,
+                    PRIMARY KEY (list_id, task_id)
+                ) WITHOUT ROWID
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_smart_list_members_insert
+                AFTER INSERT ON smart_list_members
+                BEGIN
+                    UPDATE smart_lists SET task_count = task_count + 1 WHERE id = NEW.list_id;
+                END
+            """)
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS trg_smart_list_members_delete
+                AFTER DELETE ON smart_list_members
+                BEGIN
+                    UPDATE smart_lists SET task_count = task_count - 1 WHERE id = OLD.list_id;
+                END
+            """)
+
             # Добавляем стандартные категории только если таблица пустая (первый запуск)
             cursor.execute("SELECT COUNT(*) FROM categories")
             if cursor.fetchone()[0] == 0:
@@ -91,114 +623,499 @@ class TodoDatabase:
                 ]
                 for cat in standard_categories:
                     cursor.execute("INSERT INTO categories (name) VALUES (?)", (cat,))
+
+            # Индекс для выборки ближайших сроков (напоминания)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_due_date ON tasks (due_date)")
+
+            # Индекс для выборки подзадач и рекурсивного обхода поддеревьев
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_parent ON tasks (parent_id)")
+
+            # Индекс для колонок доски: задачи одного статуса в порядке id (rowid)
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_tasks_status ON tasks (status)")
+
+            # Индекс для отбора выполненных задач в архив
+            cursor.execute(
+                "CREATE INDEX IF NOT EXISTS idx_tasks_completed ON tasks (status, completed_at)"
+            )
+
+            # Индексы для сортировок (выражения совпадают с SORT_KEYS)
+            for sort, index_name in SORT_INDEXES.items():
+                keys, _ = SORT_KEYS[sort]
+                cursor.execute(
+                    f"CREATE INDEX IF NOT EXISTS {index_name} ON tasks ({', '.join(keys)})"
+                )
             conn.commit()
 
+    def _migrate_to_codes(self, cursor, table: str, table_sql: str):
+        """Перестроить таблицу со старыми текстовыми колонками в схему с кодами"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        columns = [col[1] for col in cursor.fetchall()]
+        if "category_id" in columns:
+            return
+        cursor.execute(
+            f"INSERT OR IGNORE INTO categories (name) "
+            f"SELECT DISTINCT category FROM {table} WHERE category IS NOT NULL"
+        )
+        cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES ('Без категории')")
+        cursor.execute(table_sql.format(
+            name=f"{table}_new", status_done=STATUS_DONE, priority_none=PRIORITY_NONE
+        ))
+        extra = ", archived_at" if "archived_at" in columns else ""
+        cursor.execute(f"""
+            INSERT INTO {table}_new (id, title, description, completed, category_id, status,
+                                     priority, due_date, created_at, completed_at, parent_id{extra})
+            SELECT id, title, description, completed,
+                   COALESCE(
+                       (SELECT c.id FROM categories c WHERE c.name = {table}.category),
+                       (SELECT c.id FROM categories c WHERE c.name = 'Без категории')
+                   ),
+                   {_code_case_sql("status", STATUSES, 0)},
+                   {_code_case_sql("priority", PRIORITIES, PRIORITY_NONE)},
+                   due_date, created_at, completed_at, parent_id{extra}
+            FROM {table}
+        """)
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+    def rebuild_search_index(self):
+        """Перестроить индекс нечёткого поиска целиком (после массовой вставки в обход add_task)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DROP TRIGGER IF EXISTS trg_task_words_insert")
+            cursor.execute("DROP TRIGGER IF EXISTS trg_task_words_delete")
+            cursor.execute("DELETE FROM task_words")
+            cursor.execute("DELETE FROM word_trigrams")
+            cursor.execute("DELETE FROM search_words")
+            self._build_search_index(cursor)
+            self._create_search_triggers(cursor)
+
+    def _create_search_triggers(self, cursor):
+        """Число задач со словом поддерживается триггерами"""
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_task_words_insert AFTER INSERT ON task_words
+            BEGIN
+                UPDATE search_words SET task_count = task_count + 1 WHERE id = NEW.word_id;
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS trg_task_words_delete AFTER DELETE ON task_words
+            BEGIN
+                UPDATE search_words SET task_count = task_count - 1 WHERE id = OLD.word_id;
+            END
+        """)
+
+    def _build_search_index(self, cursor):
+        """Заполнить индекс по всем задачам (таблицы пусты, триггеров ещё нет)"""
+        vocabulary: Dict[str, int] = {}
+        postings = []
+        for table in ("tasks", "tasks_archive"):
+            cursor.execute(f"SELECT id, title, description FROM {table}")
+            for task_id, title, description in cursor.fetchall():
+                for word, in_title in task_words(title, description).items():
+                    word_id = vocabulary.setdefault(word, len(vocabulary) + 1)
+                    postings.append((word_id, task_id, in_title))
+        cursor.executemany(
+            "INSERT INTO search_words (id, word, trigram_count) VALUES (?, ?, ?)",
+            ((word_id, word, len(word_trigrams(word))) for word, word_id in vocabulary.items()),
+        )
+        cursor.executemany(
+            "INSERT INTO word_trigrams (trigram, word_id) VALUES (?, ?)",
+            ((trigram, word_id) for word, word_id in vocabulary.items()
+             for trigram in word_trigrams(word)),
+        )
+        cursor.executemany(
+            "INSERT OR IGNORE INTO task_words (word_id, task_id, in_title) VALUES (?, ?, ?)",
+            postings,
+        )
+        cursor.execute("""
+            UPDATE search_words SET task_count =
+                (SELECT COUNT(*) FROM task_words WHERE word_id = search_words.id)
+        """)
+
+    def _word_ids(self, cursor, names: Iterable[str]) -> Dict[str, int]:
+        """id слов словаря (новые слова добавляются вместе с их триграммами)"""
+        names = list(names)
+        ids = {}
+        for start in range(0, len(names), 500):
+            chunk = names[start:start + 500]
+            cursor.execute(
+                f"SELECT word, id FROM search_words WHERE word IN ({', '.join('?' * len(chunk))})",
+                chunk,
+            )
+            ids.update(cursor.fetchall())
+        for word in names:
+            if word not in ids:
+                trigrams = word_trigrams(word)
+                cursor.execute(
+                    "INSERT INTO search_words (word, trigram_count) VALUES (?, ?)",
+                    (word, len(trigrams)),
+                )
+                ids[word] = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO word_trigrams (trigram, word_id) VALUES (?, ?)",
+                    [(trigram, ids[word]) for trigram in trigrams],
+                )
+        return ids
+
+    def _write_words(self, cursor, task_id: int, old: Dict[str, int], new: Dict[str, int]):
+        """Записать только разницу между старыми и новыми словами задачи"""
+        removed = old.keys() - new.keys()
+        added = new.keys() - old.keys()
+        changed = [word for word in new.keys() & old.keys() if new[word] != old[word]]
+        if not (removed or added or changed):
+            return
+        ids = self._word_ids(cursor, removed | added | set(changed))
+        cursor.executemany(
+            "DELETE FROM task_words WHERE word_id = ? AND task_id = ?",
+            [(ids[word], task_id) for word in removed],
+        )
+        cursor.executemany(
+            "INSERT INTO task_words (word_id, task_id, in_title) VALUES (?, ?, ?)",
+            [(ids[word], task_id, new[word]) for word in added],
+        )
+        cursor.executemany(
+            "UPDATE task_words SET in_title = ? WHERE word_id = ? AND task_id = ?",
+            [(new[word], ids[word], task_id) for word in changed],
+        )
+
+    def _category_id(self, cursor, name: str) -> int:
+        """id категории по имени (категория создаётся, если её нет)"""
+        cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (name,))
+        cursor.execute("SELECT id FROM categories WHERE name = ?", (name,))
+        return cursor.fetchone()[0]
+
+    def _category_name(self, category_id: Optional[int]) -> str:
+        """Имя категории по id из кэша (строки интернированы и общие для всех задач)"""
+        name = self._category_names.get(category_id)
+        if name is None:
+            with self.get_connection() as conn:
+                rows = conn.execute("SELECT id, name FROM categories").fetchall()
+            self._category_names = {cid: sys.intern(cname) for cid, cname in rows}
+            # NULL и id удалённой категории тоже кэшируются, иначе каждая такая
+            # строка перечитывала бы справочник (новые id AUTOINCREMENT не повторяет)
+            name = self._category_names.setdefault(category_id, "Без категории")
+        return name
+
+    def _ensure_column(self, cursor, table: str, column: str, definition: str):
+        """Добавить колонку в существующую таблицу, если её ещё нет"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        if column not in [col[1] for col in cursor.fetchall()]:
+            cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+
     def add_task(self, title: str, description: str = "", category: str = "Без категории",
-                 priority: str = "нет", due_date: Optional[str] = None) -> int:
+                 priority: str = "нет", due_date: Optional[str] = None,
+                 tags: Optional[List[str]] = None, parent_id: Optional[int] = None) -> int:
         with self.get_connection() as conn:
             cursor = conn.cursor()
             
             # Добавляем категорию в таблицу категорий, если её там нет
-            cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (category,))
+            category_id = self._category_id(cursor, category)
             
             created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             cursor.execute(
-                """INSERT INTO tasks (title, description, completed, category, status, priority, due_date, created_at)
-                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
-                (title, description, False, category, "не выполнено", priority, due_date, created_at)
+                """INSERT INTO tasks (title, description, completed, category_id, status, priority, due_date, created_at, parent_id)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)""",
+                (title, description, False, category_id, STATUS_CODES["не выполнено"],
+                 PRIORITY_CODES.get(priority, PRIORITY_NONE), due_date, created_at, parent_id)
             )
-            return cursor.lastrowid
+            task_id = cursor.lastrowid
+            if tags:
+                self._write_tags(cursor, task_id, tags)
+            self._write_words(cursor, task_id, {}, task_words(title, description))
+        self._notify("add", task_id)
+        return task_id
 
     def update_task(self, task_id: int, title: str, description: str, category: str,
-                   priority: str, due_date: Optional[str]):
-        """Обновить заголовок, описание, категорию, приоритет и срок задачи"""
+                   priority: str, due_date: Optional[str], tags: Optional[List[str]] = None):
+        """Обновить заголовок, описание, категорию, приоритет и срок задачи
+
+        tags — новый набор меток; None оставляет метки без изменений.
+        """
+        before = self._snapshot(task_id)
         with self.get_connection() as conn:
             cursor = conn.cursor()
             # Добавляем категорию в таблицу категорий, если её там нет
-            cursor.execute("INSERT OR IGNORE INTO categories (name) VALUES (?)", (category,))
-            
+            category_id = self._category_id(cursor, category)
+
+            cursor.execute("SELECT title, description FROM tasks WHERE id = ?", (task_id,))
+            row = cursor.fetchone()
+            if row is not None:
+                self._write_words(
+                    cursor, task_id, task_words(*row), task_words(title, description)
+                )
+
             cursor.execute(
                 """UPDATE tasks
-                   SET title = ?, description = ?, category = ?, priority = ?, due_date = ?
+                   SET title = ?, description = ?, category_id = ?, priority = ?, due_date = ?
                    WHERE id = ?""",
-                (title, description, category, priority, due_date, task_id)
+                (title, description, category_id, PRIORITY_CODES.get(priority, PRIORITY_NONE),
+                 due_date, task_id)
+            )
+            if tags is not None:
+                self._write_tags(cursor, task_id, tags)
+        self._notify("update", task_id, before)
+
+    def set_task_tags(self, task_id: int, tags: List[str]):
+        """Заменить набор меток задачи"""
+        before = self._snapshot(task_id)
+        with self.get_connection() as conn:
+            self._write_tags(conn.cursor(), task_id, tags)
+        self._notify("update", task_id, before)
+
+    def _write_tags(self, cursor, task_id: int, tags: List[str]):
+        """Записать только разницу между старым и новым набором меток задачи"""
+        wanted = {normalize_tag(name) for name in tags} - {""}
+        cursor.execute("""
+            SELECT t.id, t.name FROM task_tags tt JOIN tags t ON t.id = tt.tag_id
+            WHERE tt.task_id = ?
+        """, (task_id,))
+        current = {name: tag_id for tag_id, name in cursor.fetchall()}
+        for name in current.keys() - wanted:
+            cursor.execute(
+                "DELETE FROM task_tags WHERE tag_id = ? AND task_id = ?",
+                (current[name], task_id),
+            )
+        for name in wanted - current.keys():
+            cursor.execute("INSERT OR IGNORE INTO tags (name) VALUES (?)", (name,))
+            cursor.execute(
+                "INSERT INTO task_tags (tag_id, task_id) SELECT id, ? FROM tags WHERE name = ?",
+                (task_id, name),
+            )
+
+    def get_tags(self) -> List[Tuple[str, int]]:
+        """Метки, у которых есть задачи: (имя, число задач) по убыванию числа"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT name, task_count FROM tags WHERE task_count > 0 "
+                "ORDER BY task_count DESC, name"
             )
+            return cursor.fetchall()
+
+    def _attach_tags(self, cursor, tasks: List[Task]):
+        """Подставить метки задачам одним запросом на пачку id (индекс по task_id)"""
+        by_id = {task.id: task for task in tasks}
+        ids = list(by_id)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(f"""
+                SELECT tt.task_id, t.name FROM task_tags tt JOIN tags t ON t.id = tt.tag_id
+                WHERE tt.task_id IN ({placeholders})
+                ORDER BY t.name
+            """, chunk)
+            for task_id, name in cursor.fetchall():
+                by_id[task_id].tags.append(name)
 
     def update_task_status(self, task_id: int, status: str):
-        """Обновить статус задачи"""
+        """Обновить статус задачи (status — одно из STATUSES, иначе ValueError)"""
+        code = _status_code(status)
+        before = self._snapshot(task_id)
         with self.get_connection() as conn:
             completed = 1 if status == "выполнено" else 0
+            completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S") if completed else None
             conn.execute(
-                "UPDATE tasks SET status = ?, completed = ? WHERE id = ?",
-                (status, completed, task_id)
+                """UPDATE tasks SET status = ?, completed = ?,
+                          completed_at = CASE WHEN ? THEN COALESCE(completed_at, ?) END
+                   WHERE id = ?""",
+                (code, completed, completed, completed_at, task_id)
             )
+        self._notify("status", task_id, before)
 
     def get_all_tasks(self) -> List[Task]:
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, title, description, completed, category, status, priority, due_date, created_at
-                FROM tasks ORDER BY id
-            """)
-            rows = cursor.fetchall()
-            return [self._row_to_task(row) for row in rows]
+        return self.query_tasks(TaskQuery())
 
-    def search_tasks(self, query: str) -> List[Task]:
-        """Поиск задач по заголовку и описанию"""
-        with self.get_connection() as conn:
-            cursor = conn.cursor()
-            search_pattern = f"%{query}%"
-            cursor.execute("""
-                SELECT id, title, description, completed, category, status, priority, due_date, created_at
-                FROM tasks
-                WHERE title LIKE ? OR description LIKE ?
-                ORDER BY id
-            """, (search_pattern, search_pattern))
-            rows = cursor.fetchall()
-            return [self._row_to_task(row) for row in rows]
+    def query_tasks(self, query: TaskQuery, sync_smart_lists: bool = True) -> List[Task]:
+        """Выполнить выборку задач одним параметризованным запросом
 
-    def filter_tasks(self, category: Optional[str] = None, priority: Optional[str] = None,
-                    status: Optional[str] = None, date_from: Optional[str] = None,
-                    date_to: Optional[str] = None, sort_order: str = "ASC") -> List[Task]:
-        """Фильтрация задач по категории, приоритету, статусу и дате"""
+        Возвращаются строки списка: описание обрезано до DESCRIPTION_PREVIEW_CHARS
+        (см. Task.description_complete), полный текст даёт get_task_by_id.
+        sync_smart_lists=False — читать состав умного списка как есть, без
+        догоняния журнала (оно пишет в БД): так выборка остаётся только чтением.
+        """
+        if query.fuzzy and query.search:
+            return self._fuzzy_query(query)
+        sparse = False
+        if query.smart_list is not None:
+            if sync_smart_lists:
+                self.sync_smart_lists()
+            sparse = self._smart_list_sparse(query.smart_list)
+        sql, params = query.compile(sparse)
         with self.get_connection() as conn:
             cursor = conn.cursor()
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            tasks = [self._row_to_task(row) for row in rows]
+            for task in tasks:
+                task.description_complete = len(task.description) < DESCRIPTION_PREVIEW_CHARS
+            self._attach_tags(cursor, tasks)
+            self._attach_subtask_counts(cursor, tasks)
+            return tasks
 
-            query = """
-                SELECT id, title, description, completed, category, status, priority, due_date, created_at
-                FROM tasks WHERE 1=1
-            """
-            params = []
+    def search_tasks(self, query: str, fuzzy: bool = False) -> List[Task]:
+        """Поиск задач по заголовку и описанию (fuzzy — с опечатками, по сходству)"""
+        return self.query_tasks(TaskQuery(search=query, fuzzy=fuzzy))
 
-            if category and category != "Все":
-                query += " AND category = ?"
-                params.append(category)
+    def fuzzy_scores(self, text: str,
+                     threshold: float = FUZZY_THRESHOLD) -> Dict[int, Tuple[float, int]]:
+        """Задачи, похожие на text: {id: (среднее сходство слов запроса, из них в заголовке)}
 
-            if priority and priority != "Все":
-                query += " AND priority = ?"
-                params.append(priority)
+        Каждое слово запроса должно найтись в задаче хотя бы с опечаткой:
+        похожие слова ищутся по триграммам словаря (он намного меньше
+        задач), короткие — ещё и на расстоянии одной правки. Затем списки
+        задач этих слов пересекаются, начиная с самого короткого. Следующие
+        слова проверяются только у оставшихся кандидатов: точечно по
+        первичному ключу или, если список задач слова короче, его чтением
+        целиком.
+        """
+        query_words = sorted(words(text))
+        if not query_words:
+            return {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            groups = []
+            for word in query_words:
+                trigrams = list(word_trigrams(word))
+                # Одна правка портит не больше MAX_TRIGRAMS_PER_EDIT триграмм слова
+                cursor.execute(f"""
+                    SELECT w.id, w.word, w.task_count,
+                           t.hits * 1.0 / (? + w.trigram_count - t.hits) AS similarity
+                    FROM (SELECT word_id, COUNT(*) AS hits FROM word_trigrams
+                          WHERE trigram IN ({', '.join('?' * len(trigrams))})
+                          GROUP BY word_id) AS t
+                    JOIN search_words w ON w.id = t.word_id
+                    WHERE w.task_count > 0 AND (
+                        similarity >= ? OR (t.hits >= ? AND abs(length(w.word) - ?) <= 1)
+                    )
+                """, [len(trigrams)] + trigrams
+                     + [threshold, len(trigrams) - MAX_TRIGRAMS_PER_EDIT, len(word)])
+                rows = cursor.fetchall()
+                if len(trigrams) <= MAX_TRIGRAMS_PER_EDIT:
+                    # У слова до трёх букв опечатка может испортить все триграммы:
+                    # похожие слова ищутся по длине среди всего словаря
+                    cursor.execute(
+                        "SELECT id, word, task_count, 0.0 FROM search_words "
+                        "WHERE task_count > 0 AND length(word) BETWEEN ? AND ?",
+                        (len(word) - 1, len(word) + 1),
+                    )
+                    rows += cursor.fetchall()
+                group = {}
+                task_count = 0
+                for word_id, candidate, count, sim in rows:
+                    if word_id in group:
+                        continue
+                    if sim < threshold:
+                        if not within_one_edit(word, candidate):
+                            continue
+                        sim = 1 - 1 / max(len(word), len(candidate))
+                    group[word_id] = sim
+                    task_count += count
+                if not group:
+                    return {}  # Слову запроса не похоже ни одно слово задач
+                groups.append((task_count, group))
+            groups.sort(key=lambda group: group[0])
 
-            if status and status != "Все":
-                query += " AND status = ?"
-                params.append(status)
+            # {id задачи: [сумма сходства по словам запроса, слов в заголовке]}
+            shared: Dict[int, list] = {}
+            for index, (task_count, group) in enumerate(groups):
+                word_ids = list(group)
+                marks = ", ".join("?" * len(word_ids))
+                if index == 0 or task_count <= 4 * len(shared):
+                    # Короткий список задач слов дешевле прочитать целиком
+                    cursor.execute(
+                        f"SELECT task_id, word_id, in_title FROM task_words WHERE word_id IN ({marks})",
+                        word_ids,
+                    )
+                    rows = cursor.fetchall()
+                else:
+                    ids = list(shared)
+                    rows = []
+                    for start in range(0, len(ids), 500):
+                        chunk = ids[start:start + 500]
+                        cursor.execute(
+                            "SELECT task_id, word_id, in_title FROM task_words "
+                            f"WHERE word_id IN ({marks}) "
+                            f"AND task_id IN ({', '.join('?' * len(chunk))})",
+                            word_ids + chunk,
+                        )
+                        rows += cursor.fetchall()
+                best: Dict[int, Tuple[float, int]] = {}
+                for task_id, word_id, in_title in rows:
+                    match = (group[word_id], in_title)
+                    if match > best.get(task_id, (0.0, 0)):
+                        best[task_id] = match
+                if index == 0:
+                    shared = {task_id: list(match) for task_id, match in best.items()}
+                else:
+                    shared = {task_id: [score + best[task_id][0], in_title + best[task_id][1]]
+                              for task_id, (score, in_title) in shared.items() if task_id in best}
+                if not shared:
+                    return {}
+        return {
+            task_id: (score / len(query_words), in_title)
+            for task_id, (score, in_title) in shared.items()
+        }
 
-            if date_from:
-                query += " AND due_date >= ?"
-                params.append(date_from)
+    def _fuzzy_query(self, query: TaskQuery) -> List[Task]:
+        """Нечёткий поиск с фильтрами: сначала самые похожие, затем по числу
+        совпадений в заголовке и по id; after и limit режут ранжированный список
+        (ранг задачи не хранится в Task, поэтому курсором служит её id — последний
+        ключ любого курсора)
 
-            if date_to:
-                query += " AND due_date <= ?"
-                params.append(date_to)
+        Фильтры проверяются пачками по ранжированному списку, пока не
+        наберётся страница, строки задач читаются лишь для неё.
+        """
+        scores = self.fuzzy_scores(query.search)
+        if not scores:
+            return []
+        ranked = sorted(scores, key=lambda task_id: (-scores[task_id][0], -scores[task_id][1], task_id))
+        start = 0
+        if query.after is not None:
+            after_id = query.after[-1]
+            start = ranked.index(after_id) + 1 if after_id in scores else len(ranked)
+        batch = max(4 * (query.limit or 0), 200)
+        page: List[int] = []
+        with self.get_connection() as conn:
+            while start < len(ranked) and (query.limit is None or len(page) < query.limit):
+                candidates = ranked[start:start + batch]
+                start += batch
+                sql, params = replace(
+                    query, search=None, fuzzy=False, after=None, limit=None, sort="oldest",
+                    task_ids=tuple(candidates),
+                ).compile()
+                matching = {row[0] for row in conn.execute(f"SELECT id FROM ({sql})", params)}
+                page += [task_id for task_id in candidates if task_id in matching]
+                batch *= 2
+        if query.limit is not None:
+            page = page[:query.limit]
+        if not page:
+            return []
+        tasks = self.query_tasks(TaskQuery(task_ids=tuple(page), include_archive=query.include_archive))
+        by_id = {task.id: task for task in tasks}
+        return [by_id[task_id] for task_id in page if task_id in by_id]
 
-            # Добавляем сортировку
-            if sort_order.upper() == "DESC":
-                query += " ORDER BY id DESC"
-            else:
-                query += " ORDER BY id ASC"
+    def filter_tasks(self, category: Optional[str] = None, priority: Optional[str] = None,
+                    status: Optional[str] = None, date_from: Optional[str] = None,
+                    date_to: Optional[str] = None, sort_order: str = "ASC",
+                    sort: Optional[str] = None, limit: Optional[int] = None,
+                    after: Optional[tuple] = None, tags: Tuple[str, ...] = (),
+                    exclude_tags: Tuple[str, ...] = ()) -> List[Task]:
+        """Фильтрация задач по категории, приоритету, статусу, дате и меткам
 
-            cursor.execute(query, params)
-            rows = cursor.fetchall()
-            return [self._row_to_task(row) for row in rows]
+        sort — режим из SORT_KEYS (по умолчанию по id согласно sort_order).
+        limit и after задают keyset-пагинацию: after — курсор последней задачи
+        предыдущей страницы (sort_cursor), следующая страница начинается сразу после неё.
+        tags — задача должна иметь все эти метки, exclude_tags — ни одной из них.
+        """
+        if sort is None:
+            sort = "newest" if sort_order.upper() == "DESC" else "oldest"
+        return self.query_tasks(TaskQuery(
+            category=category, priority=priority, status=status,
+            date_from=date_from, date_to=date_to,
+            sort=sort, limit=limit, after=after,
+            tags=tuple(normalize_tag(name) for name in tags),
+            exclude_tags=tuple(normalize_tag(name) for name in exclude_tags),
+        ))
 
     def get_categories(self) -> List[str]:
         """Получить список всех категорий из таблицы категорий"""
@@ -207,44 +1124,504 @@ class TodoDatabase:
             cursor.execute("SELECT name FROM categories ORDER BY name")
             return [row[0] for row in cursor.fetchall()]
 
+    def add_category(self, name: str) -> int:
+        """Добавить категорию; sqlite3.IntegrityError, если такая уже есть"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO categories (name) VALUES (?)", (name,))
+            return cursor.lastrowid
+
+    def get_title_counts(self) -> List[Tuple[str, int]]:
+        """Заголовки задач (вместе с архивом) и сколько задач с каждым"""
+        with self.get_connection() as conn:
+            return conn.execute("""
+                SELECT title, COUNT(*) FROM (
+                    SELECT title FROM tasks UNION ALL SELECT title FROM tasks_archive
+                ) GROUP BY title
+            """).fetchall()
+
     def delete_category(self, category_name: str):
         """Удалить категорию из таблицы категорий"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            # Удаляем категорию
-            cursor.execute("DELETE FROM categories WHERE name = ?", (category_name,))
+            cursor.execute("SELECT id FROM categories WHERE name = ?", (category_name,))
+            row = cursor.fetchone()
+            if row is None:
+                return
             # Обновляем задачи с этой категорией на "Без категории"
-            cursor.execute("UPDATE tasks SET category = 'Без категории' WHERE category = ?", (category_name,))
+            default_id = self._category_id(cursor, "Без категории")
+            if row[0] == default_id:
+                return
+            for table in ("tasks", "tasks_archive"):
+                cursor.execute(
+                    f"UPDATE {table} SET category_id = ? WHERE category_id = ?", (default_id, row[0])
+                )
+            # Удаляем категорию
+            cursor.execute("DELETE FROM categories WHERE id = ?", (row[0],))
             conn.commit()
+        # Задачи сменили категорию одним UPDATE: подписчики перечитывают всё
+        self._notify("reload", 0)
 
     def toggle_task(self, task_id: int):
+        before = self._snapshot(task_id)
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT completed FROM tasks WHERE id = ?", (task_id,))
             result = cursor.fetchone()
             if result:
                 new_completed = not bool(result[0])
-                new_status = "выполнено" if new_completed else "не выполнено"
+                new_status = STATUS_CODES["выполнено" if new_completed else "не выполнено"]
+                completed_at = (
+                    datetime.now().strftime("%Y-%m-%d %H:%M:%S") if new_completed else None
+                )
                 conn.execute(
-                    "UPDATE tasks SET completed = ?, status = ? WHERE id = ?",
-                    (new_completed, new_status, task_id)
+                    "UPDATE tasks SET completed = ?, status = ?, completed_at = ? WHERE id = ?",
+                    (new_completed, new_status, completed_at, task_id)
                 )
+        self._notify("status", task_id, before)
 
     def delete_task(self, task_id: int):
+        """Удалить задачу вместе со всеми её подзадачами"""
+        ids = self.get_subtree_ids(task_id) or [task_id]
+        befores = {tid: self._snapshot(tid) for tid in ids}
+        placeholders = ", ".join("?" * len(ids))
         with self.get_connection() as conn:
-            conn.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
+            cursor = conn.cursor()
+            for table in ("tasks", "tasks_archive"):
+                cursor.execute(
+                    f"SELECT id, title, description FROM {table} WHERE id IN ({placeholders})", ids
+                )
+                for tid, title, description in cursor.fetchall():
+                    self._write_words(cursor, tid, task_words(title, description), {})
+            conn.execute(f"DELETE FROM tasks WHERE id IN ({placeholders})", ids)
+            conn.execute(f"DELETE FROM tasks_archive WHERE id IN ({placeholders})", ids)
+            conn.execute(f"DELETE FROM task_tags WHERE task_id IN ({placeholders})", ids)
+        for tid in ids:
+            self._notify("delete", tid, befores[tid])
+
+    def archive_completed(self, days: int, batch_size: int = 500,
+                          max_batches: Optional[int] = None) -> int:
+        """Перенести задачи, выполненные раньше чем days дней назад, в архив
 
-    def get_task_by_id(self, task_id: int) -> Optional[Task]:
+        Перенос идёт пачками по batch_size строк, каждая пачка — отдельная
+        транзакция. max_batches ограничивает число пачек за вызов, чтобы GUI
+        мог архивировать понемногу в простое. Задачи без completed_at (отмеченные
+        выполненными до появления колонки) не переносятся: время их выполнения
+        неизвестно. Возвращает число перенесённых задач.
+        """
+        cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+        archived_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        moved = 0
+        batches = 0
+        while max_batches is None or batches < max_batches:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(f"""
+                    SELECT id FROM tasks
+                    WHERE status = {STATUS_DONE} AND completed_at < ?
+                      AND NOT EXISTS (SELECT 1 FROM tasks c WHERE c.parent_id = tasks.id)
+                    LIMIT ?
+                """, (cutoff, batch_size))
+                ids = [row[0] for row in cursor.fetchall()]
+                if not ids:
+                    break
+                placeholders = ", ".join("?" * len(ids))
+                cursor.execute(f"""
+                    INSERT OR REPLACE INTO tasks_archive ({TASK_COLUMNS}, completed_at, archived_at)
+                    SELECT {TASK_COLUMNS}, completed_at, ? FROM tasks WHERE id IN ({placeholders})
+                """, [archived_at] + ids)
+                cursor.execute(f"DELETE FROM tasks WHERE id IN ({placeholders})", ids)
+            for task_id in ids:
+                self._notify("archive", task_id)
+            moved += len(ids)
+            batches += 1
+            if len(ids) < batch_size:
+                break
+        return moved
+
+    def restore_task(self, task_id: int):
+        """Вернуть задачу из архива в основную таблицу"""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                SELECT id, title, description, completed, category, status, priority, due_date, created_at
-                FROM tasks WHERE id = ?
+            cursor.execute(f"""
+                INSERT OR IGNORE INTO tasks ({TASK_COLUMNS}, completed_at)
+                SELECT {TASK_COLUMNS}, completed_at FROM tasks_archive WHERE id = ?
             """, (task_id,))
+            restored = cursor.rowcount > 0
+            cursor.execute("DELETE FROM tasks_archive WHERE id = ?", (task_id,))
+        if restored:
+            self._notify("restore", task_id)
+
+    def get_subtasks(self, parent_id: int) -> List[Task]:
+        """Прямые подзадачи задачи (для ленивого раскрытия в списке)"""
+        return self.query_tasks(TaskQuery(parent_id=parent_id))
+
+    def get_subtree_ids(self, task_id: int) -> List[int]:
+        """id задачи и всех её потомков (пустой список, если задачи нет)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(SUBTREE_CTE + "SELECT id FROM subtree", (task_id,))
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_subtree(self, task_id: int) -> List[Tuple[int, Task]]:
+        """Всё поддерево одним рекурсивным запросом: пары (глубина, задача)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                SUBTREE_CTE + f"""
+                SELECT {", ".join("t." + col for col in TASK_COLUMNS.split(", "))}, s.depth
+                FROM subtree s JOIN tasks t ON t.id = s.id
+                ORDER BY s.depth, t.id
+                """,
+                (task_id,),
+            )
+            rows = cursor.fetchall()
+            tasks = [self._row_to_task(row[:-1]) for row in rows]
+            self._attach_tags(cursor, tasks)
+            self._attach_subtask_counts(cursor, tasks)
+            return [(row[-1], task) for row, task in zip(rows, tasks)]
+
+    def get_completion(self, task_id: int) -> Tuple[int, int]:
+        """Свёртка выполнения по поддереву: (выполнено, всего подзадач)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                SUBTREE_CTE + f"""
+                SELECT COALESCE(SUM(t.status = {STATUS_DONE}), 0), COUNT(*)
+                FROM subtree s JOIN tasks t ON t.id = s.id
+                WHERE s.depth > 0
+                """,
+                (task_id,),
+            )
+            return tuple(cursor.fetchone())
+
+    def set_status_cascade(self, task_id: int, status: str):
+        """Установить статус задаче и всему её поддереву одним UPDATE"""
+        code = _status_code(status)
+        ids = self.get_subtree_ids(task_id) if self._listeners else []
+        befores = {tid: self._snapshot(tid) for tid in ids}
+        completed = 1 if status == "выполнено" else 0
+        completed_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S") if completed else None
+        with self.get_connection() as conn:
+            conn.execute(
+                SUBTREE_CTE + """
+                UPDATE tasks SET status = ?, completed = ?,
+                       completed_at = CASE WHEN ? THEN COALESCE(completed_at, ?) END
+                WHERE id IN (SELECT id FROM subtree)
+                """,
+                (task_id, code, completed, completed, completed_at),
+            )
+        for tid in ids:
+            self._notify("status", tid, befores[tid])
+
+    def _attach_subtask_counts(self, cursor, tasks: List[Task]):
+        """Подставить свёртку подзадач (всего/выполнено) одним рекурсивным запросом"""
+        by_id = {task.id: task for task in tasks if not task.archived}
+        ids = list(by_id)
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            placeholders = ", ".join("?" * len(chunk))
+            cursor.execute(f"""
+                WITH RECURSIVE descendants(root, id) AS (
+                    SELECT parent_id, id FROM tasks WHERE parent_id IN ({placeholders})
+                    UNION ALL
+                    SELECT d.root, t.id FROM tasks t JOIN descendants d ON t.parent_id = d.id
+                )
+                SELECT d.root, COUNT(*), SUM(t.status = {STATUS_DONE})
+                FROM descendants d JOIN tasks t ON t.id = d.id
+                GROUP BY d.root
+            """, chunk)
+            for root, total, done in cursor.fetchall():
+                by_id[root].subtasks_total = total
+                by_id[root].subtasks_done = done
+
+    def get_upcoming_deadlines(self, since: str) -> List[Tuple[int, str, str]]:
+        """Невыполненные задачи со сроком не раньше since: (id, заголовок, срок) по возрастанию срока"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT id, title, due_date FROM tasks
+                WHERE due_date >= ? AND status != {STATUS_DONE}
+                ORDER BY due_date
+            """, (since,))
+            return cursor.fetchall()
+
+    def get_month_summary(self, year: int, month: int) -> Dict[str, Tuple[int, Optional[int]]]:
+        """Сводка по дням месяца: {ГГГГ-ММ-ДД: (число задач, лучший ранг приоритета
+        среди невыполненных или None)} — один GROUP BY по диапазону сроков"""
+        start = f"{year:04d}-{month:02d}-01"
+        end = f"{year + 1:04d}-01-01" if month == 12 else f"{year:04d}-{month + 1:02d}-01"
+        return self._day_summary(start, end)
+
+    def get_day_summary(self, day: str) -> Tuple[int, Optional[int]]:
+        """Сводка за один день ГГГГ-ММ-ДД: (число задач, лучший ранг приоритета)"""
+        next_day = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+        return self._day_summary(day, next_day).get(day, (0, None))
+
+    def _day_summary(self, start: str, end: str) -> Dict[str, Tuple[int, Optional[int]]]:
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"""
+                SELECT date(due_date) AS day, COUNT(*),
+                       MIN(CASE WHEN status != {STATUS_DONE} THEN {PRIORITY_RANK_SQL} END)
+                FROM tasks
+                WHERE due_date >= ? AND due_date < ?
+                GROUP BY day
+            """, (start, end))
+            return {day: (count, rank) for day, count, rank in cursor.fetchall() if day}
+
+    @staticmethod
+    def _uncategorized_id(cursor) -> Optional[int]:
+        """id категории "Без категории" (None, если её нет) — без записи в БД"""
+        cursor.execute("SELECT id FROM categories WHERE name = 'Без категории'")
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def get_report_groups(self) -> List[Tuple[Optional[int], str, int, int]]:
+        """Группы отчёта: (id категории, имя категории, код статуса, число задач)
+        по имени категории и статусу
+
+        Задачи без категории (NULL или id удалённой) входят в группу категории
+        "Без категории", чтобы в отчёте не было двух разделов с одним именем.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            uncategorized = self._uncategorized_id(cursor)
+            cursor.execute("""
+                SELECT COALESCE(c.id, ?) AS category_id, COALESCE(c.name, 'Без категории') AS name,
+                       t.status, COUNT(*)
+                FROM tasks t LEFT JOIN categories c ON c.id = t.category_id
+                GROUP BY 1, t.status
+                ORDER BY name, t.status
+            """, (uncategorized,))
+            return cursor.fetchall()
+
+    def iter_report_rows(self, category_id: Optional[int], status: int,
+                         chunk_size: int = 1000) -> Iterator[List[tuple]]:
+        """Задачи группы отчёта пачками по chunk_size: (id, заголовок, описание,
+        код приоритета, срок, создана, выполнена, родитель, метки через пробел)
+
+        Каждая пачка — отдельный короткий запрос с курсором по id (индекс по
+        статусу содержит rowid), поэтому между пачками БД не заблокирована.
+        Группа "Без категории" включает задачи с NULL и с id удалённой категории.
+        """
+        with self.get_connection() as conn:
+            uncategorized = self._uncategorized_id(conn.cursor())
+        category_sql = "t.category_id IS ?"
+        if category_id is None or category_id == uncategorized:
+            category_sql = ("(t.category_id IS ? OR NOT EXISTS "
+                            "(SELECT 1 FROM categories c WHERE c.id = t.category_id))")
+        last_id = 0
+        while True:
+            with self.get_connection() as conn:
+                rows = conn.execute(f"""
+                    SELECT t.id, t.title, t.description, t.priority, t.due_date,
+                           t.created_at, t.completed_at, t.parent_id,
+                           (SELECT group_concat(name, ' ') FROM (
+                                SELECT tg.name FROM task_tags tt JOIN tags tg ON tg.id = tt.tag_id
+                                WHERE tt.task_id = t.id ORDER BY tg.name))
+                    FROM tasks t
+                    WHERE t.status = ? AND {category_sql} AND t.id > ?
+                    ORDER BY t.id
+                    LIMIT ?
+                """, (status, category_id, last_id, chunk_size)).fetchall()
+            if not rows:
+                return
+            yield rows
+            if len(rows) < chunk_size:
+                return
+            last_id = rows[-1][0]
+
+    # --- Умные списки ---
+
+    @staticmethod
+    def _smart_list_query(smart_list: SmartList, today: date) -> TaskQuery:
+        """Выборка задач умного списка на день today"""
+        date_from = date_to = None
+        if smart_list.due_within_days is not None:
+            date_from = today.isoformat()
+            date_to = f"{today + timedelta(days=smart_list.due_within_days)} 23:59:59"
+        return TaskQuery(
+            category=smart_list.category, priority=smart_list.priority,
+            status=smart_list.status, exclude_status=smart_list.exclude_status,
+            tags=tuple(smart_list.tags), exclude_tags=tuple(smart_list.exclude_tags),
+            date_from=date_from, date_to=date_to,
+        )
+
+    @staticmethod
+    def _smart_list_from_row(row) -> SmartList:
+        list_id, name, filters, task_count = row
+        values = json.loads(filters)
+        for key in ("tags", "exclude_tags"):
+            values[key] = tuple(values.get(key, ()))
+        return SmartList(name=name, id=list_id, task_count=task_count, **values)
+
+    def add_smart_list(self, smart_list: SmartList) -> int:
+        """Сохранить умный список и сразу посчитать его состав
+
+        sqlite3.IntegrityError, если список с таким именем уже есть.
+        """
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "INSERT INTO smart_lists (name, filters) VALUES (?, ?)",
+                (smart_list.name, self._smart_list_filters(smart_list)),
+            )
+            list_id = cursor.lastrowid
+            self._rebuild_smart_list(cursor, list_id, smart_list)
+        return list_id
+
+    def update_smart_list(self, smart_list: SmartList):
+        """Изменить имя и фильтры умного списка (состав пересчитывается)"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE smart_lists SET name = ?, filters = ? WHERE id = ?",
+                (smart_list.name, self._smart_list_filters(smart_list), smart_list.id),
+            )
+            self._rebuild_smart_list(cursor, smart_list.id, smart_list)
+
+    def delete_smart_list(self, list_id: int):
+        with self.get_connection() as conn:
+            conn.execute("DELETE FROM smart_list_members WHERE list_id = ?", (list_id,))
+            conn.execute("DELETE FROM smart_lists WHERE id = ?", (list_id,))
+
+    def get_smart_lists(self) -> List[SmartList]:
+        """Умные списки по имени с числом задач (одна таблица, без выборок по спискам)"""
+        self.sync_smart_lists()
+        with self.get_connection() as conn:
+            rows = conn.execute(
+                "SELECT id, name, filters, task_count FROM smart_lists ORDER BY name"
+            ).fetchall()
+        return [self._smart_list_from_row(row) for row in rows]
+
+    def sync_smart_lists(self):
+        """Догнать состав умных списков по журналу task_changes
+
+        Пересматриваются только задачи, изменённые после synced_seq списка,
+        в том числе другими процессами и сторонними скриптами. Список
+        пересчитывается целиком, если нужные записи журнала уже удалены,
+        изменений слишком много или его сроки считаются от сегодняшнего
+        дня, а день сменился.
+        """
+        today = date.today()
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT id, name, filters, task_count, synced_seq, synced_on FROM smart_lists"
+            )
+            lists = cursor.fetchall()
+            if not lists:
+                return
+            # MIN и MAX отдельными запросами: каждый по отдельности берётся из края индекса
+            first = cursor.execute("SELECT MIN(seq) FROM task_changes").fetchone()[0]
+            head = cursor.execute("SELECT MAX(seq) FROM task_changes").fetchone()[0]
+            changed: Dict[int, List[int]] = {}
+            for *row, synced_seq, synced_on in lists:
+                smart_list = self._smart_list_from_row(row)
+                stale_day = smart_list.due_within_days is not None and synced_on != today.isoformat()
+                if not stale_day and (head is None or synced_seq >= head):
+                    continue
+                if stale_day or synced_seq < first - 1:
+                    self._rebuild_smart_list(cursor, smart_list.id, smart_list, today)
+                    continue
+                if synced_seq not in changed:
+                    cursor.execute(
+                        "SELECT DISTINCT task_id FROM task_changes WHERE seq > ?", (synced_seq,)
+                    )
+                    changed[synced_seq] = [row[0] for row in cursor.fetchall()]
+                ids = changed[synced_seq]
+                if len(ids) >= self.SMART_LIST_REBUILD_AT:
+                    self._rebuild_smart_list(cursor, smart_list.id, smart_list, today)
+                    continue
+                cursor.execute(
+                    "DELETE FROM smart_list_members "
+                    "WHERE list_id = ? AND task_id IN (SELECT value FROM json_each(?))",
+                    (smart_list.id, json.dumps(ids)),
+                )
+                sql, params = replace(
+                    self._smart_list_query(smart_list, today), task_ids=tuple(ids)
+                ).compile()
+                cursor.execute(
+                    f"INSERT OR IGNORE INTO smart_list_members (list_id, task_id) "
+                    f"SELECT ?, id FROM ({sql})",
+                    [smart_list.id] + params,
+                )
+                cursor.execute(
+                    "UPDATE smart_lists SET synced_seq = ?, synced_on = ? WHERE id = ?",
+                    (head, today.isoformat(), smart_list.id),
+                )
+
+    def _smart_list_sparse(self, list_id: int) -> bool:
+        """В умном списке мало задач относительно таблицы (MAX(id) — оценка её размера)"""
+        with self.get_connection() as conn:
+            row = conn.execute("SELECT task_count FROM smart_lists WHERE id = ?", (list_id,)).fetchone()
+            top = conn.execute("SELECT MAX(id) FROM tasks").fetchone()[0] or 0
+        return row is not None and row[0] * self.SMART_LIST_SPARSE_RATIO < top
+
+    def _rebuild_smart_list(self, cursor, list_id: int, smart_list: SmartList,
+                            today: Optional[date] = None):
+        """Пересчитать состав списка целиком и отметить его актуальным на конец журнала"""
+        today = today or date.today()
+        cursor.execute("DELETE FROM smart_list_members WHERE list_id = ?", (list_id,))
+        sql, params = self._smart_list_query(smart_list, today).compile()
+        cursor.execute(
+            f"INSERT INTO smart_list_members (list_id, task_id) SELECT ?, id FROM ({sql})",
+            [list_id] + params,
+        )
+        cursor.execute(
+            "UPDATE smart_lists SET synced_seq = (SELECT COALESCE(MAX(seq), 0) FROM task_changes), "
+            "synced_on = ? WHERE id = ?",
+            (today.isoformat(), list_id),
+        )
+
+    @staticmethod
+    def _smart_list_filters(smart_list: SmartList) -> str:
+        return json.dumps(
+            {name: getattr(smart_list, name) for name in SmartList.FILTER_FIELDS},
+            ensure_ascii=False,
+        )
+
+    def get_task_by_id(self, task_id: int, include_archive: bool = True) -> Optional[Task]:
+        """Задача по id; include_archive=False — только из горячей таблицы"""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT {TASK_COLUMNS} FROM tasks WHERE id = ?", (task_id,))
             row = cursor.fetchone()
-            if row:
-                return self._row_to_task(row)
-            return None
+            if not row and include_archive:
+                # Задача могла уйти в архив
+                cursor.execute(
+                    f"SELECT {TASK_COLUMNS}, 1 FROM tasks_archive WHERE id = ?", (task_id,)
+                )
+                row = cursor.fetchone()
+            if not row:
+                return None
+            task = self._row_to_task(row)
+            self._attach_tags(cursor, [task])
+            self._attach_subtask_counts(cursor, [task])
+            return task
+
+    def get_tasks_by_ids(self, task_ids: List[int]) -> List[Task]:
+        """Полные задачи (как get_task_by_id) для набора id одним запросом на таблицу"""
+        ids = json.dumps(list(task_ids))
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                f"SELECT {TASK_COLUMNS} FROM tasks "
+                f"WHERE id IN (SELECT value FROM json_each(?))", (ids,)
+            )
+            tasks = [self._row_to_task(row) for row in cursor.fetchall()]
+            if len(tasks) < len(task_ids):
+                found = {task.id for task in tasks}
+                missing = json.dumps([task_id for task_id in task_ids if task_id not in found])
+                cursor.execute(
+                    f"SELECT {TASK_COLUMNS}, 1 FROM tasks_archive "
+                    f"WHERE id IN (SELECT value FROM json_each(?))", (missing,)
+                )
+                tasks.extend(self._row_to_task(row) for row in cursor.fetchall())
+            self._attach_tags(cursor, tasks)
+            self._attach_subtask_counts(cursor, tasks)
+            return tasks
 
     def _row_to_task(self, row) -> Task:
         """Преобразовать строку БД в объект Task"""
@@ -253,9 +1630,11 @@ class TodoDatabase:
             title=row[1],
             description=row[2] if row[2] else "",
             completed=bool(row[3]),
-            category=row[4] if len(row) > 4 else "Без категории",
-            status=row[5] if len(row) > 5 else "не выполнено",
-            priority=row[6] if len(row) > 6 else "нет",
+            category=self._category_name(row[4]),
+            status=status_name(row[5]),
+            priority=priority_name(row[6]),
             due_date=row[7] if len(row) > 7 else None,
-            created_at=row[8] if len(row) > 8 else None
+            created_at=row[8] if len(row) > 8 else None,
+            parent_id=row[9] if len(row) > 9 else None,
+            archived=bool(row[10]) if len(row) > 10 else False
         )
@@ -0,0 +1,152 @@
+# core/diagnostics.py
+
+import gc
+import time
+import tracemalloc
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional
+
+# Классы, число живых экземпляров которых отслеживается всегда
+WATCHED_CLASSES = ("Task", "TaskItem", "CanvasTaskCard", "KanbanCard", "ModernButton")
+
+
+def count_widgets(widget) -> int:
+    """Число Tk-виджетов в дереве, включая сам widget"""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def count_tcl_commands(root) -> int:
+    """Число команд Tcl: растёт, если привязки и after() не освобождают колбэки"""
+    return len(root.tk.splitlist(root.tk.call("info", "commands")))
+
+
+def count_objects(class_names=WATCHED_CLASSES) -> Dict[str, int]:
+    """Живые объекты Python указанных классов (после сборки мусора)"""
+    gc.collect()
+    wanted = set(class_names)
+    counts = Counter(
+        type(obj).__name__ for obj in gc.get_objects() if type(obj).__name__ in wanted
+    )
+    return {name: counts.get(name, 0) for name in class_names}
+
+
+@dataclass
+class Sample:
+    """Замер состояния процесса после очередного цикла обновления"""
+    cycle: int
+    widgets: int
+    tcl_commands: int
+    objects: Dict[str, int]
+    snapshot: Optional[tracemalloc.Snapshot] = None
+    taken_at: float = field(default_factory=time.time)
+
+    @property
+    def traced_kb(self) -> int:
+        if self.snapshot is None:
+            return 0
+        return sum(stat.size for stat in self.snapshot.statistics("filename")) // 1024
+
+
+class LeakDetector:
+    """Поиск утечек виджетов и памяти по серии циклов обновления списка
+
+    Каждые every циклов делается замер: живые виджеты, команды Tcl,
+    экземпляры отслеживаемых классов и снимок tracemalloc. Первый замер —
+    базовый; если следующий превышает его больше чем на порог, формируется
+    отчёт и передаётся в on_report.
+    """
+
+    def __init__(self, root, every: int = 100, widget_threshold: int = 50,
+                 object_threshold: int = 100, memory_threshold_kb: int = 2048,
+                 on_report: Optional[Callable[[str], None]] = None):
+        self.root = root
+        self.every = max(1, every)
+        self.widget_threshold = widget_threshold
+        self.object_threshold = object_threshold
+        self.memory_threshold_kb = memory_threshold_kb
+        self.on_report = on_report or print
+        self.cycle = 0
+        self.baseline: Optional[Sample] = None
+        self.samples: List[Sample] = []
+        self.reports: List[str] = []
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(10)
+
+    def stop(self):
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def on_refresh(self):
+        """Отметить завершённый цикл обновления (вызывается после перерисовки списка)"""
+        self.cycle += 1
+        if self.cycle % self.every == 0:
+            self.check()
+
+    def sample(self) -> Sample:
+        """Сделать замер сейчас"""
+        self.root.update_idletasks()
+        return Sample(
+            cycle=self.cycle,
+            widgets=count_widgets(self.root),
+            tcl_commands=count_tcl_commands(self.root),
+            objects=count_objects(),
+            snapshot=tracemalloc.take_snapshot() if tracemalloc.is_tracing() else None,
+        )
+
+    def check(self) -> Optional[str]:
+        """Сравнить новый замер с базовым; вернуть отчёт, если рост выше порогов"""
+        current = self.sample()
+        self.samples.append(current)
+        if self.baseline is None:
+            self.baseline = current
+            return None
+        report = self._compare(self.baseline, current)
+        if report:
+            self.reports.append(report)
+            self.on_report(report)
+        return report
+
+    def _compare(self, base: Sample, current: Sample) -> Optional[str]:
+        problems = []
+        widget_growth = current.widgets - base.widgets
+        if widget_growth > self.widget_threshold:
+            problems.append(f"виджеты: {base.widgets} -> {current.widgets} (+{widget_growth})")
+        tcl_growth = current.tcl_commands - base.tcl_commands
+        if tcl_growth > self.widget_threshold:
+            problems.append(
+                f"команды Tcl: {base.tcl_commands} -> {current.tcl_commands} (+{tcl_growth})"
+            )
+        for name, count in current.objects.items():
+            growth = count - base.objects.get(name, 0)
+            if growth > self.object_threshold:
+                problems.append(f"{name}: {base.objects.get(name, 0)} -> {count} (+{growth})")
+        memory_growth = current.traced_kb - base.traced_kb
+        if memory_growth > self.memory_threshold_kb:
+            problems.append(
+                f"память Python: {base.traced_kb} KB -> {current.traced_kb} KB (+{memory_growth} KB)"
+            )
+        if not problems:
+            return None
+
+        lines = [f"⚠ Возможная утечка: циклы {base.cycle} -> {current.cycle}"]
+        lines += [f"  {line}" for line in problems]
+        if base.snapshot is not None and current.snapshot is not None:
+            lines.append("  Наибольший рост памяти по строкам:")
+            for stat in current.snapshot.compare_to(base.snapshot, "lineno")[:10]:
+                lines.append(f"    {stat}")
+        return "\n".join(lines)
+
+    def summary(self) -> str:
+        """Таблица всех замеров серии"""
+        names = list(WATCHED_CLASSES)
+        lines = [
+            f"{'cycle':>7}{'widgets':>9}{'tcl':>7}{'KB':>9}  "
+            + " ".join(f"{name:>14}" for name in names)
+        ]
+        for s in self.samples:
+            lines.append(
+                f"{s.cycle:>7}{s.widgets:>9}{s.tcl_commands:>7}{s.traced_kb:>9}  "
+                + " ".join(f"{s.objects.get(name, 0):>14}" for name in names)
+            )
+        return "\n".join(lines)
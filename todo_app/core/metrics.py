@@ -0,0 +1,73 @@
+# core/metrics.py
+
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from typing import Dict, List
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Перцентиль q (0..100) по отсортированной копии значений"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+class Metrics:
+    """Счётчики событий и замеры времени для диагностики производительности"""
+
+    def __init__(self):
+        self.counters: Counter = Counter()
+        self.timings: Dict[str, List[float]] = defaultdict(list)
+
+    def incr(self, name: str, amount: int = 1):
+        self.counters[name] += amount
+
+    def record(self, name: str, seconds: float):
+        self.timings[name].append(seconds)
+
+    @contextmanager
+    def timer(self, name: str):
+        """Замерить время выполнения блока with"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(name, time.perf_counter() - start)
+
+    def summary(self, name: str) -> dict:
+        """Сводка по замерам: количество, среднее и перцентили в миллисекундах"""
+        values = [v * 1000 for v in self.timings.get(name, [])]
+        if not values:
+            return {"count": 0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "p99": 0.0, "max": 0.0}
+        return {
+            "count": len(values),
+            "mean": sum(values) / len(values),
+            "p50": percentile(values, 50),
+            "p90": percentile(values, 90),
+            "p99": percentile(values, 99),
+            "max": max(values),
+        }
+
+    def report(self) -> str:
+        """Текстовый отчёт по всем счётчикам и замерам"""
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            lines.append(f"{name}: {value}")
+        for name in sorted(self.timings):
+            s = self.summary(name)
+            lines.append(
+                f"{name}: n={s['count']} mean={s['mean']:.2f}ms p50={s['p50']:.2f}ms "
+                f"p90={s['p90']:.2f}ms p99={s['p99']:.2f}ms max={s['max']:.2f}ms"
+            )
+        return "\n".join(lines)
+
+    def reset(self):
+        self.counters.clear()
+        self.timings.clear()
+
+
+# Общий экземпляр для всего приложения
+metrics = Metrics()
@@ -1,9 +1,52 @@
 # core/models.py
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
 from datetime import datetime
 
+# Статусы и приоритеты хранятся в БД кодами — индексами в этих кортежах.
+# Код приоритета совпадает с его рангом (меньше — важнее). Task получает
+# строки из кортежей, поэтому все задачи разделяют одни и те же объекты str.
+STATUSES = ("не выполнено", "в процессе", "выполнено")
+PRIORITIES = ("срочно", "важно", "обычно", "нет")
+STATUS_CODES = {name: code for code, name in enumerate(STATUSES)}
+PRIORITY_CODES = {name: code for code, name in enumerate(PRIORITIES)}
+STATUS_DONE = STATUS_CODES["выполнено"]
+PRIORITY_NONE = PRIORITY_CODES["нет"]
+
+
+def _decode(names: Tuple[str, ...], codes: dict, value, default: int) -> str:
+    try:
+        return names[value] if value >= 0 else names[default]
+    except (IndexError, TypeError):
+        # Сторонний скрипт мог записать в ту же БД текст или чужой код
+        return names[codes.get(value, default)] if isinstance(value, str) else names[default]
+
+
+def status_name(code) -> str:
+    """Статус по коду из БД (неизвестное значение — "не выполнено")"""
+    return _decode(STATUSES, STATUS_CODES, code, 0)
+
+
+def priority_name(code) -> str:
+    """Приоритет по коду из БД (неизвестное значение — "нет")"""
+    return _decode(PRIORITIES, PRIORITY_CODES, code, PRIORITY_NONE)
+
+# Форматы, в которых в БД хранится срок выполнения
+DUE_DATE_FORMATS = ("%Y-%m-%d %H:%M:%S", "%Y-%m-%d %H:%M")
+
+
+def parse_due_date(value: Optional[str]) -> Optional[datetime]:
+    """Разобрать срок выполнения из строки БД (с секундами или без)"""
+    if not value:
+        return None
+    for fmt in DUE_DATE_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    return None
+
 @dataclass
 class Task:
     id: Optional[int]
@@ -15,6 +58,14 @@ class Task:
     priority: str = "нет"  # срочно, важно, обычно, нет
     due_date: Optional[str] = None  # дата и время выполнения в формате "YYYY-MM-DD HH:MM"
     created_at: Optional[str] = None  # дата создания
+    archived: bool = False  # задача перенесена в архив (tasks_archive)
+    tags: List[str] = field(default_factory=list)  # метки задачи (таблица task_tags)
+    parent_id: Optional[int] = None  # родительская задача (None — задача верхнего уровня)
+    subtasks_total: int = 0  # число подзадач во всём поддереве
+    subtasks_done: int = 0  # из них выполнено
+    # False — в description только начало текста (строка списка, см. LIST_COLUMNS);
+    # полный текст загружает get_task_by_id
+    description_complete: bool = True
 
     def get_priority_color(self) -> tuple:
         """Возвращает цвет фона в зависимости от приоритета"""
@@ -29,12 +80,48 @@ class Task:
         }
         return priority_colors.get(self.priority, (1, 1, 1, 1))
 
+    def get_completion_percent(self) -> Optional[int]:
+        """Процент выполненных подзадач поддерева (None, если подзадач нет)"""
+        if not self.subtasks_total:
+            return None
+        return round(100 * self.subtasks_done / self.subtasks_total)
+
     def is_overdue(self) -> bool:
         """Проверяет, просрочена ли задача"""
         if not self.due_date or self.status == "выполнено":
             return False
-        try:
-            due = datetime.strptime(self.due_date, "%Y-%m-%d %H:%M")
-            return datetime.now() > due
-        except:
+        due = parse_due_date(self.due_date)
+        if due is None:
             return False
+        return datetime.now() > due
+
+
+@dataclass
+class TaskChange:
+    """Изменение задачи, о котором TodoDatabase сообщает подписчикам"""
+    action: str  # add, update, status, delete, archive, restore, reload (перечитать всё)
+    task_id: int
+    before: Optional[Task] = None  # состояние до изменения (None для add)
+    after: Optional[Task] = None  # состояние после изменения (None для delete)
+    external: bool = False  # изменение сделано другим процессом (см. ExternalChangeWatcher)
+
+
+@dataclass
+class SmartList:
+    """Сохранённый набор фильтров (умный список) и число задач в нём"""
+    name: str
+    category: Optional[str] = None
+    priority: Optional[str] = None
+    status: Optional[str] = None
+    exclude_status: Optional[str] = None  # например, "выполнено" — только невыполненные
+    tags: Tuple[str, ...] = ()
+    exclude_tags: Tuple[str, ...] = ()
+    due_within_days: Optional[int] = None  # срок от сегодня до сегодня + N дней
+    id: Optional[int] = None
+    task_count: int = 0  # поддерживается в БД при изменении задач
+
+    # Поля, которые хранятся в БД как фильтры списка
+    FILTER_FIELDS = (
+        "category", "priority", "status", "exclude_status", "tags", "exclude_tags",
+        "due_within_days",
+    )
@@ -0,0 +1,166 @@
+# core/prefetch.py
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from dataclasses import replace
+from typing import Iterable, List, Optional
+
+from .database import TaskQuery
+from .metrics import metrics
+from .models import Task, TaskChange
+
+
+def _copy(task: Task) -> Task:
+    """Копия задачи из кэша: вызывающий может менять её, не трогая кэш"""
+    return replace(task, tags=list(task.tags))
+
+
+class QueryPrefetcher:
+    """Упреждающая загрузка выборок, которые пользователь вероятно откроет следующими
+
+    GUI после показа списка передаёт в prefetch() предполагаемые следующие
+    выборки (следующая страница, переключение фильтра статуса) и id
+    видимых задач, которые могут открыть на редактирование. Фоновый поток
+    выполняет их через собственный TodoDatabase.reader() (свой кэш категорий,
+    каждый запрос — на своём соединении и только на чтение) и кладёт в
+    небольшой LRU-кэш; get() и get_task() отдают копии готового результата
+    без SQLite.
+
+    Любое изменение БД сбрасывает кэш целиком: правка одной задачи меняет
+    и страницы, и счётчики подзадач её родителей. Результат запроса,
+    который выполнялся во время изменения, отбрасывается по номеру поколения.
+    Попадания и промахи считаются в metrics (prefetch.hit / prefetch.miss).
+    """
+
+    def __init__(self, db, capacity: int = 16, task_capacity: int = 256):
+        self.db = db
+        self.capacity = capacity
+        self.task_capacity = task_capacity
+        self._pages: "OrderedDict[TaskQuery, List[Task]]" = OrderedDict()
+        self._tasks: "OrderedDict[int, Task]" = OrderedDict()
+        self._pending: deque = deque()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._wakeup = threading.Condition(self._lock)
+        self._thread: Optional[threading.Thread] = None
+        self._stopped = False
+
+    def start(self):
+        self.db.subscribe(self._on_task_change)
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, name="prefetch", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self.db.unsubscribe(self._on_task_change)
+        with self._lock:
+            self._stopped = True
+            self._pending.clear()
+            self._wakeup.notify()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        self.clear()
+
+    def clear(self):
+        """Забыть всё загруженное и отменить ещё не выполненные запросы"""
+        with self._lock:
+            self._generation += 1
+            self._pages.clear()
+            self._tasks.clear()
+            self._pending.clear()
+
+    @property
+    def hit_rate(self) -> float:
+        """Доля обращений, обслуженных из кэша"""
+        hits = metrics.counters["prefetch.hit"]
+        total = hits + metrics.counters["prefetch.miss"]
+        return hits / total if total else 0.0
+
+    # --- Чтение из кэша ---
+
+    def get(self, query: TaskQuery) -> Optional[List[Task]]:
+        """Готовая выборка (копии задач из кэша) или None (промах)"""
+        with self._lock:
+            tasks = self._pages.get(query)
+            if tasks is not None:
+                self._pages.move_to_end(query)
+                tasks = [_copy(task) for task in tasks]
+        metrics.incr("prefetch.hit" if tasks is not None else "prefetch.miss")
+        return tasks
+
+    def get_task(self, task_id: int) -> Optional[Task]:
+        """Полная задача (копия, с целым описанием) или None (промах)"""
+        with self._lock:
+            task = self._tasks.get(task_id)
+            if task is not None:
+                self._tasks.move_to_end(task_id)
+                task = _copy(task)
+        metrics.incr("prefetch.hit" if task is not None else "prefetch.miss")
+        return task
+
+    # --- Упреждающая загрузка ---
+
+    def prefetch(self, queries: Iterable[TaskQuery], task_ids: Iterable[int] = ()):
+        """Поставить выборки и задачи в очередь фоновой загрузки
+
+        Очередь от прошлого вида отбрасывается: пользователь уже ушёл с него.
+        Уже загруженное повторно не запрашивается.
+        """
+        with self._lock:
+            self._pending.clear()
+            for query in queries:
+                if query not in self._pages:
+                    self._pending.append(query)
+            ids = tuple(task_id for task_id in task_ids if task_id not in self._tasks)
+            if ids:
+                self._pending.append(ids[: self.task_capacity])
+            if self._pending:
+                self._wakeup.notify()
+
+    def _run(self):
+        # Свой экземпляр для чтения: кэш категорий потока окна не трогаем
+        reader = self.db.reader()
+        while True:
+            with self._lock:
+                while not self._pending and not self._stopped:
+                    self._wakeup.wait()
+                if self._stopped:
+                    return
+                job = self._pending.popleft()
+                generation = self._generation
+            start = time.perf_counter()
+            try:
+                if isinstance(job, TaskQuery):
+                    # Только чтение: состав умных списков догоняет поток окна
+                    # перед показом, а любая запись в БД и так сбрасывает кэш
+                    result = reader.query_tasks(job, sync_smart_lists=False)
+                else:
+                    result = reader.get_tasks_by_ids(job)
+            except sqlite3.Error:
+                metrics.incr("prefetch.error")
+                continue
+            metrics.record("prefetch.query", time.perf_counter() - start)
+            self._store(job, result, generation)
+
+    def _store(self, job, result: List[Task], generation: int):
+        with self._lock:
+            if generation != self._generation:
+                metrics.incr("prefetch.stale")
+                return
+            if isinstance(job, TaskQuery):
+                self._pages[job] = result
+                self._pages.move_to_end(job)
+                while len(self._pages) > self.capacity:
+                    self._pages.popitem(last=False)
+            else:
+                for task in result:
+                    self._tasks[task.id] = task
+                    self._tasks.move_to_end(task.id)
+                while len(self._tasks) > self.task_capacity:
+                    self._tasks.popitem(last=False)
+
+    def _on_task_change(self, change: TaskChange):
+        self.clear()
@@ -0,0 +1,118 @@
+# core/profiling.py
+
+import cProfile
+import functools
+import io
+import os
+import pstats
+import re
+import time
+from typing import Dict, Optional
+
+# Фазы, по которым раскладывается собственное время функций профиля
+PHASES = ("db", "model", "tk", "python")
+
+
+def classify(func_key) -> str:
+    """Фаза функции из записи pstats (файл, строка, имя)"""
+    filename, _, name = func_key
+    if "sqlite3" in name:
+        return "db"  # execute/fetchall/commit/connect модуля sqlite3
+    if "_tkinter.tkapp" in name or "tkinter" in filename:
+        return "tk"  # tkapp.call и обёртки tkinter: отрисовка и раскладка
+    if name in ("_row_to_task", "_attach_tags", "_attach_subtask_counts") \
+            or filename.endswith(os.path.join("core", "models.py")) \
+            or (filename == "<string>" and name == "__init__"):
+        return "model"  # строки БД -> Task (dataclass __init__ компилируется в <string>)
+    return "python"
+
+
+def phase_times(stats: pstats.Stats) -> Dict[str, float]:
+    """Собственное время (tottime) по фазам в секундах"""
+    totals = {phase: 0.0 for phase in PHASES}
+    for func_key, (_, _, tottime, _, _) in stats.stats.items():
+        totals[classify(func_key)] += tottime
+    return totals
+
+
+class ActionProfiler:
+    """Профилирование следующих N действий пользователя через cProfile
+
+    Каждое действие пишется в отдельные файлы: .prof для pstats/snakeviz и
+    .txt с разбивкой времени на фазы (БД, модель, Tk, прочий Python) и
+    топом функций. Вложенные действия (apply_filters внутри _add_task)
+    попадают в профиль внешнего.
+    """
+
+    def __init__(self, out_dir: str = "profiles"):
+        self.out_dir = out_dir
+        self.remaining = 0
+        self.sequence = 0
+        self._active = False
+
+    @property
+    def armed(self) -> bool:
+        return self.remaining > 0 and not self._active
+
+    def arm(self, actions: int, out_dir: Optional[str] = None):
+        """Профилировать следующие actions действий"""
+        if out_dir:
+            self.out_dir = out_dir
+        self.remaining = actions
+
+    def run(self, action: str, func, *args, **kwargs):
+        """Выполнить действие под профилировщиком и сохранить отчёт"""
+        self._active = True
+        self.remaining -= 1
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        try:
+            return profile.runcall(func, *args, **kwargs)
+        finally:
+            wall = time.perf_counter() - start
+            self._active = False
+            self._dump(action, profile, wall)
+
+    def _dump(self, action: str, profile: cProfile.Profile, wall: float):
+        os.makedirs(self.out_dir, exist_ok=True)
+        self.sequence += 1
+        safe_name = re.sub(r"[^\w.-]", "_", action)
+        base = os.path.join(self.out_dir, f"{self.sequence:03d}-{safe_name}")
+        profile.dump_stats(base + ".prof")
+
+        stream = io.StringIO()
+        stats = pstats.Stats(profile, stream=stream)
+        phases = phase_times(stats)
+        profiled = sum(phases.values()) or 1e-9
+        stream.write(f"Действие: {action}\n")
+        stream.write(f"Время (wall): {wall * 1000:.1f} ms\n")
+        stream.write("Фазы (собственное время функций):\n")
+        for phase in PHASES:
+            seconds = phases[phase]
+            stream.write(
+                f"  {phase:<8}{seconds * 1000:>10.1f} ms {100 * seconds / profiled:>6.1f}%\n"
+            )
+        stream.write("\n")
+        stats.sort_stats("cumulative").print_stats(30)
+        with open(base + ".txt", "w", encoding="utf-8") as f:
+            f.write(stream.getvalue())
+        print(f"Профиль '{action}': {wall * 1000:.1f} ms -> {base}.txt")
+
+
+# Общий экземпляр для всего приложения
+action_profiler = ActionProfiler()
+
+
+def profiled_action(action: str):
+    """Декоратор: действие профилируется, пока action_profiler взведён"""
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not action_profiler.armed:
+                return func(*args, **kwargs)
+            return action_profiler.run(action, func, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
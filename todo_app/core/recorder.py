@@ -0,0 +1,63 @@
+# core/recorder.py
+
+import json
+import time
+from typing import Optional
+
+
+class SessionRecorder:
+    """Запись действий пользователя в JSONL для последующего воспроизведения
+
+    Каждая строка — объект {"t": секунды от начала записи, "action": ..., ...}.
+    Пока запись не начата, record() ничего не делает.
+    """
+
+    # Действия, которые умеет воспроизводить tools/replay.py
+    ACTIONS = ("add", "edit", "filter", "search", "status", "scroll")
+
+    def __init__(self):
+        self._file = None
+        self._start = 0.0
+        self._last_filters: Optional[dict] = None
+
+    @property
+    def active(self) -> bool:
+        return self._file is not None
+
+    def start(self, path: str):
+        """Начать запись в файл path (дописывается к существующему)"""
+        self.stop()
+        self._file = open(path, "a", encoding="utf-8")
+        self._start = time.perf_counter()
+        self._last_filters = None
+
+    def stop(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def record(self, action: str, **data):
+        """Записать действие"""
+        if self._file is None:
+            return
+        entry = {"t": round(time.perf_counter() - self._start, 4), "action": action}
+        entry.update(data)
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def record_filters(self, state: dict):
+        """Записать состояние панели фильтров: "search", если изменился только поиск"""
+        if self._file is None or state == self._last_filters:
+            return
+        previous, self._last_filters = self._last_filters, dict(state)
+        only_search = previous is not None and all(
+            previous.get(key) == value for key, value in state.items() if key != "search"
+        )
+        if only_search:
+            self.record("search", search=state["search"])
+        else:
+            self.record("filter", state=state)
+
+
+# Общий экземпляр для всего приложения
+session_recorder = SessionRecorder()
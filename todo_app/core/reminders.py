@@ -0,0 +1,151 @@
+# core/reminders.py
+
+import heapq
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .models import TaskChange, parse_due_date
+
+
+class DeadlineTimer:
+    """Мин-куча сроков с единственным таймером root.after() на ближайший из них"""
+
+    # Перевзводим таймер не реже раза в час (сон системы, перевод часов)
+    MAX_DELAY_MS = 60 * 60 * 1000
+
+    def __init__(self, root, on_due: Callable[[int], None]):
+        self.root = root
+        self.on_due = on_due
+        self._heap: List[Tuple[float, int]] = []
+        # Актуальный срок по ключу: записи кучи с другим сроком считаются устаревшими
+        self._deadlines: Dict[int, float] = {}
+        self._after_id = None
+        self._armed_for: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._deadlines)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._deadlines
+
+    def load(self, items: List[Tuple[int, datetime]]):
+        """Заменить все сроки разом (одна heapify вместо N вставок)"""
+        self._deadlines = {key: when.timestamp() for key, when in items}
+        self._heap = [(ts, key) for key, ts in self._deadlines.items()]
+        heapq.heapify(self._heap)
+        self._arm()
+
+    def schedule(self, key: int, when: datetime):
+        """Добавить или перенести срок для ключа"""
+        ts = when.timestamp()
+        if self._deadlines.get(key) == ts:
+            return
+        self._deadlines[key] = ts
+        heapq.heappush(self._heap, (ts, key))
+        self._compact()
+        self._arm()
+
+    def discard(self, key: int):
+        """Убрать срок для ключа (запись в куче удалится лениво)"""
+        if self._deadlines.pop(key, None) is not None:
+            self._arm()
+
+    def clear(self):
+        """Убрать все сроки и снять таймер"""
+        self._deadlines.clear()
+        self._heap.clear()
+        self._cancel()
+
+    def _compact(self):
+        """Перестроить кучу, если в ней накопилось много устаревших записей"""
+        if len(self._heap) > 2 * len(self._deadlines) + 64:
+            self._heap = [(ts, key) for key, ts in self._deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_stale(self):
+        while self._heap and self._deadlines.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+
+    def _cancel(self):
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+        self._after_id = None
+        self._armed_for = None
+
+    def _arm(self):
+        """Взвести таймер на ближайший срок (если он изменился)"""
+        self._pop_stale()
+        if not self._heap:
+            self._cancel()
+            return
+        next_ts = self._heap[0][0]
+        if self._after_id is not None and self._armed_for == next_ts:
+            return
+        self._cancel()
+        delay = int((next_ts - time.time()) * 1000)
+        delay = max(0, min(delay, self.MAX_DELAY_MS))
+        self._armed_for = next_ts
+        self._after_id = self.root.after(delay, self._fire)
+
+    def _fire(self):
+        """Обработать все наступившие сроки и перевзвести таймер"""
+        self._after_id = None
+        self._armed_for = None
+        now = time.time()
+        due_keys = []
+        while self._heap and self._heap[0][0] <= now:
+            ts, key = heapq.heappop(self._heap)
+            if self._deadlines.get(key) == ts:
+                del self._deadlines[key]
+                due_keys.append(key)
+        for key in due_keys:
+            self.on_due(key)
+        self._arm()
+
+
+class ReminderScheduler:
+    """Напоминания о наступлении срока задач"""
+
+    def __init__(self, root, db, notify: Callable[[int, str, str], None]):
+        self.db = db
+        self.notify = notify
+        self.timer = DeadlineTimer(root, self._on_due)
+        self._info: Dict[int, Tuple[str, str]] = {}  # id -> (заголовок, срок)
+
+    def start(self):
+        """Загрузить ближайшие сроки из БД и подписаться на изменения задач"""
+        now = datetime.now()
+        items = []
+        self._info.clear()
+        for task_id, title, due_date in self.db.get_upcoming_deadlines(
+            now.strftime("%Y-%m-%d %H:%M")
+        ):
+            due = parse_due_date(due_date)
+            if due and due > now:
+                items.append((task_id, due))
+                self._info[task_id] = (title, due_date)
+        self.timer.load(items)
+        self.db.subscribe(self._on_task_change)
+
+    def stop(self):
+        """Отписаться от изменений и снять таймер"""
+        self.db.unsubscribe(self._on_task_change)
+        self.timer.clear()
+        self._info.clear()
+
+    def _on_task_change(self, change: TaskChange):
+        """Инкрементально обновить кучу по изменённой задаче"""
+        task = change.after
+        due = parse_due_date(task.due_date) if task else None
+        if task is None or due is None or task.status == "выполнено" or due <= datetime.now():
+            self._info.pop(change.task_id, None)
+            self.timer.discard(change.task_id)
+            return
+        self._info[change.task_id] = (task.title, task.due_date)
+        self.timer.schedule(change.task_id, due)
+
+    def _on_due(self, task_id: int):
+        info = self._info.pop(task_id, None)
+        if info:
+            self.notify(task_id, *info)
@@ -0,0 +1,233 @@
+# core/reports.py
+
+import csv
+import html
+import io
+import multiprocessing
+import os
+import threading
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Iterator, List, Optional
+
+from .models import priority_name, status_name
+
+# Форматы отчёта и расширения файлов
+REPORT_FORMATS = {"html": ".html", "md": ".md", "csv": ".csv"}
+
+# Колонки таблиц отчёта (в CSV перед ними идут категория и статус)
+REPORT_COLUMNS = ("id", "Задача", "Приоритет", "Срок", "Создана", "Выполнена", "Метки", "Описание")
+
+HTML_STYLE = """
+body { font-family: "Segoe UI", sans-serif; margin: 24px; color: #222; }
+table { border-collapse: collapse; margin-bottom: 16px; width: 100%; }
+th, td { border: 1px solid #ccc; padding: 4px 8px; text-align: left; vertical-align: top; }
+th { background: #f0f0f0; }
+td.desc { white-space: pre-wrap; color: #555; }
+"""
+
+
+@dataclass
+class ReportChunk:
+    """Пачка строк одной группы (категория, статус) для форматирования в процессе пула"""
+    category: str
+    status: str
+    rows: List[tuple]  # строки TodoDatabase.iter_report_rows
+    group_total: int = 0  # задач в группе (для заголовка)
+    new_category: bool = False  # первая пачка категории: нужен заголовок категории
+    new_group: bool = False  # первая пачка группы: заголовок статуса и начало таблицы
+    first: bool = False  # первая пачка отчёта
+
+
+def _cells(row: tuple) -> List[str]:
+    """Значения колонок REPORT_COLUMNS для строки отчёта"""
+    task_id, title, description, priority, due_date, created_at, completed_at, _, tags = row
+    return [
+        str(task_id), title, priority_name(priority), due_date or "", created_at or "",
+        completed_at or "", tags or "", description or "",
+    ]
+
+
+def _md_cell(value: str) -> str:
+    return value.replace("|", "\\|").replace("\r", "").replace("\n", "<br>")
+
+
+def format_header(fmt: str, groups: list, generated_at: str) -> str:
+    """Начало отчёта: заголовок и сводка по группам (строки get_report_groups)"""
+    total = sum(count for *_, count in groups)
+    if fmt == "csv":
+        out = io.StringIO()
+        csv.writer(out).writerow(("Категория", "Статус") + REPORT_COLUMNS)
+        return out.getvalue()
+    if fmt == "md":
+        lines = ["# Отчёт по задачам", "", f"Сформирован {generated_at}, задач: {total}", "",
+                 "| Категория | Статус | Задач |", "| --- | --- | ---: |"]
+        lines += [f"| {_md_cell(name)} | {status_name(status)} | {count} |"
+                  for _, name, status, count in groups]
+        return "\n".join(lines) + "\n"
+    rows = "".join(
+        f"<tr><td>{html.escape(name)}</td><td>{status_name(status)}</td><td>{count}</td></tr>\n"
+        for _, name, status, count in groups
+    )
+    return (
+        "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Отчёт по задачам</title>"
+        f"<style>{HTML_STYLE}</style></head><body>\n"
+        f"<h1>Отчёт по задачам</h1>\n<p>Сформирован {generated_at}, задач: {total}</p>\n"
+        "<table><tr><th>Категория</th><th>Статус</th><th>Задач</th></tr>\n"
+        f"{rows}</table>\n"
+    )
+
+
+def format_chunk(fmt: str, chunk: ReportChunk) -> str:
+    """Отформатировать пачку строк (выполняется в процессе пула)"""
+    if fmt == "csv":
+        out = io.StringIO()
+        writer = csv.writer(out)
+        for row in chunk.rows:
+            writer.writerow([chunk.category, chunk.status] + _cells(row))
+        return out.getvalue()
+
+    parts = []
+    if fmt == "md":
+        if chunk.new_category:
+            parts.append(f"\n## {_md_cell(chunk.category)}")
+        if chunk.new_group:
+            parts.append(f"\n### {chunk.status} ({chunk.group_total})\n")
+            parts.append("| " + " | ".join(REPORT_COLUMNS) + " |")
+            parts.append("|" + " --- |" * len(REPORT_COLUMNS))
+        for row in chunk.rows:
+            parts.append("| " + " | ".join(_md_cell(value) for value in _cells(row)) + " |")
+        return "\n".join(parts) + "\n"
+
+    if chunk.new_group and not chunk.first:
+        parts.append("</table>")
+    if chunk.new_category:
+        parts.append(f"<h2>{html.escape(chunk.category)}</h2>")
+    if chunk.new_group:
+        parts.append(f"<h3>{chunk.status} ({chunk.group_total})</h3>")
+        parts.append("<table><tr>" + "".join(f"<th>{name}</th>" for name in REPORT_COLUMNS) + "</tr>")
+    for row in chunk.rows:
+        cells = [html.escape(value) for value in _cells(row)]
+        parts.append(
+            "<tr>" + "".join(f"<td>{value}</td>" for value in cells[:-1])
+            + f"<td class=\"desc\">{cells[-1]}</td></tr>"
+        )
+    return "\n".join(parts) + "\n"
+
+
+def format_footer(fmt: str, has_rows: bool) -> str:
+    """Конец отчёта (закрыть последнюю таблицу и документ)"""
+    if fmt == "html":
+        return ("</table>\n" if has_rows else "") + "</body></html>\n"
+    return ""
+
+
+class ReportJob:
+    """Сборка отчёта по задачам в фоне
+
+    Фоновый поток читает задачи из TodoDatabase пачками по группам
+    (категория, статус), отдаёт пачки на форматирование в ProcessPoolExecutor
+    и дописывает готовый текст в файл строго по порядку. В очереди не больше
+    двух пачек на процесс, так что память не растёт с размером отчёта.
+    Форматирование идёт в других процессах и не отнимает GIL у Tk, окну
+    остаётся только опрашивать rows_done/rows_total.
+
+    Файл пишется рядом с целевым (.part) и переименовывается в конце;
+    при отмене или ошибке недописанный файл удаляется.
+    """
+
+    def __init__(self, db, path: str, fmt: str = "html", chunk_size: int = 1000,
+                 workers: Optional[int] = None):
+        if fmt not in REPORT_FORMATS:
+            raise ValueError(f"Неизвестный формат отчёта: {fmt}")
+        self.db = db
+        self.path = path
+        self.fmt = fmt
+        self.chunk_size = chunk_size
+        self.workers = workers or min(4, os.cpu_count() or 1)
+        self.rows_total = 0
+        self.rows_done = 0
+        self.error: Optional[BaseException] = None
+        self._cancel = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="report", daemon=True)
+        self._thread.start()
+
+    def cancel(self):
+        """Остановить сборку: пачки в очереди отменяются, файл удаляется"""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """Дождаться окончания; True, если сборка завершилась"""
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return not self.running
+
+    def _run(self):
+        partial = self.path + ".part"
+        try:
+            self._build(partial)
+            if self.cancelled:
+                os.remove(partial)
+            else:
+                os.replace(partial, self.path)
+        except BaseException as e:
+            self.error = e
+            if os.path.exists(partial):
+                os.remove(partial)
+
+    def _chunks(self, groups: list) -> Iterator[ReportChunk]:
+        first = True
+        previous_category = None
+        for category_id, category, status, total in groups:
+            new_group = True
+            for rows in self.db.iter_report_rows(category_id, status, self.chunk_size):
+                if self.cancelled:
+                    return
+                yield ReportChunk(
+                    category, status_name(status), rows, total,
+                    new_category=category != previous_category,
+                    new_group=new_group, first=first,
+                )
+                previous_category = category
+                new_group = first = False
+
+    def _build(self, partial: str):
+        groups = self.db.get_report_groups()
+        self.rows_total = sum(count for *_, count in groups)
+        generated_at = datetime.now().strftime("%Y-%m-%d %H:%M")
+        # spawn: дочерние процессы не наследуют состояние Tk и потоков GUI
+        context = multiprocessing.get_context("spawn")
+        with open(partial, "w", encoding="utf-8", newline="") as out, \
+                ProcessPoolExecutor(self.workers, mp_context=context) as pool:
+            out.write(format_header(self.fmt, groups, generated_at))
+            pending = deque()
+            for chunk in self._chunks(groups):
+                pending.append((pool.submit(format_chunk, self.fmt, chunk), len(chunk.rows)))
+                while len(pending) >= self.workers * 2:
+                    self._write_next(out, pending)
+                if self.cancelled:
+                    break
+            while pending and not self.cancelled:
+                self._write_next(out, pending)
+            if self.cancelled:
+                pool.shutdown(wait=False, cancel_futures=True)
+                return
+            out.write(format_footer(self.fmt, self.rows_done > 0))
+
+    def _write_next(self, out, pending: deque):
+        future, count = pending.popleft()
+        out.write(future.result())
+        self.rows_done += count
@@ -0,0 +1,122 @@
+# core/sync.py
+
+import sqlite3
+from typing import Dict, Optional
+
+from .models import Task, TaskChange
+
+
+class ExternalChangeWatcher:
+    """Обнаружение изменений БД другими процессами
+
+    Раз в interval_ms на постоянном соединении читается PRAGMA data_version:
+    число меняется только после commit из другого соединения, а чтение почти
+    бесплатно. При изменении из журнала task_changes берутся только записи
+    после последней синхронизации, и подписчики TodoDatabase получают
+    TaskChange(external=True) по каждой затронутой задаче.
+
+    Свои записи приложение делает через другие соединения, поэтому они тоже
+    меняют data_version и попадают в журнал. Их подписчики уже получили
+    напрямую: для таких задач запоминается сообщённое состояние, и если
+    текущее состояние в БД с ним совпадает, задача пропускается.
+    """
+
+    def __init__(self, root, db, interval_ms: int = 1000):
+        self.root = root
+        self.db = db
+        self.interval_ms = interval_ms
+        self._conn: Optional[sqlite3.Connection] = None
+        self._version = None
+        self._last_seq = 0
+        self._after_id = None
+        # Состояния задач после собственных изменений (None — удалена)
+        self._own: Dict[int, Optional[Task]] = {}
+
+    def start(self):
+        self._conn = sqlite3.connect(self.db.db_path)
+        self._version = self._data_version()
+        row = self._conn.execute("SELECT MAX(seq) FROM task_changes").fetchone()
+        self._last_seq = row[0] or 0
+        self.db.subscribe(self._on_own_change)
+        self._schedule()
+
+    def stop(self):
+        self.db.unsubscribe(self._on_own_change)
+        if self._after_id is not None:
+            self.root.after_cancel(self._after_id)
+            self._after_id = None
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    def _data_version(self) -> int:
+        return self._conn.execute("PRAGMA data_version").fetchone()[0]
+
+    def _schedule(self):
+        self._after_id = self.root.after(self.interval_ms, self._poll)
+
+    def _on_own_change(self, change: TaskChange):
+        if change.external:
+            return
+        if change.action == "reload":
+            # Массовая правка (например, удаление категории): подписчики и так
+            # перечитывают всё, поэтому журнал до этого места пропускаем целиком
+            row = self._conn.execute("SELECT MAX(seq) FROM task_changes").fetchone()
+            self._last_seq = max(self._last_seq, row[0] or 0)
+            self._own.clear()
+            return
+        self._own[change.task_id] = change.after
+
+    def _poll(self):
+        self._after_id = None
+        try:
+            self.poll()
+        finally:
+            if self._conn is not None:
+                self._schedule()
+
+    def poll(self) -> int:
+        """Проверить data_version и разослать внешние изменения; вернуть их число"""
+        version = self._data_version()
+        if version == self._version:
+            return 0
+        self._version = version
+
+        rows = self.db.get_changes_since(self._last_seq, self._conn)
+        if not rows:
+            self._own.clear()
+            return 0
+        if rows[0][0] > self._last_seq + 1 and self._last_seq:
+            # Журнал подрезан дальше нашей позиции: часть изменений потеряна
+            self._last_seq = rows[-1][0]
+            self._own.clear()
+            self.db.notify_external("reload", 0, None)
+            return len(rows)
+        self._last_seq = rows[-1][0]
+
+        # Несколько записей по одной задаче сворачиваются в одно изменение
+        added = set()
+        task_ids = []
+        for _, task_id, action in rows:
+            if action == "add":
+                added.add(task_id)
+            if task_id not in task_ids:
+                task_ids.append(task_id)
+
+        own, self._own = self._own, {}
+        sent = 0
+        for task_id in task_ids:
+            # Только горячая таблица: задача, ушедшая в архив, для списка удалена,
+            # и так же её записывают свои archive_completed (after = None)
+            current = self.db.get_task_by_id(task_id, include_archive=False)
+            if task_id in own and own[task_id] == current:
+                continue  # Своё изменение, подписчики о нём уже знают
+            if current is None:
+                action = "delete"
+            elif task_id in added:
+                action = "add"
+            else:
+                action = "update"
+            self.db.notify_external(action, task_id, current)
+            sent += 1
+        return sent
@@ -0,0 +1,61 @@
+# core/trigrams.py
+
+import re
+from typing import Dict, Set
+
+_WORD_RE = re.compile(r"\w+")
+
+# Сколько триграмм слова может испортить одна правка: замена буквы задевает
+# три триграммы, вставка — три, пропуск — две, перестановка соседних — четыре
+MAX_TRIGRAMS_PER_EDIT = 4
+
+
+def normalize_text(text: str) -> str:
+    """Текст для нечёткого поиска: нижний регистр, ё -> е"""
+    return text.casefold().replace("ё", "е")
+
+
+def words(text: str) -> Set[str]:
+    """Множество нормализованных слов текста"""
+    return set(_WORD_RE.findall(normalize_text(text or "")))
+
+
+def word_trigrams(word: str) -> Set[str]:
+    """Триграммы слова в стиле pg_trgm
+
+    Слово дополняется двумя пробелами слева и одним справа, так что
+    у "кот" триграммы "  к", " ко", "кот", "от ". Начало слова весит больше
+    середины, а одна опечатка портит не больше MAX_TRIGRAMS_PER_EDIT триграмм.
+    """
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def within_one_edit(a: str, b: str) -> bool:
+    """Слова отличаются не больше чем одной правкой: замена, вставка,
+    удаление буквы или перестановка соседних букв
+
+    У коротких слов одна опечатка портит большую часть триграмм, и
+    сходство по триграммам их уже не находит.
+    """
+    if a == b:
+        return True
+    if abs(len(a) - len(b)) > 1:
+        return False
+    if len(a) > len(b):
+        a, b = b, a
+    i = 0
+    while i < len(a) and a[i] == b[i]:
+        i += 1
+    if len(a) < len(b):
+        return a[i:] == b[i + 1:]
+    return a[i + 1:] == b[i + 1:] or (
+        i + 1 < len(a) and a[i] == b[i + 1] and a[i + 1] == b[i] and a[i + 2:] == b[i + 2:]
+    )
+
+
+def task_words(title: str, description: str) -> Dict[str, int]:
+    """Слова задачи: {слово: 1, если оно есть в заголовке, иначе 0}"""
+    result = dict.fromkeys(words(description), 0)
+    result.update(dict.fromkeys(words(title), 1))
+    return result
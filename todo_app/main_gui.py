@@ -1,13 +1,30 @@
 # main_gui.py - Современный интерфейс с тёмной темой
 
+import calendar
+import os
+import sqlite3
+import sys
 import tkinter as tk
+from dataclasses import replace
 from datetime import datetime
-from tkinter import messagebox, scrolledtext, ttk
+from tkinter import filedialog, messagebox, scrolledtext, simpledialog, ttk
 from turtle import width
 from typing import Optional
 
-from core.database import TodoDatabase
-from core.models import Task
+from core.autocomplete import TaskAutocomplete
+from core.calendar_cache import MonthSummaryCache
+from core.columnar import ColumnarTaskStore
+from core.database import TaskQuery, TodoDatabase, parse_tag_filter, sort_cursor
+from core.diagnostics import LeakDetector
+from core.metrics import metrics
+from core.models import STATUSES, SmartList, Task, TaskChange
+from core.models import parse_due_date
+from core.prefetch import QueryPrefetcher
+from core.profiling import action_profiler, profiled_action
+from core.recorder import session_recorder
+from core.reports import REPORT_FORMATS, ReportJob
+from core.reminders import DeadlineTimer, ReminderScheduler
+from core.sync import ExternalChangeWatcher
 
 # Попытка импортировать tkcalendar
 try:
@@ -41,33 +58,153 @@ COLORS = {
     "status_todo": "#5f27cd",  # Не выполнено
 }
 
+# Пункты сортировки в панели фильтров -> режимы TodoDatabase (SORT_KEYS)
+SORT_OPTIONS = {
+    "Старые": "oldest",
+    "Новые": "newest",
+    "По приоритету": "priority",
+    "По сроку": "due_date",
+    "По дате создания": "created",
+    "По названию": "title",
+}
+
+
+class DialogCache:
+    """Диалоги, построенные один раз на окно приложения и переиспользуемые"""
+
+    def __init__(self, root):
+        self.root = root
+        self._dialogs = {}
+
+    @classmethod
+    def for_widget(cls, widget) -> "DialogCache":
+        """Кэш окна, которому принадлежит виджет (создаётся один раз)"""
+        root = widget._root()
+        cache = getattr(root, "_dialog_cache", None)
+        if cache is None:
+            cache = root._dialog_cache = cls(root)
+        return cache
+
+    def get(self, dialog_class, *args):
+        """Готовый (скрытый) диалог класса; строится при первом обращении"""
+        dialog = self._dialogs.get(dialog_class)
+        if dialog is None or not dialog.winfo_exists():
+            with metrics.timer(f"dialog.build.{dialog_class.__name__}"):
+                dialog = dialog_class(self.root, *args)
+            self._dialogs[dialog_class] = dialog
+        return dialog
+
+    def prebuild(self, *specs):
+        """Построить диалоги заранее, по одному за вызов в простое
+
+        specs — кортежи (класс диалога, аргументы конструктора...).
+        """
+        if specs:
+            self.get(*specs[0])
+            self.root.after_idle(lambda: self.prebuild(*specs[1:]))
+
+
+def autocomplete_for(widget, db: TodoDatabase) -> TaskAutocomplete:
+    """Индекс подсказок окна, которому принадлежит виджет (строится один раз)"""
+    root = widget._root()
+    autocomplete = getattr(root, "_autocomplete", None)
+    if autocomplete is None:
+        autocomplete = root._autocomplete = TaskAutocomplete(db)
+    return autocomplete
+
+
+def load_full_task(widget, db: TodoDatabase, task_id: int) -> Optional[Task]:
+    """Полная задача для редактирования: из упреждающей загрузки окна, если она
+    успела, иначе из БД"""
+    prefetcher = getattr(widget._root(), "_prefetcher", None)
+    task = prefetcher.get_task(task_id) if prefetcher is not None else None
+    return task or db.get_task_by_id(task_id)
+
+
+def category_choices(autocomplete: TaskAutocomplete, text: str):
+    """Варианты выпадающего списка категорий: по префиксу или все, если
+    в поле уже целая категория"""
+    if not text.strip() or text in autocomplete.categories:
+        return autocomplete.categories.items()
+    return autocomplete.categories.complete(text, limit=50)
+
+
+class CachedDialog(tk.Toplevel):
+    """Модальный диалог, который при закрытии прячется, а не уничтожается
+
+    Наследник строит виджеты в __init__ (окно создаётся скрытым),
+    а в open() подставляет новые данные и вызывает show().
+    """
+
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.withdraw()
+        self._closed = tk.BooleanVar(self, value=True)
+        self._previous_grab = None
+        self.protocol("WM_DELETE_WINDOW", self.close)
+
+    @classmethod
+    @profiled_action("open_dialog")
+    def open_cached(cls, parent, *args, build_args=()):
+        """Показать закэшированный диалог, замерив время открытия"""
+        with metrics.timer(f"dialog.open.{cls.__name__}"):
+            dialog = DialogCache.for_widget(parent).get(cls, *build_args)
+            dialog.open(parent, *args)
+            dialog.update_idletasks()
+        return dialog
+
+    def show(self, parent):
+        """Показать окно модально поверх parent"""
+        self.transient(parent)
+        self._previous_grab = self.grab_current()
+        self._closed.set(False)
+        self.deiconify()
+        self.lift()
+        try:
+            self.grab_set()
+        except tk.TclError:
+            # Окно ещё не отображено — захватываем ввод чуть позже
+            self.after(20, self.grab_set)
+
+    def center_on_screen(self):
+        """Разместить окно по центру экрана"""
+        self.update_idletasks()
+        x = (self.winfo_screenwidth() // 2) - (self.winfo_width() // 2)
+        y = (self.winfo_screenheight() // 2) - (self.winfo_height() // 2)
+        self.geometry(f"+{x}+{y}")
+
+    def close(self):
+        """Спрятать окно и вернуть захват ввода предыдущему диалогу"""
+        self.grab_release()
+        self.withdraw()
+        if self._previous_grab is not None and self._previous_grab.winfo_exists():
+            try:
+                self._previous_grab.grab_set()
+            except tk.TclError:
+                pass
+        self._previous_grab = None
+        self._closed.set(True)
 
-class CalendarDialog(tk.Toplevel):
+    def wait_closed(self):
+        """Дождаться закрытия диалога (аналог wait_window для скрытия)"""
+        if not self._closed.get():
+            self.wait_variable(self._closed)
+
+
+class CalendarDialog(CachedDialog):
     """Диалог с календарем для выбора даты"""
 
-    def __init__(self, parent, current_date=None):
+    def __init__(self, parent):
         super().__init__(parent)
         self.title("📅 Выбор даты")
         self.configure(bg=COLORS["bg_dark"])
         self.resizable(False, False)
 
-        # Центрирование окна
-        self.transient(parent)
-        self.grab_set()
-
         self.selected_date = None
 
         # Создаем календарь
         if CALENDAR_AVAILABLE:
-            # Парсим текущую дату если есть
-            if current_date and current_date != "ГГГГ-ММ-ДД":
-                try:
-                    year, month, day = map(int, current_date.split("-"))
-                    init_date = datetime(year, month, day)
-                except:
-                    init_date = datetime.now()
-            else:
-                init_date = datetime.now()
+            init_date = datetime.now()
 
             self.calendar = Calendar(
                 self,
@@ -138,7 +275,7 @@ class CalendarDialog(tk.Toplevel):
         cancel_btn = tk.Button(
             button_frame,
             text="✕ Отмена",
-            command=self.destroy,
+            command=self.close,
             bg=COLORS["bg_light"],
             fg=COLORS["text"],
             font=("Segoe UI", 10),
@@ -149,13 +286,23 @@ class CalendarDialog(tk.Toplevel):
         )
         cancel_btn.pack(side=tk.LEFT, padx=5)
 
-        # Центрируем окно
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = (self.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f"+{x}+{y}")
+    def open(self, parent, current_date=None):
+        """Показать календарь с выбранной датой current_date (ГГГГ-ММ-ДД)"""
+        self.selected_date = None
+        if CALENDAR_AVAILABLE:
+            # Парсим текущую дату если есть
+            init_date = datetime.now()
+            if current_date and current_date != "ГГГГ-ММ-ДД":
+                try:
+                    year, month, day = map(int, current_date.split("-"))
+                    init_date = datetime(year, month, day)
+                except:
+                    pass
+            self.calendar.selection_set(init_date)
+            self.calendar.see(init_date)
+
+        self.show(parent)
+        self.center_on_screen()
 
     def _select_date(self):
         """Выбрать дату и закрыть диалог"""
@@ -172,7 +319,7 @@ class CalendarDialog(tk.Toplevel):
                     self.selected_date = date
                 except:
                     self.selected_date = date
-        self.destroy()
+        self.close()
 
     def _select_today(self):
         """Выбрать сегодняшнюю дату"""
@@ -180,30 +327,18 @@ class CalendarDialog(tk.Toplevel):
             self.calendar.selection_set(datetime.now())
 
 
-class TimePickerDialog(tk.Toplevel):
+class TimePickerDialog(CachedDialog):
     """Диалог с выбором времени через прокрутку"""
 
-    def __init__(self, parent, current_time=None):
+    def __init__(self, parent):
         super().__init__(parent)
         self.title("🕐 Выбор времени")
         self.configure(bg=COLORS["bg_dark"])
         self.resizable(False, False)
 
-        # Центрирование окна
-        self.transient(parent)
-        self.grab_set()
-
         self.selected_time = None
-
-        # Парсим текущее время если есть
-        if current_time and current_time != "ЧЧ:ММ":
-            try:
-                hour, minute = map(int, current_time.split(":"))
-            except:
-                hour, minute = datetime.now().hour, datetime.now().minute
-        else:
-            now = datetime.now()
-            hour, minute = now.hour, now.minute
+        now = datetime.now()
+        hour, minute = now.hour, now.minute
 
         # Заголовок
         title_label = tk.Label(
@@ -348,7 +483,7 @@ class TimePickerDialog(tk.Toplevel):
         cancel_btn = tk.Button(
             button_frame,
             text="✕ Отмена",
-            command=self.destroy,
+            command=self.close,
             bg=COLORS["bg_light"],
             fg=COLORS["text"],
             font=("Segoe UI", 11),
@@ -359,13 +494,21 @@ class TimePickerDialog(tk.Toplevel):
         )
         cancel_btn.pack(side=tk.LEFT, padx=5)
 
-        # Центрируем окно
-        self.update_idletasks()
-        width = self.winfo_width()
-        height = self.winfo_height()
-        x = (self.winfo_screenwidth() // 2) - (width // 2)
-        y = (self.winfo_screenheight() // 2) - (height // 2)
-        self.geometry(f"+{x}+{y}")
+    def open(self, parent, current_time=None):
+        """Показать выбор времени с текущим значением current_time (ЧЧ:ММ)"""
+        self.selected_time = None
+        # Парсим текущее время если есть
+        time_str = None
+        if current_time and current_time != "ЧЧ:ММ":
+            try:
+                hour, minute = map(int, current_time.split(":")[:2])
+                time_str = f"{hour}:{minute}"
+            except:
+                pass
+        self._set_quick_time(time_str)
+
+        self.show(parent)
+        self.center_on_screen()
 
     def _set_quick_time(self, time_str):
         """Установить быстрое время"""
@@ -389,7 +532,7 @@ class TimePickerDialog(tk.Toplevel):
             self.selected_time = f"{hour:02d}:{minute:02d}"
         except:
             pass
-        self.destroy()
+        self.close()
 
 
 class DateTimeInput(tk.Frame):
@@ -508,8 +651,8 @@ class DateTimeInput(tk.Frame):
     def _open_calendar(self):
         """Открыть диалог календаря"""
         current_date = self.date_var.get() if not self._date_placeholder else None
-        dialog = CalendarDialog(self.winfo_toplevel(), current_date)
-        self.wait_window(dialog)
+        dialog = CalendarDialog.open_cached(self.winfo_toplevel(), current_date)
+        dialog.wait_closed()
 
         if dialog.selected_date:
             if self._date_placeholder:
@@ -530,8 +673,8 @@ class DateTimeInput(tk.Frame):
     def _open_time_picker(self):
         """Открыть диалог выбора времени"""
         current_time = self.time_var.get() if not self._time_placeholder else None
-        dialog = TimePickerDialog(self.winfo_toplevel(), current_time)
-        self.wait_window(dialog)
+        dialog = TimePickerDialog.open_cached(self.winfo_toplevel(), current_time)
+        dialog.wait_closed()
 
         if dialog.selected_time:
             if self._time_placeholder:
@@ -572,8 +715,9 @@ class DateTimeInput(tk.Frame):
                 self.date_entry.insert(0, parts[0])
                 self._date_placeholder = False
 
+                # Секунды в поле времени не показываем (формат ЧЧ:ММ)
                 self.time_entry.delete(0, tk.END)
-                self.time_entry.insert(0, parts[1])
+                self.time_entry.insert(0, parts[1][:5])
                 self._time_placeholder = False
 
     def clear(self):
@@ -587,29 +731,150 @@ class DateTimeInput(tk.Frame):
         self._time_placeholder = True
 
 
-class ManageCategoriesDialog(tk.Toplevel):
+class SuggestionPopup:
+    """Подсказки под полем ввода по мере набора
+
+    complete(текст, limit) возвращает варианты из TaskAutocomplete в памяти,
+    так что нажатие клавиши не ходит в БД. Стрелки выбирают вариант,
+    Enter или щелчок подставляют его, Escape прячет список. Окно списка —
+    потомок поля, поэтому работает и внутри модального диалога.
+    """
+
+    MAX_ITEMS = 8
+    # Клавиши, после которых список не пересчитывается
+    NAVIGATION_KEYS = {"Up", "Down", "Return", "KP_Enter", "Escape", "Tab",
+                       "Shift_L", "Shift_R", "Control_L", "Control_R", "Alt_L", "Alt_R"}
+
+    def __init__(self, entry, variable: tk.StringVar, complete):
+        self.entry = entry
+        self.variable = variable
+        self.complete = complete
+        self.window = None
+        self.listbox = None
+        entry.bind("<KeyRelease>", self._on_key, add="+")
+        entry.bind("<Down>", lambda e: self._move(1))
+        entry.bind("<Up>", lambda e: self._move(-1))
+        entry.bind("<Return>", self._accept, add="+")
+        entry.bind("<Escape>", self._on_escape, add="+")
+        entry.bind("<FocusOut>", lambda e: entry.after(150, self._hide_unfocused), add="+")
+
+    @property
+    def visible(self) -> bool:
+        return self.window is not None and self.window.winfo_viewable()
+
+    def _build(self):
+        self.window = tk.Toplevel(self.entry)
+        self.window.withdraw()
+        self.window.overrideredirect(True)
+        self.listbox = tk.Listbox(
+            self.window,
+            bg=COLORS["bg_light"],
+            fg=COLORS["text"],
+            selectbackground=COLORS["accent"],
+            selectforeground=COLORS["text"],
+            relief=tk.FLAT,
+            bd=0,
+            highlightthickness=1,
+            highlightbackground=COLORS["accent"],
+            activestyle="none",
+            font=("Segoe UI", 10),
+            exportselection=False,
+        )
+        self.listbox.pack(fill=tk.BOTH, expand=True)
+        self.listbox.bind("<ButtonRelease-1>", self._accept)
+
+    def _on_key(self, event):
+        if event.keysym in self.NAVIGATION_KEYS:
+            return
+        text = self.variable.get()
+        if not text.strip():
+            self.hide()
+            return
+        suggestions = self.complete(text, self.MAX_ITEMS)
+        if not suggestions or suggestions == [text]:
+            self.hide()
+            return
+        self._show(suggestions)
+
+    def _show(self, suggestions):
+        if self.window is None or not self.window.winfo_exists():
+            self._build()
+        self.listbox.delete(0, tk.END)
+        for suggestion in suggestions:
+            self.listbox.insert(tk.END, suggestion)
+        self.listbox.configure(height=len(suggestions))
+        x = self.entry.winfo_rootx()
+        y = self.entry.winfo_rooty() + self.entry.winfo_height()
+        self.window.geometry(f"{self.entry.winfo_width()}x{self.listbox.winfo_reqheight()}+{x}+{y}")
+        self.window.deiconify()
+        self.window.lift()
+
+    def hide(self, event=None):
+        if self.window is not None and self.window.winfo_exists():
+            self.window.withdraw()
+
+    def _hide_unfocused(self):
+        if self.window is not None and self.window.winfo_exists() \
+                and self.entry.focus_get() is not self.listbox:
+            self.window.withdraw()
+
+    def _move(self, step: int):
+        if not self.visible:
+            return None  # Стрелка вниз у Combobox открывает его список
+        size = self.listbox.size()
+        current = self.listbox.curselection()
+        index = (current[0] + step) % size if current else (0 if step > 0 else size - 1)
+        self.listbox.selection_clear(0, tk.END)
+        self.listbox.selection_set(index)
+        self.listbox.see(index)
+        return "break"
+
+    def _accept(self, event=None):
+        if not self.visible:
+            return None
+        selection = self.listbox.curselection()
+        if not selection:
+            self.hide()
+            return None
+        self.variable.set(self.listbox.get(selection[0]))
+        self.entry.icursor(tk.END)
+        self.entry.focus_set()
+        self.hide()
+        return "break"
+
+    def _on_escape(self, event=None):
+        if not self.visible:
+            return None
+        self.hide()
+        return "break"
+
+
+class ManageCategoriesDialog(CachedDialog):
     """Диалог для управления категориями"""
 
-    def __init__(self, parent, db, update_callback):
+    def __init__(self, parent, db):
         super().__init__(parent)
         self.db = db
-        self.update_callback = update_callback
+        self.update_callback = None
         self.title("Управление категориями")
         self.geometry("450x600")
         self.configure(bg=COLORS["bg_dark"])
         self.resizable(False, False)
 
-        # Центрируем окно
-        self.transient(parent)
-        self.grab_set()
+        self._create_widgets()
 
+    def open(self, parent, update_callback):
+        """Показать диалог с актуальным списком категорий"""
+        self.update_callback = update_callback
+        self.category_var.set("")
+        self._load_categories()
+        self.show(parent)
+
+        # Центрируем окно относительно родителя
         x = parent.winfo_x() + (parent.winfo_width() // 2) - 225
         y = parent.winfo_y() + (parent.winfo_height() // 2) - 300
         self.geometry(f"+{x}+{y}")
 
-        self._create_widgets()
-        self._load_categories()
-
     def _create_widgets(self):
         # Заголовок
         title_label = tk.Label(
@@ -713,7 +978,7 @@ class ManageCategoriesDialog(tk.Toplevel):
         close_btn = tk.Button(
             self,
             text="Закрыть",
-            command=self.destroy,
+            command=self.close,
             bg=COLORS["bg_light"],
             fg=COLORS["text"],
             font=("Segoe UI", 10),
@@ -741,13 +1006,7 @@ class ManageCategoriesDialog(tk.Toplevel):
             return
 
         try:
-            # Добавляем категорию в БД
-            with self.db.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "INSERT INTO categories (name) VALUES (?)", (category_name,)
-                )
-                conn.commit()
+            self.db.add_category(category_name)
 
             self.category_var.set("")
             self._load_categories()
@@ -833,35 +1092,52 @@ class ModernButton(tk.Button):
         self.configure(bg=self.bg_color)
 
 
-class EditTaskDialog(tk.Toplevel):
+class EditTaskDialog(CachedDialog):
     """Диалоговое окно для редактирования задачи"""
 
-    def __init__(self, parent, task: Task, db: TodoDatabase, callback):
+    def __init__(self, parent, db: TodoDatabase):
         super().__init__(parent)
-        self.task = task
+        self.task = None
         self.db = db
-        self.callback = callback
+        self.autocomplete = autocomplete_for(parent, db)
+        self.callback = None
 
-        self.title(f"Редактировать задачу #{task.id}")
         self.geometry("650x600")
         self.resizable(False, False)
         self.configure(bg=COLORS["bg_dark"])
 
-        # Делаем окно модальным
-        self.transient(parent)
-        self.grab_set()
-
         self._create_widgets()
 
-        # Центрируем окно
-        self.update_idletasks()
-        x = (self.winfo_screenwidth() // 2) - (self.winfo_width() // 2)
-        y = (self.winfo_screenheight() // 2) - (self.winfo_height() // 2)
-        self.geometry(f"+{x}+{y}")
+    def open(self, parent, task: Task, callback):
+        """Показать диалог для задачи task"""
+        if not task.description_complete:
+            # Строка списка несёт только начало описания — дочитываем задачу целиком
+            task = load_full_task(parent, self.db, task.id) or task
+        self.task = task
+        self.callback = callback
+
+        self.title(f"Редактировать задачу #{task.id}")
+        self.title_var.set(task.title)
+        self.desc_text.delete(1.0, tk.END)
+        self.desc_text.insert(1.0, task.description)
+        self.category_combo["values"] = self._get_all_categories()
+        self.category_var.set(task.category)
+        self.status_var.set(task.status)
+        self.priority_var.set(task.priority)
+        self.tags_var.set(" ".join(task.tags))
+        self.datetime_input.clear()
+        if task.due_date:
+            self.datetime_input.set_datetime(task.due_date)
+
+        self.show(parent)
+        self.center_on_screen()
 
     def _get_all_categories(self):
-        """Получить список всех категорий"""
-        return self.db.get_categories()
+        """Получить список всех категорий (из индекса подсказок, без запроса к БД)"""
+        return self.autocomplete.categories.items()
+
+    def _fill_category_choices(self):
+        self.category_combo["values"] = category_choices(self.autocomplete, self.category_var.get())
 
     def _create_widgets(self):
         # Основной фрейм с отступами
@@ -876,7 +1152,7 @@ class EditTaskDialog(tk.Toplevel):
             bg=COLORS["bg_dark"],
             fg=COLORS["text"],
         ).pack(anchor=tk.W, pady=(0, 5))
-        self.title_var = tk.StringVar(value=self.task.title)
+        self.title_var = tk.StringVar(self)
         title_entry = tk.Entry(
             main_frame,
             textvariable=self.title_var,
@@ -888,6 +1164,7 @@ class EditTaskDialog(tk.Toplevel):
             bd=5,
         )
         title_entry.pack(fill=tk.X, pady=(0, 15))
+        SuggestionPopup(title_entry, self.title_var, self.autocomplete.complete_title)
 
         # Описание
         tk.Label(
@@ -912,7 +1189,6 @@ class EditTaskDialog(tk.Toplevel):
             relief=tk.FLAT,
             bd=5,
         )
-        self.desc_text.insert(1.0, self.task.description)
         self.desc_text.pack(fill=tk.BOTH, expand=True)
 
         # Категория
@@ -927,15 +1203,15 @@ class EditTaskDialog(tk.Toplevel):
             fg=COLORS["text"],
             font=("Segoe UI", 10),
         ).pack(side=tk.LEFT, padx=(0, 10))
-        self.category_var = tk.StringVar(value=self.task.category)
-        all_categories = self._get_all_categories()
-        category_combo = ttk.Combobox(
+        self.category_var = tk.StringVar(self)
+        self.category_combo = ttk.Combobox(
             cat_frame,
             textvariable=self.category_var,
-            values=all_categories,
             font=("Segoe UI", 10),
+            postcommand=self._fill_category_choices,
         )
-        category_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.category_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        SuggestionPopup(self.category_combo, self.category_var, self.autocomplete.complete_category)
 
         # Статус
         status_frame = tk.Frame(main_frame, bg=COLORS["bg_dark"])
@@ -949,7 +1225,7 @@ class EditTaskDialog(tk.Toplevel):
             fg=COLORS["text"],
             font=("Segoe UI", 10),
         ).pack(side=tk.LEFT, padx=(0, 10))
-        self.status_var = tk.StringVar(value=self.task.status)
+        self.status_var = tk.StringVar(self)
         status_combo = ttk.Combobox(
             status_frame,
             textvariable=self.status_var,
@@ -971,7 +1247,7 @@ class EditTaskDialog(tk.Toplevel):
             fg=COLORS["text"],
             font=("Segoe UI", 10),
         ).pack(side=tk.LEFT, padx=(0, 10))
-        self.priority_var = tk.StringVar(value=self.task.priority)
+        self.priority_var = tk.StringVar(self)
         priority_combo = ttk.Combobox(
             priority_frame,
             textvariable=self.priority_var,
@@ -981,12 +1257,34 @@ class EditTaskDialog(tk.Toplevel):
         )
         priority_combo.pack(side=tk.LEFT, fill=tk.X, expand=True)
 
+        # Метки (через пробел)
+        tags_frame = tk.Frame(main_frame, bg=COLORS["bg_dark"])
+        tags_frame.pack(fill=tk.X, pady=(0, 10))
+        tk.Label(
+            tags_frame,
+            text="Метки:",
+            width=10,
+            anchor=tk.W,
+            bg=COLORS["bg_dark"],
+            fg=COLORS["text"],
+            font=("Segoe UI", 10),
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        self.tags_var = tk.StringVar(self)
+        tk.Entry(
+            tags_frame,
+            textvariable=self.tags_var,
+            bg=COLORS["bg_light"],
+            fg=COLORS["text"],
+            insertbackground=COLORS["text"],
+            relief=tk.FLAT,
+            font=("Segoe UI", 10),
+            bd=5,
+        ).pack(side=tk.LEFT, fill=tk.X, expand=True)
+
         # Срок выполнения
         datetime_frame = tk.Frame(main_frame, bg=COLORS["bg_dark"])
         datetime_frame.pack(fill=tk.X, pady=(0, 20))
         self.datetime_input = DateTimeInput(datetime_frame)
-        if self.task.due_date:
-            self.datetime_input.set_datetime(self.task.due_date)
         self.datetime_input.pack(fill=tk.X)
 
         # Кнопки
@@ -1007,7 +1305,7 @@ class EditTaskDialog(tk.Toplevel):
         cancel_btn = ModernButton(
             button_frame,
             "✕ Отмена",
-            self.destroy,
+            self.close,
             bg_color=COLORS["danger"],
             hover_color="#ff6666",
             width=200,
@@ -1026,31 +1324,241 @@ class EditTaskDialog(tk.Toplevel):
         priority = self.priority_var.get()
         status = self.status_var.get()
         due_date = self.datetime_input.get_datetime()
+        tags = self.tags_var.get().split()
 
-        # Обновляем задачу в БД
+        # Обновляем задачу в БД (архивную сначала возвращаем из архива)
         if self.task.id is not None:
+            session_recorder.record(
+                "edit", task_id=self.task.id, title=title, description=description,
+                category=category, priority=priority, status=status,
+                due_date=due_date, tags=tags,
+            )
+            if self.task.archived:
+                self.db.restore_task(self.task.id)
             self.db.update_task(
-                self.task.id, title, description, category, priority, due_date
+                self.task.id, title, description, category, priority, due_date,
+                tags=tags,
             )
             self.db.update_task_status(self.task.id, status)
 
-        # Вызываем callback для обновления списка
+        # Прячем диалог и вызываем callback для обновления списка
+        self.close()
         self.callback()
 
-        self.destroy()
+
+class HoverDispatcher:
+    """Подсветка карточки под курсором через одну привязку на общий bindtag
+
+    Вместо пары <Enter>/<Leave> на каждом виджете карточки все её виджеты
+    получают общий bindtag. По любому событию определяется карточка под
+    курсором, и перенастройка происходит только при смене карточки.
+    """
+
+    BINDTAG = "TaskCardHover"
+
+    def __init__(self, root):
+        self.root = root
+        self.hovered = None
+        root.bind_class(self.BINDTAG, "<Enter>", self._on_event, add="+")
+        root.bind_class(self.BINDTAG, "<Leave>", self._on_event, add="+")
+
+    @classmethod
+    def for_widget(cls, widget) -> "HoverDispatcher":
+        """Диспетчер окна, которому принадлежит виджет (создаётся один раз)"""
+        root = widget._root()
+        dispatcher = getattr(root, "_hover_dispatcher", None)
+        if dispatcher is None:
+            dispatcher = root._hover_dispatcher = cls(root)
+        return dispatcher
+
+    def register(self, card):
+        """Добавить общий bindtag карточке и всем её потомкам"""
+        card.bind("<Destroy>", lambda event: self._forget(card), add="+")
+        stack = [card]
+        while stack:
+            widget = stack.pop()
+            tags = widget.bindtags()
+            if self.BINDTAG not in tags:
+                widget.bindtags((self.BINDTAG,) + tags)
+            stack.extend(widget.winfo_children())
+
+    def _forget(self, card):
+        """Карточку удалили — не держать ссылку на уничтоженный виджет"""
+        if self.hovered is card:
+            self.hovered = None
+
+    def _card_at(self, x_root: int, y_root: int):
+        """Карточка (виджет с set_hovered), под точкой экрана"""
+        try:
+            widget = self.root.winfo_containing(x_root, y_root)
+        except KeyError:
+            # Внутренние окна Tk (например, выпадающий список Combobox)
+            return None
+        while widget is not None and not hasattr(widget, "set_hovered"):
+            widget = widget.master
+        return widget
+
+    def _on_event(self, event):
+        metrics.incr("hover.events")
+        card = self._card_at(event.x_root, event.y_root)
+        if card is self.hovered:
+            return
+        if self.hovered is not None and self.hovered.winfo_exists():
+            self.hovered.set_hovered(False)
+            metrics.incr("hover.reconfigures")
+        self.hovered = card
+        if card is not None:
+            card.set_hovered(True)
+            metrics.incr("hover.reconfigures")
+
+
+def get_task_title_text(task: Task) -> str:
+    """Текст заголовка карточки с отметкой о просрочке"""
+    title_text = f"#{task.id}  {task.title}"
+    if task.is_overdue():
+        title_text += "  ПРОСРОЧЕНО"
+    return title_text
+
+
+def get_task_priority_color(task: Task) -> str:
+    """Цвет индикатора приоритета с учётом статуса и просрочки"""
+    if task.status == "выполнено":
+        return COLORS["status_done"]
+    if task.is_overdue():
+        return COLORS["danger"]
+
+    priority_colors = {
+        "срочно": COLORS["priority_urgent"],
+        "важно": COLORS["priority_important"],
+        "обычно": COLORS["priority_normal"],
+        "нет": COLORS["priority_none"],
+    }
+    return priority_colors.get(task.priority, COLORS["priority_none"])
+
+
+def get_task_description_preview(task: Task) -> str:
+    """Первые 150 символов описания для карточки"""
+    if len(task.description) > 150:
+        return task.description[:150] + "..."
+    return task.description
+
+
+def get_task_badges(task: Task) -> list:
+    """Бейджи карточки: список пар (текст, цвет)"""
+    badges = []
+    if task.category != "Без категории":
+        badges.append((f"📁 {task.category}", COLORS["priority_normal"]))
+
+    if task.priority != "нет":
+        priority_colors = {
+            "срочно": COLORS["priority_urgent"],
+            "важно": COLORS["priority_important"],
+            "обычно": COLORS["priority_normal"],
+        }
+        priority_color = priority_colors.get(task.priority, COLORS["priority_none"])
+        badges.append((f"⚡ {task.priority.upper()}", priority_color))
+
+    if task.due_date:
+        badges.append((f"🕒 {task.due_date}", COLORS["warning"]))
+
+    # Статус бейдж
+    status_colors = {
+        "выполнено": COLORS["status_done"],
+        "в процессе": COLORS["status_progress"],
+        "не выполнено": COLORS["status_todo"],
+    }
+    badges.append((task.status, status_colors.get(task.status, COLORS["priority_none"])))
+
+    if task.archived:
+        badges.append(("📦 архив", COLORS["priority_none"]))
+
+    if task.subtasks_total:
+        badges.append((f"☑ {task.subtasks_done}/{task.subtasks_total}", COLORS["status_done"]))
+
+    if task.parent_id is not None:
+        badges.append((f"↳ подзадача #{task.parent_id}", COLORS["priority_none"]))
+
+    for tag in task.tags:
+        badges.append((f"#{tag}", COLORS["bg_light"]))
+
+    return badges
+
+
+class TaskActionsMixin:
+    """Действия карточки задачи: смена статуса, редактирование, удаление
+
+    Требует атрибуты task, db, refresh_callback, status_var и метод winfo_toplevel().
+    """
+
+    @profiled_action("_on_status_change")
+    def _on_status_change(self, event=None):
+        """Обработчик изменения статуса"""
+        new_status = self.status_var.get()
+        if self.task.id is not None:
+            session_recorder.record("status", task_id=self.task.id, status=new_status)
+            if self.task.archived:
+                self.db.restore_task(self.task.id)
+            if new_status == "выполнено" and self.task.subtasks_total:
+                # Выполнение родителя закрывает всё поддерево одним запросом
+                self.db.set_status_cascade(self.task.id, new_status)
+            else:
+                self.db.update_task_status(self.task.id, new_status)
+            self.refresh_callback()
+
+    def _edit_task(self):
+        """Открыть окно редактирования"""
+        if self.task.id is not None:
+            task = load_full_task(self, self.db, self.task.id)
+            if task:
+                EditTaskDialog.open_cached(
+                    self.winfo_toplevel(), task, self.refresh_callback,
+                    build_args=(self.db,),
+                )
+
+    def _add_subtask(self):
+        """Добавить подзадачу (наследует категорию родителя)"""
+        if self.task.id is None:
+            return
+        title = simpledialog.askstring(
+            "Новая подзадача",
+            f"Подзадача для «{self.task.title}»:",
+            parent=self.winfo_toplevel(),
+        )
+        if title and title.strip():
+            self.db.add_task(
+                title.strip(), category=self.task.category, parent_id=self.task.id
+            )
+            self.refresh_callback()
+
+    def _delete_task(self):
+        """Удалить задачу"""
+        if self.task.id is not None:
+            question = f"Вы уверены, что хотите удалить задачу #{self.task.id}?"
+            if self.task.subtasks_total:
+                question += f"\nБудут удалены и её подзадачи: {self.task.subtasks_total}."
+            result = messagebox.askyesno("Подтверждение", question)
+            if result:
+                self.db.delete_task(self.task.id)
+                self.refresh_callback()
 
 
-class TaskItem(tk.Frame):
+class TaskItem(TaskActionsMixin, tk.Frame):
     """Виджет для отображения одной задачи"""
 
     def __init__(
-        self, parent, task: Task, db: TodoDatabase, refresh_callback, **kwargs
+        self, parent, task: Task, db: TodoDatabase, refresh_callback, registry=None, **kwargs
     ):
         super().__init__(parent, bg=COLORS["card_bg"], **kwargs)
         self.task = task
         self.db = db
         self.refresh_callback = refresh_callback
+        # Список, который следит за карточками подзадач (внешние правки, сроки)
+        self.registry = registry
+        self.parent_card = None  # карточка родителя, если это раскрытая подзадача
         self.is_hovered = False
+        # Подзадачи строятся лениво при первом раскрытии
+        self.expanded = False
+        self.children_frame = None
 
         self.configure(
             relief=tk.FLAT,
@@ -1061,61 +1569,47 @@ class TaskItem(tk.Frame):
 
         self._create_widgets()
 
-        # Эффект наведения
-        self.bind("<Enter>", self._on_enter)
-        self.bind("<Leave>", self._on_leave)
-
-    def _on_enter(self, e):
-        self.configure(bg=COLORS["card_hover"], highlightbackground=COLORS["accent"])
+        # Эффект наведения: общий обработчик на всю карточку и её потомков
+        HoverDispatcher.for_widget(self).register(self)
 
-    def _on_leave(self, e):
-        self.configure(bg=COLORS["card_bg"], highlightbackground=COLORS["bg_light"])
+    def set_hovered(self, hovered: bool):
+        """Подсветить карточку (вызывается HoverDispatcher)"""
+        self.is_hovered = hovered
+        if hovered:
+            self.configure(bg=COLORS["card_hover"], highlightbackground=COLORS["accent"])
+        else:
+            self.configure(bg=COLORS["card_bg"], highlightbackground=COLORS["bg_light"])
 
     def _create_widgets(self):
         # Padding внутри карточки
         inner_frame = tk.Frame(self, bg=COLORS["card_bg"], padx=15, pady=15)
         inner_frame.pack(fill=tk.BOTH, expand=True)
 
-        # Привязываем события к внутреннему фрейму тоже
-        inner_frame.bind("<Enter>", self._on_enter)
-        inner_frame.bind("<Leave>", self._on_leave)
-
         # Верхняя строка: ID и заголовок с цветным индикатором приоритета
         title_frame = tk.Frame(inner_frame, bg=COLORS["card_bg"])
         title_frame.pack(fill=tk.X, pady=(0, 8))
-        title_frame.bind("<Enter>", self._on_enter)
-        title_frame.bind("<Leave>", self._on_leave)
 
         # Цветной индикатор приоритета
         priority_color = self._get_priority_color()
-        priority_indicator = tk.Canvas(
+        self.priority_indicator = tk.Canvas(
             title_frame, width=5, height=20, bg=priority_color, highlightthickness=0
         )
-        priority_indicator.pack(side=tk.LEFT, padx=(0, 10))
-
-        title_text = f"#{self.task.id}  {self.task.title}"
-        if self.task.is_overdue():
-            title_text += "ПРОСРОЧЕНО"
+        self.priority_indicator.pack(side=tk.LEFT, padx=(0, 10))
 
         title_label = tk.Label(
             title_frame,
-            text=title_text,
+            text=self._get_title_text(),
             font=("Segoe UI", 12, "bold"),
             bg=COLORS["card_bg"],
             fg=COLORS["text"],
             anchor=tk.W,
         )
         title_label.pack(side=tk.LEFT, fill=tk.X, expand=True)
-        title_label.bind("<Enter>", self._on_enter)
-        title_label.bind("<Leave>", self._on_leave)
+        self.title_label = title_label
 
         # Описание (если есть)
         if self.task.description:
-            desc_text = (
-                self.task.description[:150] + "..."
-                if len(self.task.description) > 150
-                else self.task.description
-            )
+            desc_text = get_task_description_preview(self.task)
             desc_label = tk.Label(
                 inner_frame,
                 text=desc_text,
@@ -1127,52 +1621,17 @@ class TaskItem(tk.Frame):
                 wraplength=850,
             )
             desc_label.pack(fill=tk.X, pady=(0, 10))
-            desc_label.bind("<Enter>", self._on_enter)
-            desc_label.bind("<Leave>", self._on_leave)
 
         # Информационная строка с красивыми бейджами
         info_frame = tk.Frame(inner_frame, bg=COLORS["card_bg"])
         info_frame.pack(fill=tk.X, pady=(0, 12))
-        info_frame.bind("<Enter>", self._on_enter)
-        info_frame.bind("<Leave>", self._on_leave)
-
-        if self.task.category != "Без категории":
-            self._create_badge(
-                info_frame, f"📁 {self.task.category}", COLORS["priority_normal"]
-            )
-
-        if self.task.priority != "нет":
-            priority_colors = {
-                "срочно": COLORS["priority_urgent"],
-                "важно": COLORS["priority_important"],
-                "обычно": COLORS["priority_normal"],
-            }
-            priority_color = priority_colors.get(
-                self.task.priority, COLORS["priority_none"]
-            )
-            self._create_badge(
-                info_frame, f"⚡ {self.task.priority.upper()}", priority_color
-            )
-
-        if self.task.due_date:
-            self._create_badge(
-                info_frame, f"🕒 {self.task.due_date}", COLORS["warning"]
-            )
 
-        # Статус бейдж
-        status_colors = {
-            "выполнено": COLORS["status_done"],
-            "в процессе": COLORS["status_progress"],
-            "не выполнено": COLORS["status_todo"],
-        }
-        status_color = status_colors.get(self.task.status, COLORS["priority_none"])
-        self._create_badge(info_frame, f"{self.task.status}", status_color)
+        for text, color in get_task_badges(self.task):
+            self._create_badge(info_frame, text, color)
 
         # Строка с элементами управления
         control_frame = tk.Frame(inner_frame, bg=COLORS["card_bg"])
         control_frame.pack(fill=tk.X)
-        control_frame.bind("<Enter>", self._on_enter)
-        control_frame.bind("<Leave>", self._on_leave)
 
         # Выбор статуса
         tk.Label(
@@ -1218,6 +1677,66 @@ class TaskItem(tk.Frame):
         )
         delete_btn.pack(side=tk.LEFT)
 
+        if not self.task.archived:
+            subtask_btn = ModernButton(
+                control_frame,
+                "＋ Подзадача",
+                self._add_subtask,
+                bg_color=COLORS["bg_light"],
+                hover_color=COLORS["accent"],
+                width=120,
+                height=32,
+            )
+            subtask_btn.pack(side=tk.LEFT, padx=(10, 0))
+
+        if self.task.subtasks_total:
+            self.expand_btn = tk.Button(
+                control_frame,
+                text=self._get_expand_text(),
+                command=self._toggle_subtasks,
+                bg=COLORS["card_bg"],
+                fg=COLORS["text_secondary"],
+                activebackground=COLORS["card_hover"],
+                activeforeground=COLORS["text"],
+                relief=tk.FLAT,
+                font=("Segoe UI", 9),
+                cursor="hand2",
+            )
+            self.expand_btn.pack(side=tk.RIGHT)
+
+        self.inner_frame = inner_frame
+
+    def _get_expand_text(self) -> str:
+        arrow = "▾" if self.expanded else "▸"
+        percent = self.task.get_completion_percent()
+        return f"{arrow} Подзадачи {self.task.subtasks_done}/{self.task.subtasks_total} ({percent}%)"
+
+    def _toggle_subtasks(self):
+        """Раскрыть/свернуть подзадачи; прямые подзадачи загружаются при первом раскрытии"""
+        self.expanded = not self.expanded
+        if self.expanded:
+            if self.children_frame is None:
+                self.children_frame = tk.Frame(self.inner_frame, bg=COLORS["card_bg"])
+                for child in self.db.get_subtasks(self.task.id):
+                    self.add_subtask_card(child)
+            self.children_frame.pack(fill=tk.X, pady=(8, 0))
+        elif self.children_frame is not None:
+            self.children_frame.pack_forget()
+        self.expand_btn.configure(text=self._get_expand_text())
+
+    def add_subtask_card(self, task: Task, before=None) -> "TaskItem":
+        """Карточка подзадачи в раскрытом блоке (регистрируется в списке)"""
+        item = TaskItem(
+            self.children_frame, task, self.db, self.refresh_callback, registry=self.registry
+        )
+        item.pack(fill=tk.X, pady=(8, 0), padx=(24, 0), before=before)
+        item.parent_card = self
+        if self.registry is not None:
+            self.registry.register_subtask_card(item)
+            item.bind("<Destroy>", lambda event: self.registry.unregister_subtask_card(item),
+                      add="+")
+        return item
+
     def _create_badge(self, parent, text, color):
         """Создать цветной бейдж"""
         badge = tk.Label(
@@ -1230,85 +1749,299 @@ class TaskItem(tk.Frame):
             pady=4,
         )
         badge.pack(side=tk.LEFT, padx=(0, 8))
-        badge.bind("<Enter>", self._on_enter)
-        badge.bind("<Leave>", self._on_leave)
+
+    def _get_title_text(self) -> str:
+        """Текст заголовка с отметкой о просрочке"""
+        return get_task_title_text(self.task)
+
+    def refresh_overdue(self):
+        """Перерисовать только заголовок и индикатор после наступления срока"""
+        self.title_label.configure(text=self._get_title_text())
+        self.priority_indicator.configure(bg=self._get_priority_color())
 
     def _get_priority_color(self) -> str:
         """Получить цвет в зависимости от приоритета"""
-        if self.task.status == "выполнено":
-            return COLORS["status_done"]
+        return get_task_priority_color(self.task)
 
-        priority_colors = {
-            "срочно": COLORS["priority_urgent"],
-            "важно": COLORS["priority_important"],
-            "обычно": COLORS["priority_normal"],
-            "нет": COLORS["priority_none"],
-        }
-        return priority_colors.get(self.task.priority, COLORS["priority_none"])
 
-    def _on_status_change(self, event):
-        """Обработчик изменения статуса"""
-        new_status = self.status_var.get()
-        if self.task.id is not None:
-            self.db.update_task_status(self.task.id, new_status)
-            self.refresh_callback()
+class CanvasTaskCard(TaskActionsMixin):
+    """Карточка задачи, нарисованная элементами общего Canvas
 
-    def _edit_task(self):
-        """Открыть окно редактирования"""
-        if self.task.id is not None:
-            task = self.db.get_task_by_id(self.task.id)
-            if task:
-                EditTaskDialog(
-                    self.winfo_toplevel(), task, self.db, self.refresh_callback
-                )
+    Заголовок, описание, бейджи, индикатор приоритета и кнопки — элементы
+    Canvas с общим тегом карточки; настоящий виджет один — Combobox статуса.
+    """
 
-    def _delete_task(self):
-        """Удалить задачу"""
-        if self.task.id is not None:
-            result = messagebox.askyesno(
-                "Подтверждение",
-                f"Вы уверены, что хотите удалить задачу #{self.task.id}?",
-            )
-            if result:
-                self.db.delete_task(self.task.id)
-                self.refresh_callback()
+    PADDING = 15
+
+    def __init__(self, canvas, task: Task, db: TodoDatabase, refresh_callback,
+                 x: int, y: int, width: int):
+        self.canvas = canvas
+        self.task = task
+        self.db = db
+        self.refresh_callback = refresh_callback
+        self.tag = f"card{task.id}"
+        self.status_var = tk.StringVar(master=canvas, value=task.status)
+        self._bindings = []
+        self.height = self._draw(x, y, width)
 
+        # Эффект наведения: один обработчик на тег карточки
+        self._bind(self.tag, "<Enter>", self._on_enter)
+        self._bind(self.tag, "<Leave>", self._on_leave)
 
-class FilterPanel(tk.Frame):
-    """Панель фильтрации и поиска задач"""
+    def _bind(self, tag: str, sequence: str, func):
+        """tag_bind с запоминанием, чтобы снять обработчик при удалении карточки"""
+        funcid = self.canvas.tag_bind(tag, sequence, func)
+        self._bindings.append((tag, sequence, funcid))
 
-    def __init__(self, parent, db: TodoDatabase, apply_callback, **kwargs):
-        super().__init__(parent, bg=COLORS["bg_medium"], **kwargs)
-        self.db = db
-        self.apply_callback = apply_callback
+    def winfo_toplevel(self):
+        return self.canvas.winfo_toplevel()
 
-        self._create_widgets()
+    def winfo_exists(self) -> bool:
+        return bool(self.canvas.find_withtag(self.tag))
 
-    def _create_widgets(self):
-        # Заголовок панели
-        header = tk.Label(
-            self,
-            text="🔍 Фильтры и поиск",
-            font=("Segoe UI", 13, "bold"),
-            bg=COLORS["bg_medium"],
-            fg=COLORS["text"],
+    def _on_enter(self, e):
+        self.canvas.itemconfigure(
+            self.bg_item, fill=COLORS["card_hover"], outline=COLORS["accent"]
         )
-        header.pack(anchor=tk.W, padx=15, pady=(15, 10))
 
-        # Padding для всего содержимого
-        content_frame = tk.Frame(self, bg=COLORS["bg_medium"], padx=15, pady=10)
-        content_frame.pack(fill=tk.BOTH, expand=True)
+    def _on_leave(self, e):
+        self.canvas.itemconfigure(
+            self.bg_item, fill=COLORS["card_bg"], outline=COLORS["bg_light"]
+        )
 
-        # Строка поиска
-        search_frame = tk.Frame(content_frame, bg=COLORS["bg_medium"])
-        search_frame.pack(fill=tk.X, pady=(0, 15))
+    def _draw(self, x: int, y: int, width: int) -> int:
+        """Нарисовать карточку с верхним левым углом (x, y); вернуть её высоту"""
+        c = self.canvas
+        tags = ("card_list", self.tag)
+        pad = self.PADDING
 
-        tk.Label(
-            search_frame,
-            text="Поиск:",
-            width=8,
-            anchor=tk.W,
-            bg=COLORS["bg_medium"],
+        self.bg_item = c.create_rectangle(
+            x, y, x + width, y, fill=COLORS["card_bg"], outline=COLORS["bg_light"],
+            tags=tags,
+        )
+
+        # Индикатор приоритета и заголовок
+        top = y + pad
+        self.priority_item = c.create_rectangle(
+            x + pad, top, x + pad + 5, top + 20,
+            fill=get_task_priority_color(self.task), width=0, tags=tags,
+        )
+        self.title_item = c.create_text(
+            x + pad + 15, top + 10, text=get_task_title_text(self.task), anchor=tk.W,
+            font=("Segoe UI", 12, "bold"), fill=COLORS["text"], tags=tags,
+        )
+        cursor_y = top + 28
+
+        # Описание (если есть)
+        if self.task.description:
+            desc_item = c.create_text(
+                x + pad, cursor_y, text=get_task_description_preview(self.task),
+                anchor=tk.NW, width=min(850, width - 2 * pad), font=("Segoe UI", 9),
+                fill=COLORS["text_secondary"], tags=tags,
+            )
+            cursor_y = c.bbox(desc_item)[3] + 10
+
+        # Бейджи: текст поверх прямоугольника по его границам
+        badge_x = x + pad
+        badge_bottom = cursor_y
+        for text, color in get_task_badges(self.task):
+            text_item = c.create_text(
+                badge_x + 10, cursor_y + 4, text=text, anchor=tk.NW,
+                font=("Segoe UI", 8, "bold"), fill=COLORS["text"], tags=tags,
+            )
+            x1, y1, x2, y2 = c.bbox(text_item)
+            rect_item = c.create_rectangle(
+                x1 - 10, y1 - 4, x2 + 10, y2 + 4, fill=color, width=0, tags=tags
+            )
+            c.tag_raise(text_item, rect_item)
+            badge_x = x2 + 18
+            badge_bottom = y2 + 4
+        cursor_y = badge_bottom + 12
+
+        # Элементы управления: Combobox статуса — единственный виджет карточки
+        label_item = c.create_text(
+            x + pad, cursor_y + 16, text="Изменить статус:", anchor=tk.W,
+            font=("Segoe UI", 9), fill=COLORS["text_secondary"], tags=tags,
+        )
+        combo_x = c.bbox(label_item)[2] + 10
+        self.status_combo = ttk.Combobox(
+            c,
+            textvariable=self.status_var,
+            values=["не выполнено", "в процессе", "выполнено"],
+            state="readonly",
+            width=18,
+            font=("Segoe UI", 9),
+        )
+        self.status_combo.bind("<<ComboboxSelected>>", self._on_status_change)
+        c.create_window(
+            combo_x, cursor_y + 16, window=self.status_combo, anchor=tk.W, tags=tags
+        )
+
+        button_x = combo_x + 175
+        button_x = self._draw_button(
+            button_x, cursor_y, "Редактировать", COLORS["success"], "#6b9b56",
+            self._edit_task,
+        )
+        self._draw_button(
+            button_x + 10, cursor_y, "Удалить", COLORS["danger"], "#ff6666",
+            self._delete_task,
+        )
+
+        bottom = cursor_y + 32 + pad
+        c.coords(self.bg_item, x, y, x + width, bottom)
+        return bottom - y
+
+    def _draw_button(self, x: int, y: int, text: str, color: str, hover_color: str,
+                     command) -> int:
+        """Нарисовать кнопку из прямоугольника и текста; вернуть её правый край"""
+        c = self.canvas
+        button_tag = f"{self.tag}_{text}"
+        tags = ("card_list", self.tag, button_tag)
+        text_item = c.create_text(
+            x + 15, y + 16, text=text, anchor=tk.W, font=("Arial", 10, "bold"),
+            fill=COLORS["text"], tags=tags,
+        )
+        x2 = c.bbox(text_item)[2] + 15
+        rect_item = c.create_rectangle(x, y, x2, y + 32, fill=color, width=0, tags=tags)
+        c.tag_raise(text_item, rect_item)
+
+        self._bind(button_tag, "<Button-1>", lambda e: command())
+        self._bind(
+            button_tag, "<Enter>", lambda e: c.itemconfigure(rect_item, fill=hover_color)
+        )
+        self._bind(
+            button_tag, "<Leave>", lambda e: c.itemconfigure(rect_item, fill=color)
+        )
+        return x2
+
+    def refresh_overdue(self):
+        """Перерисовать только заголовок и индикатор после наступления срока"""
+        self.canvas.itemconfigure(self.title_item, text=get_task_title_text(self.task))
+        self.canvas.itemconfigure(
+            self.priority_item, fill=get_task_priority_color(self.task)
+        )
+
+    def destroy(self):
+        """Удалить элементы карточки, её обработчики и Combobox"""
+        for tag, sequence, funcid in self._bindings:
+            self.canvas.tag_unbind(tag, sequence, funcid)
+        self._bindings.clear()
+        self.canvas.delete(self.tag)
+        self.status_combo.destroy()
+
+
+class CanvasCardList:
+    """Список карточек, нарисованных прямо на Canvas прокрутки (вместо TaskItem)"""
+
+    X = 5
+    CARD_GAP = 16
+
+    def __init__(self, canvas, db: TodoDatabase, refresh_callback):
+        self.canvas = canvas
+        self.db = db
+        self.refresh_callback = refresh_callback
+        self.cards = {}
+        self.bottom = 0
+        self._more_binding = None
+
+    def _width(self) -> int:
+        if self.canvas.winfo_width() <= 1:
+            # Окно ещё не размещено — дать Tk рассчитать геометрию
+            self.canvas.update_idletasks()
+        return max(self.canvas.winfo_width() - 2 * self.X, 600)
+
+    def clear(self):
+        """Убрать все карточки"""
+        for card in self.cards.values():
+            card.destroy()
+        self.cards.clear()
+        self.hide_more_button()
+        self.canvas.delete("card_list")
+        self.bottom = 0
+
+    def append(self, tasks) -> list:
+        """Нарисовать карточки под уже показанными"""
+        width = self._width()
+        cards = []
+        for task in tasks:
+            card = CanvasTaskCard(
+                self.canvas, task, self.db, self.refresh_callback,
+                self.X, self.bottom + 8, width,
+            )
+            self.bottom += card.height + self.CARD_GAP
+            self.cards[task.id] = card
+            cards.append(card)
+        return cards
+
+    def show_message(self, text: str):
+        """Показать сообщение вместо списка"""
+        self.canvas.create_text(
+            self._width() // 2, 40, text=text, font=("Segoe UI", 14),
+            fill=COLORS["text_secondary"], tags=("card_list",),
+        )
+        self.bottom = 80
+
+    def show_more_button(self, command):
+        """Нарисовать кнопку догрузки под карточками"""
+        c = self.canvas
+        tags = ("card_list", "load_more")
+        center = self._width() // 2
+        text_item = c.create_text(
+            center, self.bottom + 26, text="⬇ Показать ещё", font=("Arial", 10, "bold"),
+            fill=COLORS["text"], tags=tags,
+        )
+        rect_item = c.create_rectangle(
+            center - 100, self.bottom + 8, center + 100, self.bottom + 44,
+            fill=COLORS["bg_light"], width=0, tags=tags,
+        )
+        c.tag_raise(text_item, rect_item)
+        self._more_binding = c.tag_bind("load_more", "<Button-1>", lambda e: command())
+
+    def hide_more_button(self):
+        if self._more_binding is not None:
+            self.canvas.tag_unbind("load_more", "<Button-1>", self._more_binding)
+            self._more_binding = None
+        self.canvas.delete("load_more")
+
+    def update_scrollregion(self):
+        self.canvas.configure(scrollregion=(0, 0, self._width(), self.bottom + 60))
+
+
+class FilterPanel(tk.Frame):
+    """Панель фильтрации и поиска задач"""
+
+    def __init__(self, parent, db: TodoDatabase, apply_callback, **kwargs):
+        super().__init__(parent, bg=COLORS["bg_medium"], **kwargs)
+        self.db = db
+        self.apply_callback = apply_callback
+
+        self._create_widgets()
+
+    def _create_widgets(self):
+        # Заголовок панели
+        header = tk.Label(
+            self,
+            text="🔍 Фильтры и поиск",
+            font=("Segoe UI", 13, "bold"),
+            bg=COLORS["bg_medium"],
+            fg=COLORS["text"],
+        )
+        header.pack(anchor=tk.W, padx=15, pady=(15, 10))
+
+        # Padding для всего содержимого
+        content_frame = tk.Frame(self, bg=COLORS["bg_medium"], padx=15, pady=10)
+        content_frame.pack(fill=tk.BOTH, expand=True)
+
+        # Строка поиска
+        search_frame = tk.Frame(content_frame, bg=COLORS["bg_medium"])
+        search_frame.pack(fill=tk.X, pady=(0, 15))
+
+        tk.Label(
+            search_frame,
+            text="Поиск:",
+            width=8,
+            anchor=tk.W,
+            bg=COLORS["bg_medium"],
             fg=COLORS["text"],
             font=("Segoe UI", 10),
         ).pack(side=tk.LEFT, padx=(0, 10))
@@ -1339,6 +2072,21 @@ class FilterPanel(tk.Frame):
         )
         clear_btn.pack(side=tk.LEFT)
 
+        # Нечёткий поиск находит слова с опечатками и сортирует по сходству
+        self.fuzzy_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            search_frame,
+            text="Нечёткий поиск",
+            variable=self.fuzzy_var,
+            command=self.apply_callback,
+            bg=COLORS["bg_medium"],
+            fg=COLORS["text"],
+            selectcolor=COLORS["bg_light"],
+            activebackground=COLORS["bg_medium"],
+            activeforeground=COLORS["text"],
+            font=("Segoe UI", 9),
+        ).pack(side=tk.LEFT, padx=(20, 0))
+
         # Фильтры - первая строка
         filter_frame1 = tk.Frame(content_frame, bg=COLORS["bg_medium"])
         filter_frame1.pack(fill=tk.X, pady=(0, 10))
@@ -1440,14 +2188,74 @@ class FilterPanel(tk.Frame):
         sort_combo = ttk.Combobox(
             filter_frame2,
             textvariable=self.sort_var,
-            values=["Старые", "Новые"],
+            values=list(SORT_OPTIONS),
             state="readonly",
-            width=12,
+            width=16,
             font=("Segoe UI", 9),
         )
         sort_combo.bind("<<ComboboxSelected>>", lambda e: self.apply_callback())
         sort_combo.grid(row=0, column=3, sticky=tk.W)
 
+        # Архивные задачи показываются только по запросу
+        self.include_archive_var = tk.BooleanVar(value=False)
+        tk.Checkbutton(
+            filter_frame2,
+            text="Включая архив",
+            variable=self.include_archive_var,
+            command=self.apply_callback,
+            bg=COLORS["bg_medium"],
+            fg=COLORS["text"],
+            selectcolor=COLORS["bg_light"],
+            activebackground=COLORS["bg_medium"],
+            activeforeground=COLORS["text"],
+            font=("Segoe UI", 9),
+        ).grid(row=0, column=4, sticky=tk.W, padx=(20, 0))
+
+        # Метки: "a b -c" — с метками a и b, без метки c
+        tags_frame = tk.Frame(content_frame, bg=COLORS["bg_medium"])
+        tags_frame.pack(fill=tk.X, pady=(0, 15))
+        tk.Label(
+            tags_frame,
+            text="Метки:",
+            width=8,
+            anchor=tk.W,
+            bg=COLORS["bg_medium"],
+            fg=COLORS["text"],
+            font=("Segoe UI", 10),
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        self.tags_var = tk.StringVar()
+        tags_entry = tk.Entry(
+            tags_frame,
+            textvariable=self.tags_var,
+            bg=COLORS["bg_light"],
+            fg=COLORS["text"],
+            insertbackground=COLORS["text"],
+            relief=tk.FLAT,
+            font=("Segoe UI", 10),
+            bd=5,
+            width=39,
+        )
+        tags_entry.pack(side=tk.LEFT, padx=(0, 10))
+        # Фильтр применяется по Enter, а не на каждую букву недописанной метки
+        tags_entry.bind("<Return>", lambda e: self.apply_callback())
+        tags_entry.bind("<FocusOut>", lambda e: self.apply_callback())
+        self.tags_hint = tk.Label(
+            tags_frame,
+            text="напр.: работа дом -отпуск",
+            bg=COLORS["bg_medium"],
+            fg=COLORS["text_secondary"],
+            font=("Segoe UI", 9),
+        )
+        self.tags_hint.pack(side=tk.LEFT)
+
+    def update_tag_hint(self):
+        """Показать самые частые метки со счётчиками задач"""
+        top = self.db.get_tags()[:5]
+        if top:
+            self.tags_hint.configure(
+                text="  ".join(f"#{name} ({count})" for name, count in top)
+            )
+
     def update_category_values(self):
         """Обновить список категорий"""
         categories = ["Все"] + self.db.get_categories()
@@ -1466,12 +2274,43 @@ class FilterPanel(tk.Frame):
         self.priority_var.set("Все")
         self.status_var.set("Все")
         self.sort_var.set("Старые")
+        self.include_archive_var.set(False)
+        self.tags_var.set("")
         self.apply_callback()
 
+    def get_state(self) -> dict:
+        """Значения всех полей панели как есть (для записи и воспроизведения сессии)"""
+        return {
+            "search": self.search_var.get(),
+            "fuzzy": self.fuzzy_var.get(),
+            "category": self.category_var.get(),
+            "priority": self.priority_var.get(),
+            "status": self.status_var.get(),
+            "sort": self.sort_var.get(),
+            "include_archive": self.include_archive_var.get(),
+            "tags": self.tags_var.get(),
+        }
+
+    def set_state(self, state: dict):
+        """Выставить поля панели и применить фильтры ровно один раз"""
+        self.category_var.set(state.get("category", "Все"))
+        self.priority_var.set(state.get("priority", "Все"))
+        self.status_var.set(state.get("status", "Все"))
+        self.sort_var.set(state.get("sort", "Старые"))
+        self.include_archive_var.set(state.get("include_archive", False))
+        self.tags_var.set(state.get("tags", ""))
+        self.fuzzy_var.set(state.get("fuzzy", False))
+        search = state.get("search", "")
+        if search != self.search_var.get():
+            self.search_var.set(search)  # trace сам вызывает apply_callback
+        else:
+            self.apply_callback()
+
     def get_filters(self) -> dict:
         """Получить текущие значения фильтров"""
         return {
             "search": self.search_var.get().strip(),
+            "fuzzy": self.fuzzy_var.get(),
             "category": None
             if self.category_var.get() == "Все"
             else self.category_var.get(),
@@ -1479,28 +2318,1309 @@ class FilterPanel(tk.Frame):
             if self.priority_var.get() == "Все"
             else self.priority_var.get(),
             "status": None if self.status_var.get() == "Все" else self.status_var.get(),
-            "sort_order": "DESC" if "конца" in self.sort_var.get() else "ASC",
+            "sort": SORT_OPTIONS.get(self.sort_var.get(), "oldest"),
+            "include_archive": self.include_archive_var.get(),
+            "tags": self.tags_var.get().strip(),
         }
 
 
+class SmoothScroller:
+    """Прокрутка Canvas с накоплением событий колеса и применением раз в кадр
+
+    События колеса только суммируют смещение в пикселях; само смещение
+    применяется таймером не чаще раза в FRAME_MS, а перерисовку Tk делает
+    сам в простое. При кинетической прокрутке (по умолчанию выключена)
+    остаток скорости затухает по кадрам.
+    """
+
+    FRAME_MS = 16
+    PIXELS_PER_NOTCH = 60  # один щелчок колеса
+    # delta одного щелчка: 120 в Windows, в macOS Tk присылает сами щелчки (±1 и больше)
+    DELTA_PER_NOTCH = 1 if sys.platform == "darwin" else 120
+    KINETIC_GAIN = 0.6  # доля смещения, переходящая в инерцию
+    FRICTION = 0.85  # затухание скорости за кадр
+    MIN_VELOCITY = 0.5  # пикселей за кадр, ниже — остановка
+
+    def __init__(self, canvas, kinetic: bool = False):
+        self.canvas = canvas
+        self.kinetic = kinetic
+        self._pending = 0.0
+        self._flush_id = None
+        self._velocity = 0.0
+        self._kinetic_id = None
+
+    def on_wheel(self, event):
+        """Накопить смещение от события колеса (Windows/macOS/Linux)"""
+        metrics.incr("scroll.events")
+        if event.num == 4:
+            pixels = -self.PIXELS_PER_NOTCH
+        elif event.num == 5:
+            pixels = self.PIXELS_PER_NOTCH
+        else:
+            # Тачпады присылают дробные доли щелчка — сохраняем их точно
+            pixels = -event.delta / self.DELTA_PER_NOTCH * self.PIXELS_PER_NOTCH
+        self._pending += pixels
+        if self._flush_id is None:
+            # Очередь простоя опустела бы сразу после пачки событий, поэтому
+            # кадр отмеряется таймером: все события за FRAME_MS — один сдвиг
+            self._flush_id = self.canvas.after(self.FRAME_MS, self._flush)
+
+    def _flush(self):
+        """Применить накопленное смещение одним перемещением"""
+        self._flush_id = None
+        pixels, self._pending = self._pending, 0.0
+        metrics.incr("scroll.flushes")
+        self._apply(pixels)
+        if self.kinetic:
+            self._velocity += pixels * self.KINETIC_GAIN * (1 - self.FRICTION)
+            if self._kinetic_id is None and abs(self._velocity) >= self.MIN_VELOCITY:
+                self._kinetic_id = self.canvas.after(self.FRAME_MS, self._kinetic_step)
+
+    def _kinetic_step(self):
+        """Один кадр инерционной прокрутки"""
+        self._kinetic_id = None
+        self._velocity *= self.FRICTION
+        if abs(self._velocity) < self.MIN_VELOCITY:
+            self._velocity = 0.0
+            return
+        self._apply(self._velocity)
+        self._kinetic_id = self.canvas.after(self.FRAME_MS, self._kinetic_step)
+
+    def stop(self):
+        """Остановить инерцию и отменить ещё не применённое смещение"""
+        self._velocity = 0.0
+        self._pending = 0.0
+        if self._flush_id is not None:
+            self.canvas.after_cancel(self._flush_id)
+            self._flush_id = None
+        if self._kinetic_id is not None:
+            self.canvas.after_cancel(self._kinetic_id)
+            self._kinetic_id = None
+
+    def _apply(self, pixels: float):
+        """Сдвинуть вид на pixels с точностью до пикселя и замерить время кадра"""
+        region = self.canvas.cget("scrollregion")
+        if not region or not pixels:
+            return
+        _, y1, _, y2 = (float(v) for v in region.split())
+        total = y2 - y1
+        visible = self.canvas.winfo_height()
+        if total <= visible:
+            return
+        with metrics.timer("scroll.frame"):
+            top = self.canvas.yview()[0] + pixels / total
+            top = max(0.0, min(top, 1 - visible / total))
+            self.canvas.yview_moveto(top)
+
+
+class ReminderToast(tk.Toplevel):
+    """Немодальное уведомление о наступлении срока задачи"""
+
+    # Через сколько миллисекунд уведомление закрывается само
+    AUTO_CLOSE_MS = 30000
+
+    def __init__(self, parent, task_id: int, title: str, due_date: str):
+        super().__init__(parent)
+        self.title("⏰ Напоминание")
+        self.configure(bg=COLORS["bg_medium"])
+        self.resizable(False, False)
+        self.attributes("-topmost", True)
+
+        tk.Label(
+            self,
+            text=f"⏰ Наступил срок задачи #{task_id}",
+            bg=COLORS["bg_medium"],
+            fg=COLORS["accent"],
+            font=("Segoe UI", 11, "bold"),
+        ).pack(anchor=tk.W, padx=20, pady=(15, 5))
+
+        tk.Label(
+            self,
+            text=f"{title}\n🕒 {due_date}",
+            bg=COLORS["bg_medium"],
+            fg=COLORS["text"],
+            font=("Segoe UI", 10),
+            justify=tk.LEFT,
+            wraplength=320,
+        ).pack(anchor=tk.W, padx=20, pady=(0, 10))
+
+        ModernButton(
+            self,
+            "OK",
+            self.destroy,
+            bg_color=COLORS["bg_light"],
+            hover_color=COLORS["accent"],
+            width=80,
+            height=30,
+        ).pack(pady=(0, 15))
+
+        # Правый нижний угол экрана
+        self.update_idletasks()
+        x = self.winfo_screenwidth() - self.winfo_width() - 40
+        y = self.winfo_screenheight() - self.winfo_height() - 80
+        self.geometry(f"+{x}+{y}")
+
+        self.bell()
+        self.after(self.AUTO_CLOSE_MS, self.destroy)
+
+
+class MonthCalendarView(tk.Toplevel):
+    """Календарь месяца: число задач и «тепло» приоритета по дням"""
+
+    WEEKDAYS = ("Пн", "Вт", "Ср", "Чт", "Пт", "Сб", "Вс")
+    MONTHS = (
+        "Январь", "Февраль", "Март", "Апрель", "Май", "Июнь",
+        "Июль", "Август", "Сентябрь", "Октябрь", "Ноябрь", "Декабрь",
+    )
+    # Лучший ранг приоритета невыполненных задач дня -> цвет ячейки
+    HEAT_COLORS = {
+        0: COLORS["priority_urgent"],
+        1: COLORS["priority_important"],
+        2: COLORS["priority_normal"],
+        3: COLORS["priority_none"],
+    }
+
+    _instance = None
+
+    @classmethod
+    def open(cls, parent, db: TodoDatabase, refresh_callback):
+        """Показать единственный экземпляр окна календаря"""
+        if cls._instance is not None and cls._instance.winfo_exists():
+            cls._instance.deiconify()
+            cls._instance.lift()
+            return cls._instance
+        cls._instance = cls(parent, db, refresh_callback)
+        return cls._instance
+
+    def __init__(self, parent, db: TodoDatabase, refresh_callback):
+        super().__init__(parent)
+        self.db = db
+        self.refresh_callback = refresh_callback
+        self.title("🗓 Задачи по месяцам")
+        self.configure(bg=COLORS["bg_dark"])
+        self.resizable(False, False)
+
+        today = datetime.now()
+        self.year, self.month = today.year, today.month
+        self.today = today.strftime("%Y-%m-%d")
+        self.selected_day = None
+        self.day_tasks = []
+        # Ячейки видимой сетки: ГГГГ-ММ-ДД -> (рамка, метка числа, метка количества)
+        self.cells = {}
+
+        # Сводки кэшируются по месяцам, изменения задач пересчитывают только свои дни
+        self.cache = MonthSummaryCache(db)
+        self.cache.on_days_changed(self._on_days_changed)
+
+        self._create_widgets()
+        self._show_month()
+        self.protocol("WM_DELETE_WINDOW", self._close)
+
+    def _create_widgets(self):
+        header = tk.Frame(self, bg=COLORS["bg_dark"])
+        header.pack(fill=tk.X, padx=15, pady=(15, 10))
+
+        for text, step, side in (("◀", -1, tk.LEFT), ("▶", 1, tk.RIGHT)):
+            tk.Button(
+                header,
+                text=text,
+                command=lambda s=step: self._shift_month(s),
+                bg=COLORS["bg_light"],
+                fg=COLORS["text"],
+                activebackground=COLORS["accent"],
+                relief=tk.FLAT,
+                width=3,
+                cursor="hand2",
+            ).pack(side=side)
+
+        self.month_label = tk.Label(
+            header,
+            bg=COLORS["bg_dark"],
+            fg=COLORS["text"],
+            font=("Segoe UI", 14, "bold"),
+        )
+        self.month_label.pack(side=tk.LEFT, expand=True)
+
+        grid = tk.Frame(self, bg=COLORS["bg_dark"])
+        grid.pack(padx=15)
+        for col, name in enumerate(self.WEEKDAYS):
+            tk.Label(
+                grid,
+                text=name,
+                bg=COLORS["bg_dark"],
+                fg=COLORS["accent"] if col >= 5 else COLORS["text_secondary"],
+                font=("Segoe UI", 9, "bold"),
+            ).grid(row=0, column=col, pady=(0, 4))
+
+        # Сетка 6x7 строится один раз, при смене месяца меняются только подписи
+        self.grid_cells = []
+        for row in range(6):
+            for col in range(7):
+                frame = tk.Frame(
+                    grid, bg=COLORS["card_bg"], width=70, height=52,
+                    highlightthickness=1, highlightbackground=COLORS["bg_light"],
+                    cursor="hand2",
+                )
+                frame.grid(row=row + 1, column=col, padx=2, pady=2)
+                frame.pack_propagate(False)
+                day_label = tk.Label(
+                    frame, bg=COLORS["card_bg"], fg=COLORS["text"],
+                    font=("Segoe UI", 10, "bold"), anchor=tk.NW,
+                )
+                day_label.pack(fill=tk.X, padx=4, pady=(2, 0))
+                count_label = tk.Label(
+                    frame, bg=COLORS["card_bg"], fg=COLORS["text"],
+                    font=("Segoe UI", 9), anchor=tk.SE,
+                )
+                count_label.pack(fill=tk.X, side=tk.BOTTOM, padx=4, pady=(0, 2))
+                for widget in (frame, day_label, count_label):
+                    widget.bind("<Button-1>", lambda e, i=len(self.grid_cells): self._on_cell_click(i))
+                self.grid_cells.append((frame, day_label, count_label))
+
+        # Задачи выбранного дня
+        self.day_label = tk.Label(
+            self,
+            text="Выберите день",
+            bg=COLORS["bg_dark"],
+            fg=COLORS["text_secondary"],
+            font=("Segoe UI", 10, "bold"),
+            anchor=tk.W,
+        )
+        self.day_label.pack(fill=tk.X, padx=15, pady=(12, 4))
+
+        self.day_listbox = tk.Listbox(
+            self,
+            bg=COLORS["bg_light"],
+            fg=COLORS["text"],
+            font=("Segoe UI", 10),
+            height=7,
+            selectbackground=COLORS["accent"],
+            selectforeground=COLORS["text"],
+            relief=tk.FLAT,
+            activestyle="none",
+        )
+        self.day_listbox.pack(fill=tk.BOTH, padx=15, pady=(0, 15))
+        self.day_listbox.bind("<Double-Button-1>", self._edit_selected)
+
+    def _shift_month(self, step: int):
+        """Перейти на соседний месяц"""
+        index = self.year * 12 + (self.month - 1) + step
+        self.year, self.month = divmod(index, 12)
+        self.month += 1
+        self._show_month()
+
+    def _show_month(self):
+        """Разложить дни месяца по сетке и раскрасить их из кэша"""
+        self.month_label.configure(text=f"{self.MONTHS[self.month - 1]} {self.year}")
+        weeks = calendar.Calendar().monthdatescalendar(self.year, self.month)
+        days = [day for week in weeks for day in week][:42]
+        self.cells.clear()
+        self._cell_days = []
+        for index, cell in enumerate(self.grid_cells):
+            day = days[index] if index < len(days) else None
+            key = day.strftime("%Y-%m-%d") if day and day.month == self.month else None
+            self._cell_days.append(key)
+            frame, day_label, count_label = cell
+            if key is None:
+                self._paint_cell(cell, "", "", COLORS["bg_dark"])
+                frame.configure(highlightbackground=COLORS["bg_dark"])
+                continue
+            self.cells[key] = cell
+            day_label.configure(text=str(day.day))
+        self._paint_days(self.cells.keys())
+
+    def _paint_days(self, days):
+        """Перерисовать ячейки указанных дней видимого месяца"""
+        summary = self.cache.get_month(self.year, self.month)
+        for day in days:
+            cell = self.cells.get(day)
+            if cell is None:
+                continue
+            count, rank = summary.get(day, (0, None))
+            if not count:
+                color = COLORS["card_bg"]
+            elif rank is None:
+                color = COLORS["status_done"]  # Все задачи дня выполнены
+            else:
+                color = self.HEAT_COLORS.get(rank, COLORS["priority_none"])
+            self._paint_cell(cell, None, f"📋 {count}" if count else "", color)
+            if day == self.selected_day:
+                border = COLORS["accent"]
+            elif day == self.today:
+                border = COLORS["warning"]
+            else:
+                border = COLORS["bg_light"]
+            cell[0].configure(highlightbackground=border)
+
+    def _paint_cell(self, cell, day_text, count_text, color):
+        frame, day_label, count_label = cell
+        frame.configure(bg=color)
+        if day_text is not None:
+            day_label.configure(text=day_text)
+        day_label.configure(bg=color)
+        count_label.configure(text=count_text, bg=color)
+
+    def _on_days_changed(self, days):
+        """Изменились задачи в днях days (None — сброшен весь кэш)"""
+        if not self.winfo_exists():
+            return
+        self._paint_days(self.cells.keys() if days is None else days)
+        if self.selected_day and (days is None or self.selected_day in days):
+            self._load_day(self.selected_day)
+
+    def _on_cell_click(self, index: int):
+        day = self._cell_days[index]
+        if day is None:
+            return
+        previous, self.selected_day = self.selected_day, day
+        self._paint_days([d for d in (previous, day) if d])
+        self._load_day(day)
+
+    def _load_day(self, day: str):
+        """Загрузить только задачи выбранного дня"""
+        self.day_tasks = self.db.query_tasks(
+            TaskQuery(date_from=day, date_to=day + " 23:59:59", sort="due_date")
+        )
+        self.day_label.configure(
+            text=f"📅 {day}: задач — {len(self.day_tasks)}", fg=COLORS["text"]
+        )
+        self.day_listbox.delete(0, tk.END)
+        for task in self.day_tasks:
+            time_part = task.due_date[11:16] if task.due_date else ""
+            mark = "✓" if task.status == "выполнено" else "•"
+            self.day_listbox.insert(tk.END, f"{mark} {time_part}  {task.title}  [{task.priority}]")
+
+    def _edit_selected(self, event=None):
+        """Открыть редактирование задачи по двойному щелчку"""
+        selection = self.day_listbox.curselection()
+        if not selection:
+            return
+        task = self.db.get_task_by_id(self.day_tasks[selection[0]].id)
+        if task:
+            EditTaskDialog.open_cached(
+                self, task, self.refresh_callback, build_args=(self.db,)
+            )
+
+    def _close(self):
+        self.cache.close()
+        MonthCalendarView._instance = None
+        self.destroy()
+
+
+class KanbanCard(tk.Frame):
+    """Компактная карточка задачи на доске"""
+
+    def __init__(self, column, task: Task):
+        super().__init__(
+            column.cards_frame, bg=COLORS["card_bg"],
+            highlightthickness=1, highlightbackground=COLORS["bg_light"],
+            cursor="hand2",
+        )
+        self.column = column
+        self.task = task
+
+        stripe = tk.Frame(self, bg=get_task_priority_color(task), width=4)
+        stripe.pack(side=tk.LEFT, fill=tk.Y)
+        title = tk.Label(
+            self, text=task.title, bg=COLORS["card_bg"], fg=COLORS["text"],
+            font=("Segoe UI", 10, "bold"), anchor=tk.W, justify=tk.LEFT,
+            wraplength=230,
+        )
+        title.pack(fill=tk.X, padx=8, pady=(6, 0))
+        details = f"{task.category} · {task.priority}"
+        if task.due_date:
+            details += f"\n🕒 {task.due_date}"
+        info = tk.Label(
+            self, text=details, bg=COLORS["card_bg"], fg=COLORS["text_secondary"],
+            font=("Segoe UI", 8), anchor=tk.W, justify=tk.LEFT,
+        )
+        info.pack(fill=tk.X, padx=8, pady=(0, 6))
+
+        for widget in (self, stripe, title, info):
+            widget.bind("<ButtonRelease-1>", self._on_release)
+            widget.bind("<Double-Button-1>", self._on_double_click)
+
+    def _on_release(self, event):
+        """Перетаскивание: карточку отпустили над другой колонкой"""
+        self.column.board.drop_card(self, event.x_root, event.y_root)
+
+    def _on_double_click(self, event):
+        self.column.board.edit_task(self.task.id)
+
+
+class KanbanColumn(tk.Frame):
+    """Колонка доски: задачи одного статуса, страницы догружаются при прокрутке"""
+
+    # Догружать следующую страницу, когда низ видимой области ближе этой доли
+    LOAD_THRESHOLD = 0.9
+
+    def __init__(self, parent, board, status: str, color: str):
+        super().__init__(parent, bg=COLORS["bg_medium"], padx=8, pady=8)
+        self.board = board
+        self.status = status
+        self.query = TaskQuery(status=status, sort="oldest", limit=board.PAGE_SIZE + 1)
+        self.cards = {}  # id -> KanbanCard в порядке id
+        self.last_id = None
+        self.has_more = True
+        self._loading = False
+
+        self.header = tk.Label(
+            self, bg=COLORS["bg_medium"], fg=color,
+            font=("Segoe UI", 12, "bold"), anchor=tk.W,
+        )
+        self.header.pack(fill=tk.X, pady=(0, 8))
+
+        body = tk.Frame(self, bg=COLORS["bg_medium"])
+        body.pack(fill=tk.BOTH, expand=True)
+        self.canvas = tk.Canvas(
+            body, bg=COLORS["bg_medium"], highlightthickness=0, width=260
+        )
+        self.scrollbar = ttk.Scrollbar(body, orient=tk.VERTICAL, command=self.canvas.yview)
+        self.cards_frame = tk.Frame(self.canvas, bg=COLORS["bg_medium"])
+        self.cards_frame.bind(
+            "<Configure>",
+            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")),
+        )
+        self.canvas.create_window((0, 0), window=self.cards_frame, anchor=tk.NW)
+        self.canvas.configure(yscrollcommand=self._on_scroll)
+        self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.load_more()
+
+    def _update_header(self):
+        more = "+" if self.has_more else ""
+        self.header.configure(text=f"{self.status} ({len(self.cards)}{more})")
+
+    def _on_scroll(self, first, last):
+        """Прокрутка колонки: обновить полосу и при приближении к низу догрузить"""
+        self.scrollbar.set(first, last)
+        if self.has_more and not self._loading and float(last) >= self.LOAD_THRESHOLD:
+            self._loading = True
+            self.after_idle(self.load_more)
+
+    def load_more(self):
+        """Загрузить следующую страницу своего статуса (keyset по id)"""
+        after = None if self.last_id is None else (self.last_id,)  # курсор сортировки по id
+        tasks = self.board.db.query_tasks(replace(self.query, after=after))
+        self.has_more = len(tasks) > self.board.PAGE_SIZE
+        tasks = tasks[: self.board.PAGE_SIZE]
+        for task in tasks:
+            self._add_card(task)
+        if tasks:
+            self.last_id = tasks[-1].id
+        self._loading = False
+        self._update_header()
+
+    def _add_card(self, task: Task, before=None):
+        card = KanbanCard(self, task)
+        if before is None:
+            card.pack(fill=tk.X, pady=4)
+        else:
+            card.pack(fill=tk.X, pady=4, before=before)
+        self.cards[task.id] = card
+
+    def insert_task(self, task: Task):
+        """Вставить задачу на её место по id, если оно в уже загруженной части"""
+        if self.has_more and (self.last_id is None or task.id > self.last_id):
+            return  # Задача придёт со следующей страницей
+        following = [card for tid, card in self.cards.items() if tid > task.id]
+        before = min(following, key=lambda card: card.task.id) if following else None
+        self._add_card(task, before)
+        # Порядок словаря поддерживаем по id, как в выборке
+        self.cards = dict(sorted(self.cards.items()))
+        if self.last_id is None or task.id > self.last_id:
+            self.last_id = task.id
+        self._update_header()
+
+    def remove_task(self, task_id: int) -> bool:
+        """Убрать карточку задачи, если она есть в колонке"""
+        card = self.cards.pop(task_id, None)
+        if card is None:
+            return False
+        card.destroy()
+        self._update_header()
+        return True
+
+    def reload(self):
+        """Перечитать колонку с первой страницы"""
+        for card in self.cards.values():
+            card.destroy()
+        self.cards.clear()
+        self.last_id = None
+        self.has_more = True
+        self.load_more()
+
+    def scroll(self, units: int):
+        self.canvas.yview_scroll(units, "units")
+
+
+class KanbanBoard(tk.Toplevel):
+    """Доска задач по статусам: у каждой колонки своя постраничная выборка"""
+
+    STATUSES = (
+        ("не выполнено", COLORS["status_todo"]),
+        ("в процессе", COLORS["status_progress"]),
+        ("выполнено", COLORS["status_done"]),
+    )
+    PAGE_SIZE = 50
+
+    _instance = None
+
+    @classmethod
+    def open(cls, parent, db: TodoDatabase, refresh_callback):
+        """Показать единственный экземпляр доски"""
+        if cls._instance is not None and cls._instance.winfo_exists():
+            cls._instance.deiconify()
+            cls._instance.lift()
+            return cls._instance
+        cls._instance = cls(parent, db, refresh_callback)
+        return cls._instance
+
+    def __init__(self, parent, db: TodoDatabase, refresh_callback):
+        super().__init__(parent)
+        self.db = db
+        self.refresh_callback = refresh_callback
+        self._changed = False
+        self.title("📋 Доска задач")
+        self.geometry("900x700")
+        self.configure(bg=COLORS["bg_dark"])
+
+        columns_frame = tk.Frame(self, bg=COLORS["bg_dark"])
+        columns_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        self.columns = {}
+        for index, (status, color) in enumerate(self.STATUSES):
+            column = KanbanColumn(columns_frame, self, status, color)
+            column.grid(row=0, column=index, sticky=tk.NSEW, padx=5)
+            columns_frame.columnconfigure(index, weight=1)
+            self.columns[status] = column
+        columns_frame.rowconfigure(0, weight=1)
+
+        # Колесо мыши внутри доски прокручивает колонку под курсором
+        # (привязка на окне срабатывает раньше общей bind_all и прерывает её)
+        for sequence in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.bind(sequence, self._on_mousewheel)
+
+        # Изменения задач (с доски и из других окон) точечно правят колонки
+        self.db.subscribe(self._on_task_change)
+        self.protocol("WM_DELETE_WINDOW", self._close)
+
+    def _column_at(self, x_root: int, y_root: int) -> Optional[KanbanColumn]:
+        try:
+            widget = self.winfo_containing(x_root, y_root)
+        except KeyError:
+            return None
+        while widget is not None and not isinstance(widget, KanbanColumn):
+            widget = widget.master
+        return widget
+
+    def _on_mousewheel(self, event):
+        column = self._column_at(event.x_root, event.y_root)
+        if column is not None:
+            if event.num == 4 or getattr(event, "delta", 0) > 0:
+                column.scroll(-2)
+            else:
+                column.scroll(2)
+        return "break"
+
+    def drop_card(self, card: KanbanCard, x_root: int, y_root: int):
+        """Перенести карточку в колонку под курсором одним обновлением статуса"""
+        target = self._column_at(x_root, y_root)
+        if target is None or target is card.column:
+            return
+        self.db.update_task_status(card.task.id, target.status)
+
+    def edit_task(self, task_id: int):
+        task = self.db.get_task_by_id(task_id)
+        if task:
+            EditTaskDialog.open_cached(
+                self, task, lambda: None, build_args=(self.db,)
+            )
+
+    def _on_task_change(self, change: TaskChange):
+        """Убрать карточку из прежней колонки и вставить в колонку нового статуса"""
+        if not self.winfo_exists():
+            return
+        self._changed = True
+        if change.action == "reload":
+            # Внешних изменений слишком много — перечитываем колонки
+            for column in self.columns.values():
+                column.reload()
+            return
+        for column in self.columns.values():
+            if column.remove_task(change.task_id):
+                break
+        task = change.after
+        if task is not None and task.status in self.columns:
+            self.columns[task.status].insert_task(task)
+
+    def _close(self):
+        self.db.unsubscribe(self._on_task_change)
+        KanbanBoard._instance = None
+        self.destroy()
+        # Главный список перестраивается один раз после работы с доской
+        if self._changed:
+            self.refresh_callback()
+
+
+class SmartListSidebar(tk.Frame):
+    """Боковая панель умных списков с числом задач в каждом
+
+    Числа берутся из одной таблицы smart_lists (их поддерживает
+    TodoDatabase), так что обновление панели не выполняет выборку по
+    каждому списку. Обновление откладывается на REFRESH_MS после изменения,
+    чтобы пачка правок перерисовала панель один раз.
+    """
+
+    REFRESH_MS = 300
+    ALL_LABEL = "📋 Все задачи"
+
+    def __init__(self, parent, db: TodoDatabase, select_callback, save_callback):
+        super().__init__(parent, bg=COLORS["bg_medium"], padx=10, pady=10)
+        self.db = db
+        self.select_callback = select_callback
+        self.save_callback = save_callback
+        self.lists = []
+        self.selected_id = None
+        self._refresh_job = None
+
+        tk.Label(
+            self,
+            text="Умные списки",
+            bg=COLORS["bg_medium"],
+            fg=COLORS["text"],
+            font=("Segoe UI", 11, "bold"),
+        ).pack(anchor=tk.W, pady=(0, 8))
+
+        self.listbox = tk.Listbox(
+            self,
+            width=26,
+            bg=COLORS["bg_light"],
+            fg=COLORS["text"],
+            selectbackground=COLORS["accent"],
+            selectforeground=COLORS["text"],
+            relief=tk.FLAT,
+            bd=0,
+            highlightthickness=0,
+            activestyle="none",
+            font=("Segoe UI", 10),
+            exportselection=False,
+        )
+        self.listbox.pack(fill=tk.BOTH, expand=True)
+        self.listbox.bind("<<ListboxSelect>>", self._on_select)
+
+        buttons = tk.Frame(self, bg=COLORS["bg_medium"])
+        buttons.pack(fill=tk.X, pady=(8, 0))
+        ModernButton(
+            buttons,
+            "＋ Сохранить",
+            self.save_callback,
+            bg_color=COLORS["bg_light"],
+            hover_color=COLORS["accent"],
+            width=120,
+            height=30,
+        ).pack(side=tk.LEFT)
+        ModernButton(
+            buttons,
+            "✕",
+            self._delete_selected,
+            bg_color=COLORS["bg_light"],
+            hover_color=COLORS["danger"],
+            width=40,
+            height=30,
+        ).pack(side=tk.RIGHT)
+
+        self.refresh()
+        self.db.subscribe(self._on_task_change)
+
+    def close(self):
+        self.db.unsubscribe(self._on_task_change)
+        if self._refresh_job is not None:
+            self.after_cancel(self._refresh_job)
+            self._refresh_job = None
+
+    def _on_task_change(self, change: TaskChange):
+        if self._refresh_job is None:
+            self._refresh_job = self.after(self.REFRESH_MS, self.refresh)
+
+    def refresh(self):
+        """Перечитать списки и их числа задач"""
+        self._refresh_job = None
+        self.lists = self.db.get_smart_lists()
+        self.listbox.delete(0, tk.END)
+        self.listbox.insert(tk.END, self.ALL_LABEL)
+        for smart_list in self.lists:
+            self.listbox.insert(tk.END, f"{smart_list.name}  ({smart_list.task_count})")
+        ids = [None] + [smart_list.id for smart_list in self.lists]
+        if self.selected_id not in ids:
+            self.selected_id = None
+            self.select_callback(None)
+        self.listbox.selection_set(ids.index(self.selected_id))
+
+    def _on_select(self, event=None):
+        selection = self.listbox.curselection()
+        if not selection:
+            return
+        list_id = None if selection[0] == 0 else self.lists[selection[0] - 1].id
+        if list_id != self.selected_id:
+            self.selected_id = list_id
+            self.select_callback(list_id)
+
+    def _delete_selected(self):
+        if self.selected_id is None:
+            return
+        smart_list = next(item for item in self.lists if item.id == self.selected_id)
+        if messagebox.askyesno("Умные списки", f"Удалить список «{smart_list.name}»?"):
+            self.db.delete_smart_list(smart_list.id)
+            self.refresh()
+
+
+class SmartListDialog(tk.Toplevel):
+    """Сохранение текущих фильтров как умного списка
+
+    Категория, приоритет, статус и метки берутся из панели фильтров;
+    в окне задаются имя, "только невыполненные" и срок в ближайшие N дней.
+    """
+
+    def __init__(self, parent, db: TodoDatabase, filters: dict, saved_callback):
+        super().__init__(parent)
+        self.db = db
+        self.filters = filters
+        self.saved_callback = saved_callback
+        self.title("Новый умный список")
+        self.configure(bg=COLORS["bg_dark"])
+        self.resizable(False, False)
+        self.transient(parent)
+
+        frame = tk.Frame(self, bg=COLORS["bg_dark"])
+        frame.pack(fill=tk.BOTH, padx=20, pady=20)
+
+        tk.Label(
+            frame, text="Название:", bg=COLORS["bg_dark"], fg=COLORS["text"],
+            font=("Segoe UI", 10),
+        ).grid(row=0, column=0, sticky=tk.W, pady=(0, 10))
+        self.name_var = tk.StringVar()
+        name_entry = tk.Entry(
+            frame,
+            textvariable=self.name_var,
+            width=30,
+            bg=COLORS["bg_light"],
+            fg=COLORS["text"],
+            insertbackground=COLORS["text"],
+            relief=tk.FLAT,
+            font=("Segoe UI", 10),
+            bd=2,
+        )
+        name_entry.grid(row=0, column=1, sticky=tk.W, pady=(0, 10))
+
+        summary = ", ".join(
+            f"{label}: {filters[key]}"
+            for key, label in (("category", "категория"), ("priority", "приоритет"),
+                               ("status", "статус"), ("tags", "метки"))
+            if filters.get(key)
+        )
+        tk.Label(
+            frame,
+            text=f"Фильтры: {summary or 'нет'}",
+            bg=COLORS["bg_dark"],
+            fg=COLORS["text_secondary"],
+            font=("Segoe UI", 9),
+            wraplength=360,
+            justify=tk.LEFT,
+        ).grid(row=1, column=0, columnspan=2, sticky=tk.W, pady=(0, 10))
+
+        self.not_done_var = tk.BooleanVar(value=not filters.get("status"))
+        tk.Checkbutton(
+            frame,
+            text="Только невыполненные",
+            variable=self.not_done_var,
+            bg=COLORS["bg_dark"],
+            fg=COLORS["text"],
+            selectcolor=COLORS["bg_light"],
+            activebackground=COLORS["bg_dark"],
+            activeforeground=COLORS["text"],
+            font=("Segoe UI", 9),
+        ).grid(row=2, column=0, columnspan=2, sticky=tk.W, pady=(0, 10))
+
+        tk.Label(
+            frame, text="Срок в ближайшие дни:", bg=COLORS["bg_dark"], fg=COLORS["text"],
+            font=("Segoe UI", 10),
+        ).grid(row=3, column=0, sticky=tk.W, pady=(0, 10))
+        self.days_var = tk.StringVar()
+        tk.Entry(
+            frame,
+            textvariable=self.days_var,
+            width=6,
+            bg=COLORS["bg_light"],
+            fg=COLORS["text"],
+            insertbackground=COLORS["text"],
+            relief=tk.FLAT,
+            font=("Segoe UI", 10),
+            bd=2,
+        ).grid(row=3, column=1, sticky=tk.W, pady=(0, 10))
+
+        buttons = tk.Frame(frame, bg=COLORS["bg_dark"])
+        buttons.grid(row=4, column=0, columnspan=2, pady=(10, 0))
+        ModernButton(
+            buttons,
+            "Сохранить",
+            self._save,
+            bg_color=COLORS["success"],
+            hover_color="#6b9b56",
+            width=130,
+            height=36,
+        ).pack(side=tk.LEFT, padx=(0, 10))
+        ModernButton(
+            buttons,
+            "Отмена",
+            self.destroy,
+            bg_color=COLORS["bg_light"],
+            hover_color=COLORS["accent"],
+            width=100,
+            height=36,
+        ).pack(side=tk.LEFT)
+
+        name_entry.focus_set()
+        self.bind("<Return>", lambda e: self._save())
+        self.bind("<Escape>", lambda e: self.destroy())
+
+    def _save(self):
+        name = self.name_var.get().strip()
+        if not name:
+            messagebox.showwarning("Предупреждение", "Название не может быть пустым!", parent=self)
+            return
+        days = self.days_var.get().strip()
+        if days and not days.isdigit():
+            messagebox.showwarning("Предупреждение", "Число дней — целое число", parent=self)
+            return
+        tags, exclude_tags = parse_tag_filter(self.filters.get("tags") or "")
+        smart_list = SmartList(
+            name=name,
+            category=self.filters.get("category"),
+            priority=self.filters.get("priority"),
+            status=self.filters.get("status"),
+            exclude_status="выполнено" if self.not_done_var.get() else None,
+            tags=tags,
+            exclude_tags=exclude_tags,
+            due_within_days=int(days) if days else None,
+        )
+        try:
+            list_id = self.db.add_smart_list(smart_list)
+        except sqlite3.IntegrityError:
+            messagebox.showerror("Ошибка", "Список с таким названием уже есть!", parent=self)
+            return
+        self.destroy()
+        self.saved_callback(list_id)
+
+
+class ReportDialog(tk.Toplevel):
+    """Отчёт по всем задачам (категории и статусы) в HTML, Markdown или CSV
+
+    Отчёт собирается в фоне (ReportJob); окно только опрашивает прогресс.
+    """
+
+    FORMATS = (("HTML", "html"), ("Markdown", "md"), ("CSV", "csv"))
+    POLL_MS = 100
+
+    _instance = None
+
+    @classmethod
+    def open(cls, parent, db: TodoDatabase):
+        """Показать единственный экземпляр окна отчёта"""
+        if cls._instance is not None and cls._instance.winfo_exists():
+            cls._instance.deiconify()
+            cls._instance.lift()
+            return cls._instance
+        cls._instance = cls(parent, db)
+        return cls._instance
+
+    def __init__(self, parent, db: TodoDatabase):
+        super().__init__(parent)
+        self.db = db
+        self.job = None
+        self.title("📊 Отчёт по задачам")
+        self.configure(bg=COLORS["bg_dark"])
+        self.resizable(False, False)
+
+        frame = tk.Frame(self, bg=COLORS["bg_dark"])
+        frame.pack(fill=tk.BOTH, padx=20, pady=20)
+
+        tk.Label(
+            frame, text="Формат:", bg=COLORS["bg_dark"], fg=COLORS["text"],
+            font=("Segoe UI", 10),
+        ).grid(row=0, column=0, sticky=tk.W, pady=(0, 10))
+        self.format_var = tk.StringVar(value=self.FORMATS[0][0])
+        format_combo = ttk.Combobox(
+            frame,
+            textvariable=self.format_var,
+            values=[label for label, _ in self.FORMATS],
+            state="readonly",
+            width=12,
+            font=("Segoe UI", 10),
+        )
+        format_combo.grid(row=0, column=1, sticky=tk.W, pady=(0, 10))
+        format_combo.bind("<<ComboboxSelected>>", self._on_format_change)
+
+        tk.Label(
+            frame, text="Файл:", bg=COLORS["bg_dark"], fg=COLORS["text"],
+            font=("Segoe UI", 10),
+        ).grid(row=1, column=0, sticky=tk.W, pady=(0, 10))
+        self.path_var = tk.StringVar(
+            value=os.path.abspath(f"report_{datetime.now():%Y-%m-%d}.html")
+        )
+        tk.Entry(
+            frame,
+            textvariable=self.path_var,
+            width=40,
+            bg=COLORS["bg_light"],
+            fg=COLORS["text"],
+            insertbackground=COLORS["text"],
+            relief=tk.FLAT,
+            font=("Segoe UI", 10),
+            bd=2,
+        ).grid(row=1, column=1, sticky=tk.W, pady=(0, 10))
+        tk.Button(
+            frame,
+            text="…",
+            command=self._choose_path,
+            bg=COLORS["bg_light"],
+            fg=COLORS["text"],
+            relief=tk.FLAT,
+            cursor="hand2",
+        ).grid(row=1, column=2, padx=(5, 0), pady=(0, 10))
+
+        self.progress = ttk.Progressbar(frame, length=360, mode="determinate")
+        self.progress.grid(row=2, column=0, columnspan=3, sticky=tk.EW, pady=(5, 5))
+        self.status_label = tk.Label(
+            frame, text="", bg=COLORS["bg_dark"], fg=COLORS["text_secondary"],
+            font=("Segoe UI", 9),
+        )
+        self.status_label.grid(row=3, column=0, columnspan=3, sticky=tk.W)
+
+        buttons = tk.Frame(frame, bg=COLORS["bg_dark"])
+        buttons.grid(row=4, column=0, columnspan=3, pady=(15, 0))
+        self.start_button = ModernButton(
+            buttons,
+            "Сформировать",
+            self._start,
+            bg_color=COLORS["success"],
+            hover_color="#6b9b56",
+            width=150,
+            height=36,
+        )
+        self.start_button.pack(side=tk.LEFT, padx=(0, 10))
+        ModernButton(
+            buttons,
+            "Отмена",
+            self._cancel,
+            bg_color=COLORS["bg_light"],
+            hover_color=COLORS["accent"],
+            width=110,
+            height=36,
+        ).pack(side=tk.LEFT)
+
+        self.protocol("WM_DELETE_WINDOW", self._close)
+
+    def _format(self) -> str:
+        return dict(self.FORMATS)[self.format_var.get()]
+
+    def _on_format_change(self, event=None):
+        """Сменить расширение файла под выбранный формат"""
+        base, _ = os.path.splitext(self.path_var.get())
+        self.path_var.set(base + REPORT_FORMATS[self._format()])
+
+    def _choose_path(self):
+        extension = REPORT_FORMATS[self._format()]
+        path = filedialog.asksaveasfilename(
+            parent=self,
+            defaultextension=extension,
+            initialfile=os.path.basename(self.path_var.get()),
+            initialdir=os.path.dirname(self.path_var.get()),
+            filetypes=[(self.format_var.get(), "*" + extension)],
+        )
+        if path:
+            self.path_var.set(path)
+
+    def _start(self):
+        if self.job is not None and self.job.running:
+            return
+        path = self.path_var.get().strip()
+        if not path:
+            messagebox.showwarning("Предупреждение", "Укажите файл отчёта!", parent=self)
+            return
+        self.job = ReportJob(self.db, path, self._format())
+        self.job.start()
+        self.status_label.config(text="Подготовка…")
+        self.after(self.POLL_MS, self._poll)
+
+    def _poll(self):
+        """Обновить прогресс; по окончании показать итог"""
+        if not self.winfo_exists() or self.job is None:
+            return
+        job = self.job
+        if job.rows_total:
+            self.progress["value"] = 100 * job.rows_done / job.rows_total
+            self.status_label.config(text=f"Задач: {job.rows_done} из {job.rows_total}")
+        if job.running:
+            self.after(self.POLL_MS, self._poll)
+            return
+        if job.error is not None:
+            self.status_label.config(text="")
+            messagebox.showerror("Ошибка", f"Не удалось сформировать отчёт: {job.error}", parent=self)
+        elif job.cancelled:
+            self.progress["value"] = 0
+            self.status_label.config(text="Отменено")
+        else:
+            self.status_label.config(text=f"Готово: {job.path}")
+
+    def _cancel(self):
+        """Отменить сборку, а если она не идёт — закрыть окно"""
+        if self.job is not None and self.job.running:
+            self.job.cancel()
+        else:
+            self._close()
+
+    def _close(self):
+        if self.job is not None:
+            self.job.cancel()
+        self.destroy()
+
+
 class TodoApp:
     """Главное приложение менеджера задач с тёмной темой"""
 
-    def __init__(self, root):
+    # Сколько карточек загружать за одну страницу
+    PAGE_SIZE = 100
+    # Для скольких первых карточек страницы заранее читаются полные задачи
+    PREFETCH_CARDS = 20
+    # Сколько задач переносится в архив за одну пачку
+    ARCHIVE_BATCH_SIZE = 500
+    # Сколько действий профилируется после Ctrl+Shift+P
+    PROFILE_ACTIONS = 5
+
+    def __init__(self, root, db: Optional[TodoDatabase] = None, card_renderer: str = "frame"):
         self.root = root
-        self.db = TodoDatabase()
+        self.db = db or TodoDatabase()
+        # "frame" — карточки TaskItem из виджетов, "canvas" — карточки на Canvas
+        self.card_renderer = card_renderer
+        self.card_list = None
 
         self.root.title("📝 Менеджер задач - Тёмная тема")
         self.root.geometry("1200x900")
         self.root.configure(bg=COLORS["bg_dark"])
 
+        # Видимые карточки по id и таймер на ближайший срок среди них
+        self.task_items = {}
+        # Карточки подзадач в раскрытых блоках по id (см. TaskItem.add_subtask_card)
+        self.subtask_items = {}
+        self.overdue_timer = DeadlineTimer(self.root, self._on_card_overdue)
+        self._page_query = None
+        self._last_task = None
+        self._has_more = False
+        self._more_button = None
+        # Выбранный в боковой панели умный список (None — все задачи)
+        self.smart_list_id = None
+
+        # Поиск утечек: ROUTINE_LEAK_CHECK=N — замер каждые N обновлений списка
+        self.leak_detector = None
+        leak_every = os.environ.get("ROUTINE_LEAK_CHECK")
+        if leak_every:
+            self.leak_detector = LeakDetector(self.root, every=int(leak_every))
+
+        # Колоночный снимок задач в памяти: ROUTINE_COLUMNAR=1 — фильтры
+        # и сортировки без запросов к SQLite (поиск и метки идут в БД)
+        self.task_store = None
+        if os.environ.get("ROUTINE_COLUMNAR"):
+            self.task_store = ColumnarTaskStore(self.db)
+
+        # Упреждающая загрузка вероятных следующих видов в фоне:
+        # ROUTINE_PREFETCH=N — сколько выборок держать в кэше (по умолчанию выключено)
+        self.prefetcher = None
+        self._prefetch_after_id = None
+        self._prefetch_ids = []
+        prefetch_size = int(os.environ.get("ROUTINE_PREFETCH", "0"))
+        if prefetch_size > 0:
+            self.prefetcher = self.root._prefetcher = QueryPrefetcher(self.db, prefetch_size)
+            self.prefetcher.start()
+
+        # Подсказки заголовков и категорий из памяти (обновляются по подписке)
+        self.autocomplete = autocomplete_for(self.root, self.db)
+
         self._setup_styles()
         self._create_widgets()
         self.refresh_tasks()
 
+        # Напоминания о сроках: один таймер на ближайший срок
+        self.reminders = ReminderScheduler(self.root, self.db, self._show_reminder)
+        self.reminders.start()
+
+        # Изменения БД другими процессами: опрос PRAGMA data_version
+        # (ROUTINE_SYNC_INTERVAL_MS, 0 — выключить) и точечное обновление карточек
+        self.db.subscribe(self._on_external_change)
+        self.change_watcher = None
+        sync_interval = int(os.environ.get("ROUTINE_SYNC_INTERVAL_MS", "1000"))
+        if sync_interval > 0:
+            self.change_watcher = ExternalChangeWatcher(self.root, self.db, sync_interval)
+            self.change_watcher.start()
+
+        # Архивация старых выполненных задач по одной пачке в простое:
+        # ROUTINE_ARCHIVE_DAYS=N — переносить выполненные больше N дней назад
+        # (по умолчанию выключено)
+        self._archived_count = 0
+        self.archive_after_days = int(os.environ.get("ROUTINE_ARCHIVE_DAYS", "0"))
+        if self.archive_after_days > 0:
+            self.root.after_idle(self._archive_step)
+
+        self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
+        # Профилирование следующих действий: ROUTINE_PROFILE=N или Ctrl+Shift+P
+        profile_actions = os.environ.get("ROUTINE_PROFILE")
+        if profile_actions:
+            action_profiler.arm(
+                int(profile_actions), os.environ.get("ROUTINE_PROFILE_DIR")
+            )
+        self.root.bind_all("<Control-Shift-P>", self._arm_profiler)
+
+        # Запись действий для tools/replay.py: ROUTINE_RECORD=путь.jsonl
+        record_path = os.environ.get("ROUTINE_RECORD")
+        if record_path:
+            session_recorder.start(record_path)
+
+        # Диалоги строятся заранее в простое, открытие только подставляет данные
+        self.root.after(
+            500,
+            lambda: DialogCache.for_widget(self.root).prebuild(
+                (EditTaskDialog, self.db),
+                (CalendarDialog,),
+                (TimePickerDialog,),
+                (ManageCategoriesDialog, self.db),
+            ),
+        )
+
+    def _on_close(self):
+        """Закрытие окна: при ROUTINE_METRICS=1 печатаем собранные метрики"""
+        if os.environ.get("ROUTINE_METRICS"):
+            print(metrics.report())
+            if self.prefetcher is not None:
+                print(f"prefetch hit rate: {self.prefetcher.hit_rate:.0%}")
+        if self.leak_detector is not None:
+            print(self.leak_detector.summary())
+            self.leak_detector.stop()
+        session_recorder.stop()
+        if self.change_watcher is not None:
+            self.change_watcher.stop()
+        if self.task_store is not None:
+            self.task_store.close()
+        if self.prefetcher is not None:
+            self.prefetcher.stop()
+        self.autocomplete.close()
+        self.smart_sidebar.close()
+        self.root.destroy()
+
     def _get_all_categories(self):
-        """Получить список всех категорий из БД"""
-        return self.db.get_categories()
+        """Получить список всех категорий (из индекса подсказок, без запроса к БД)"""
+        return self.autocomplete.categories.items()
+
+    def _arm_profiler(self, event=None):
+        """Ctrl+Shift+P: профилировать следующие PROFILE_ACTIONS действий"""
+        action_profiler.arm(self.PROFILE_ACTIONS, os.environ.get("ROUTINE_PROFILE_DIR"))
+        print(f"Профилирование следующих {self.PROFILE_ACTIONS} действий -> "
+              f"{os.path.abspath(action_profiler.out_dir)}")
+        self.root.bell()
+
+    def _show_reminder(self, task_id: int, title: str, due_date: str):
+        """Показать уведомление о наступлении срока"""
+        ReminderToast(self.root, task_id, title, due_date)
+
+    def _archive_step(self):
+        """Перенести в архив одну пачку задач и запланировать следующую"""
+        moved = self.db.archive_completed(
+            self.archive_after_days, self.ARCHIVE_BATCH_SIZE, max_batches=1
+        )
+        self._archived_count += moved
+        if moved == self.ARCHIVE_BATCH_SIZE:
+            self.root.after(50, self._archive_step)
+        elif self._archived_count:
+            # Архивные задачи пропадают из основного списка
+            self.refresh_tasks()
+
+    def _on_external_change(self, change: TaskChange):
+        """Изменение из другого процесса: обновить только карточку этой задачи"""
+        if not change.external:
+            return  # Свои изменения список обрабатывает через refresh_callback
+        if change.action == "reload" or self.card_list is not None:
+            # Карточки на Canvas не заменяются по одной — перестраиваем страницу
+            self.refresh_tasks()
+            return
+
+        item = self.task_items.get(change.task_id)
+        if item is not None:
+            task = None
+            if change.after is not None:
+                # Подходит ли изменённая задача под текущие фильтры
+                matches = self._query_tasks(
+                    replace(self._page_query, task_id=change.task_id, after=None, limit=None)
+                )
+                task = matches[0] if matches else None
+            if task is None:
+                del self.task_items[change.task_id]
+                self.overdue_timer.discard(change.task_id)
+                item.destroy()
+            else:
+                new_item = TaskItem(
+                    self.tasks_frame, task, self.db, self.refresh_tasks, registry=self
+                )
+                new_item.pack(fill=tk.X, pady=8, padx=5, before=item)
+                item.destroy()
+                self.task_items[task.id] = new_item
+                self.overdue_timer.discard(task.id)
+                self._track_deadline(new_item)
+            self._update_scrollregion()
+        elif change.task_id in self.subtask_items:
+            self._replace_subtask_card(self.subtask_items[change.task_id], change.after)
+        elif change.after is not None and self._more_button is None:
+            # Если есть кнопка «Показать ещё», задача придёт с одной из следующих страниц
+            if self._last_task is None:
+                self.apply_filters()
+            else:
+                # Конец списка уже показан: догружаем то, что появилось после него
+                tasks, has_more = self._fetch_page(after=self._cursor())
+                if tasks:
+                    self._append_tasks(tasks, has_more)
+
+    def _on_card_overdue(self, task_id: int):
+        """Срок видимой карточки наступил — перерисовать только её"""
+        for task_item in (self.task_items.get(task_id), self.subtask_items.get(task_id)):
+            if task_item is not None and task_item.winfo_exists():
+                task_item.refresh_overdue()
+
+    def register_subtask_card(self, task_item):
+        """Карточка подзадачи в раскрытом блоке: следить за её правками и сроком"""
+        self.subtask_items[task_item.task.id] = task_item
+        self._track_deadline(task_item)
+
+    def unregister_subtask_card(self, task_item):
+        """Карточку подзадачи удалили (свернули родителя, перестроили список)"""
+        task_id = task_item.task.id
+        if self.subtask_items.get(task_id) is task_item:
+            del self.subtask_items[task_id]
+            if task_id not in self.task_items:
+                self.overdue_timer.discard(task_id)
+
+    def _replace_subtask_card(self, task_item, task: Optional[Task]):
+        """Внешняя правка подзадачи: заменить её карточку или убрать, если
+        задачу удалили или перенесли к другому родителю"""
+        if task is not None and task.parent_id == task_item.task.parent_id:
+            task_item.parent_card.add_subtask_card(task, before=task_item)
+        task_item.destroy()
+
+    def _track_deadline(self, task_item):
+        """Поставить карточку в очередь на перерисовку при наступлении срока"""
+        task = task_item.task
+        due = parse_due_date(task.due_date)
+        if due is None or task.status == "выполнено" or due <= datetime.now():
+            return
+        self.overdue_timer.schedule(task.id, due)
 
     def _setup_styles(self):
         """Настройка стилей для тёмной темы"""
@@ -1579,6 +3699,7 @@ class TodoApp:
             width=30,
         )
         title_entry.grid(row=0, column=1, sticky=tk.W, pady=(0, 10))
+        SuggestionPopup(title_entry, self.title_var, self.autocomplete.complete_title)
 
         # Описание
         tk.Label(
@@ -1623,10 +3744,14 @@ class TodoApp:
             values=self._get_all_categories(),
             width=12,
             font=("Segoe UI", 10),
+            postcommand=lambda: self.category_combo.configure(
+                values=category_choices(self.autocomplete, self.category_var.get())
+            ),
         )
         self.category_combo.grid(
             row=2, column=1, sticky=tk.W, pady=(0, 10), padx=(0, 10)
         )
+        SuggestionPopup(self.category_combo, self.category_var, self.autocomplete.complete_category)
 
         # Приоритет
         tk.Label(
@@ -1732,9 +3857,31 @@ class TodoApp:
         )
         self.time_btn.pack(side=tk.LEFT, padx=(2, 0))
 
+        # Метки
+        tk.Label(
+            add_frame,
+            text="Метки:",
+            bg=COLORS["bg_medium"],
+            fg=COLORS["text"],
+            font=("Segoe UI", 10),
+            width=10,
+        ).grid(row=6, column=0, sticky=tk.W, pady=(0, 10))
+        self.tags_var = tk.StringVar()
+        tk.Entry(
+            add_frame,
+            textvariable=self.tags_var,
+            width=30,
+            bg=COLORS["bg_light"],
+            fg=COLORS["text"],
+            insertbackground=COLORS["text"],
+            relief=tk.FLAT,
+            font=("Segoe UI", 10),
+            bd=2,
+        ).grid(row=6, column=1, sticky=tk.W, pady=(0, 10))
+
         # Кнопки
         buttons_frame = tk.Frame(add_frame, bg=COLORS["bg_medium"])
-        buttons_frame.grid(row=6, column=1, sticky=tk.W, pady=(0, 5))
+        buttons_frame.grid(row=7, column=1, sticky=tk.W, pady=(0, 5))
 
         add_btn = ModernButton(
             buttons_frame,
@@ -1758,6 +3905,39 @@ class TodoApp:
         )
         manage_cat_btn.pack(side=tk.LEFT)
 
+        month_btn = ModernButton(
+            buttons_frame,
+            "🗓 Месяц",
+            self._open_month_view,
+            bg_color=COLORS["bg_light"],
+            hover_color=COLORS["accent"],
+            width=120,
+            height=40,
+        )
+        month_btn.pack(side=tk.LEFT, padx=(10, 0))
+
+        board_btn = ModernButton(
+            buttons_frame,
+            "📋 Доска",
+            self._open_kanban_board,
+            bg_color=COLORS["bg_light"],
+            hover_color=COLORS["accent"],
+            width=120,
+            height=40,
+        )
+        board_btn.pack(side=tk.LEFT, padx=(10, 0))
+
+        report_btn = ModernButton(
+            buttons_frame,
+            "📊 Отчёт",
+            self._open_report_dialog,
+            bg_color=COLORS["bg_light"],
+            hover_color=COLORS["accent"],
+            width=120,
+            height=40,
+        )
+        report_btn.pack(side=tk.LEFT, padx=(10, 0))
+
         # ПАНЕЛЬ ФИЛЬТРОВ
         self.filter_panel = FilterPanel(main_container, self.db, self.apply_filters)
         self.filter_panel.pack(fill=tk.X, pady=(0, 15))
@@ -1767,6 +3947,12 @@ class TodoApp:
         tasks_container = tk.Frame(main_container, bg=COLORS["bg_dark"])
         tasks_container.pack(fill=tk.BOTH, expand=True)
 
+        # Умные списки слева от списка задач
+        self.smart_sidebar = SmartListSidebar(
+            tasks_container, self.db, self._select_smart_list, self._save_smart_list
+        )
+        self.smart_sidebar.pack(side=tk.LEFT, fill=tk.Y, padx=(0, 15))
+
         # Canvas для прокрутки
         self.canvas = tk.Canvas(
             tasks_container, bg=COLORS["bg_dark"], highlightthickness=0
@@ -1776,55 +3962,74 @@ class TodoApp:
         )
 
         self.tasks_frame = tk.Frame(self.canvas, bg=COLORS["bg_dark"])
-        self.tasks_frame.bind(
-            "<Configure>",
-            lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")),
-        )
-
-        self.canvas.create_window((0, 0), window=self.tasks_frame, anchor=tk.NW)
+        if self.card_renderer == "canvas":
+            # Карточки рисуются прямо на canvas, tasks_frame не используется
+            self.card_list = CanvasCardList(self.canvas, self.db, self.refresh_tasks)
+        else:
+            self.tasks_frame.bind(
+                "<Configure>",
+                lambda e: self.canvas.configure(scrollregion=self.canvas.bbox("all")),
+            )
+            self.canvas.create_window((0, 0), window=self.tasks_frame, anchor=tk.NW)
         self.canvas.configure(yscrollcommand=scrollbar.set)
 
         self.canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
 
-        # Привязка прокрутки колесом мыши
+        # Привязка прокрутки колесом мыши (ROUTINE_KINETIC_SCROLL=1 — с инерцией)
+        self.scroller = SmoothScroller(
+            self.canvas, kinetic=os.environ.get("ROUTINE_KINETIC_SCROLL") == "1"
+        )
         self.canvas.bind_all("<MouseWheel>", self._on_mousewheel)
         self.canvas.bind_all("<Button-4>", self._on_mousewheel)  # Linux
         self.canvas.bind_all("<Button-5>", self._on_mousewheel)  # Linux
 
     def _on_mousewheel(self, event):
         """Обработка прокрутки колесом мыши"""
-        if event.num == 4 or event.delta > 0:
-            self.canvas.yview_scroll(-1, "units")
-        elif event.num == 5 or event.delta < 0:
-            self.canvas.yview_scroll(1, "units")
+        session_recorder.record("scroll", num=event.num, delta=getattr(event, "delta", 0))
+        self.scroller.on_wheel(event)
 
     def _open_manage_categories(self):
         """Открыть диалог управления категориями"""
 
         def update_categories():
-            # Обновляем combobox категорий
+            # Обновляем подсказки и combobox категорий
+            self.autocomplete.reload_categories()
             self.category_combo["values"] = self._get_all_categories()
             self.filter_panel.update_category_values()
             self.refresh_tasks()
 
-        ManageCategoriesDialog(self.root, self.db, update_categories)
+        ManageCategoriesDialog.open_cached(
+            self.root, update_categories, build_args=(self.db,)
+        )
+
+    def _open_month_view(self):
+        """Открыть календарь задач по месяцам"""
+        MonthCalendarView.open(self.root, self.db, self.refresh_tasks)
+
+    def _open_kanban_board(self):
+        """Открыть доску задач по статусам"""
+        KanbanBoard.open(self.root, self.db, self.refresh_tasks)
+
+    def _open_report_dialog(self):
+        """Открыть окно отчёта по всем задачам"""
+        ReportDialog.open(self.root, self.db)
 
     def _open_calendar_dialog(self):
         """Открыть диалог календаря"""
         current_date = (
             self.date_var.get() if self.date_var.get() != "ГГГГ-ММ-ДД" else None
         )
-        dialog = CalendarDialog(self.root, current_date)
-        self.root.wait_window(dialog)
+        dialog = CalendarDialog.open_cached(self.root, current_date)
+        dialog.wait_closed()
         if hasattr(dialog, "selected_date") and dialog.selected_date:
             self.date_var.set(dialog.selected_date)
 
     def _open_time_picker_dialog(self):
         """Открыть диалог выбора времени"""
         current_time = self.time_var.get() if self.time_var.get() != "ЧЧ:ММ" else None
-        dialog = TimePickerDialog(self.root, current_time)
-        self.root.wait_window(dialog)
+        dialog = TimePickerDialog.open_cached(self.root, current_time)
+        dialog.wait_closed()
         if hasattr(dialog, "selected_time") and dialog.selected_time:
             self.time_var.set(dialog.selected_time)
 
@@ -1844,6 +4049,7 @@ class TodoApp:
         except ValueError:
             return None
 
+    @profiled_action("_add_task")
     def _add_task(self):
         """Добавить новую задачу"""
         title = self.title_var.get().strip()
@@ -1859,7 +4065,13 @@ class TodoApp:
         due_date_dt = self._get_datetime_from_entries()
         due_date = due_date_dt.strftime("%Y-%m-%d %H:%M:%S") if due_date_dt else None
 
-        self.db.add_task(title, description, category, priority, due_date)
+        tags = self.tags_var.get().split()
+
+        session_recorder.record(
+            "add", title=title, description=description, category=category,
+            priority=priority, due_date=due_date, tags=tags,
+        )
+        self.db.add_task(title, description, category, priority, due_date, tags=tags)
 
         # Обновляем список категорий в combobox
         self.category_combo["values"] = self._get_all_categories()
@@ -1869,6 +4081,7 @@ class TodoApp:
         self.desc_text.delete(1.0, tk.END)
         self.category_var.set("Без категории")
         self.priority_var.set("нет")
+        self.tags_var.set("")
         self.date_var.set("")
         self.date_entry.delete(0, tk.END)
         self.date_entry.insert(0, "ГГГГ-ММ-ДД")
@@ -1878,37 +4091,160 @@ class TodoApp:
 
         self.refresh_tasks()
 
+    @profiled_action("apply_filters")
     def apply_filters(self):
         """Применить фильтры и поиск"""
-        filters = self.filter_panel.get_filters()
+        session_recorder.record_filters(self.filter_panel.get_state())
+        self._page_query = self._build_page_query(self.filter_panel.get_filters())
+        tasks, has_more = self._fetch_page(after=None)
+        self._display_tasks(tasks, has_more)
+        self._schedule_prefetch()
+
+    def _build_page_query(self, filters: dict) -> TaskQuery:
+        """Запрос первой страницы по значениям панели фильтров
+
+        Поиск и фильтры объединяются в один запрос; первая страница,
+        остальные догружаются по кнопке.
+        """
+        tags, exclude_tags = parse_tag_filter(filters["tags"])
+        return TaskQuery(
+            search=filters["search"] or None,
+            fuzzy=filters["fuzzy"],
+            category=filters["category"],
+            priority=filters["priority"],
+            status=filters["status"],
+            sort=filters["sort"],
+            limit=self.PAGE_SIZE + 1,
+            include_archive=filters["include_archive"],
+            tags=tags,
+            exclude_tags=exclude_tags,
+            roots_only=self._roots_only(filters, tags, exclude_tags),
+            smart_list=self.smart_list_id,
+        )
 
-        if filters["search"]:
-            # Если есть поисковый запрос
-            tasks = self.db.search_tasks(filters["search"])
-        else:
-            # Применяем фильтры
-            tasks = self.db.filter_tasks(
-                category=filters["category"],
-                priority=filters["priority"],
-                status=filters["status"],
-                sort_order=filters["sort_order"],
-            )
+    def _roots_only(self, filters: dict, tags, exclude_tags) -> bool:
+        """Без поиска и фильтров список показывает только задачи верхнего уровня
+
+        Подзадачи раскрываются внутри карточек родителя; при поиске и
+        фильтрах совпавшие подзадачи показываются в общем списке.
+        Карточки на Canvas раскрытие не поддерживают.
+        """
+        if self.card_renderer != "frame" or self.smart_list_id is not None:
+            return False
+        return not (
+            filters["search"] or filters["category"] or filters["priority"]
+            or filters["status"] or tags or exclude_tags
+        )
+
+    def _select_smart_list(self, list_id: Optional[int]):
+        """Показать задачи умного списка (фильтры панели сужают его дальше)"""
+        self.smart_list_id = list_id
+        self.apply_filters()
+
+    def _save_smart_list(self):
+        """Сохранить текущие фильтры панели как умный список"""
+
+        def saved(list_id: int):
+            self.smart_sidebar.selected_id = list_id
+            self.smart_sidebar.refresh()
+            self._select_smart_list(list_id)
+
+        SmartListDialog(self.root, self.db, self.filter_panel.get_filters(), saved)
 
-        self._display_tasks(tasks)
+    def _cursor(self) -> Optional[tuple]:
+        """Курсор следующей страницы: ключи сортировки последней показанной задачи
+
+        Ключи берутся из загруженной строки, поэтому удаление или правка этой
+        задачи не сбивает догрузку.
+        """
+        if self._last_task is None:
+            return None
+        return sort_cursor(self._last_task, self._page_query.sort)
+
+    def _fetch_page(self, after: Optional[tuple]):
+        """Загрузить страницу задач после курсора (см. _cursor)"""
+        query = replace(self._page_query, after=after)
+        tasks = self.prefetcher.get(query) if self._prefetchable(query) else None
+        if tasks is None:
+            tasks = self._query_tasks(query)
+        return tasks[: self.PAGE_SIZE], len(tasks) > self.PAGE_SIZE
+
+    def _query_tasks(self, query: TaskQuery):
+        """Выборка из колоночного снимка, если он включён и её считает, иначе из БД"""
+        if self.task_store is not None:
+            tasks = self.task_store.query(query)
+            if tasks is not None:
+                return tasks
+        return self.db.query_tasks(query)
+
+    def _load_more(self):
+        """Догрузить следующую страницу без перестройки уже показанных карточек"""
+        tasks, has_more = self._fetch_page(after=self._cursor())
+        self._append_tasks(tasks, has_more)
+        self._schedule_prefetch()
+
+    def _prefetchable(self, query: TaskQuery) -> bool:
+        """Стоит ли держать выборку в упреждающем кэше
+
+        Выборки колоночного снимка и так считаются без SQLite, а нечёткий
+        поиск занимает интерпретатор и тормозил бы ввод в фоне.
+        """
+        if self.prefetcher is None or (query.fuzzy and query.search):
+            return False
+        return self.task_store is None or not self.task_store.supports(query)
+
+    def _schedule_prefetch(self):
+        """Загрузить вероятные следующие виды, когда окно освободится"""
+        if self.prefetcher is None:
+            return
+        if self._prefetch_after_id is not None:
+            self.root.after_cancel(self._prefetch_after_id)
+        self._prefetch_after_id = self.root.after_idle(self._prefetch_next_views)
+
+    def _prefetch_next_views(self):
+        """Следующая страница, переключение фильтра статуса и полные задачи
+        первых карточек последней показанной страницы (для редактирования)"""
+        self._prefetch_after_id = None
+        queries = []
+        if self._has_more:
+            queries.append(replace(self._page_query, after=self._cursor()))
+        filters = self.filter_panel.get_filters()
+        for status in (None,) + STATUSES:
+            if status != filters["status"]:
+                queries.append(self._build_page_query(dict(filters, status=status)))
+        self.prefetcher.prefetch(
+            [query for query in queries if self._prefetchable(query)], self._prefetch_ids
+        )
 
     def refresh_tasks(self):
         """Обновить список задач"""
         self.filter_panel.update_category_values()
+        self.filter_panel.update_tag_hint()
         self.apply_filters()
 
-    def _display_tasks(self, tasks):
+    def _display_tasks(self, tasks, has_more: bool = False):
         """Отобразить список задач"""
         # Очищаем текущий список
-        for widget in self.tasks_frame.winfo_children():
-            widget.destroy()
+        if self.card_list is not None:
+            self.card_list.clear()
+        else:
+            for widget in self.tasks_frame.winfo_children():
+                widget.destroy()
+            self._more_button = None
+        self.task_items.clear()
+        self.subtask_items.clear()
+        self.overdue_timer.clear()
+        self._last_task = None
+        self._has_more = False
+        self._prefetch_ids = []
 
         # Отображаем задачи
-        if not tasks:
+        if tasks:
+            self._append_tasks(tasks, has_more)
+        elif self.card_list is not None:
+            self.card_list.show_message("📭 Задач не найдено")
+            self._update_scrollregion()
+        else:
             no_tasks_label = tk.Label(
                 self.tasks_frame,
                 text="📭 Задач не найдено",
@@ -1917,22 +4253,70 @@ class TodoApp:
                 bg=COLORS["bg_dark"],
             )
             no_tasks_label.pack(pady=40)
+            self._update_scrollregion()
+
+        if self.leak_detector is not None:
+            self.leak_detector.on_refresh()
+
+    def _append_tasks(self, tasks, has_more: bool):
+        """Добавить карточки в конец списка"""
+        if self.card_list is not None:
+            self.card_list.hide_more_button()
+            items = self.card_list.append(tasks)
         else:
+            if self._more_button is not None:
+                self._more_button.destroy()
+                self._more_button = None
+            items = []
             for task in tasks:
                 task_item = TaskItem(
-                    self.tasks_frame, task, self.db, self.refresh_tasks
+                    self.tasks_frame, task, self.db, self.refresh_tasks, registry=self
                 )
                 task_item.pack(fill=tk.X, pady=8, padx=5)
+                items.append(task_item)
+
+        for task_item in items:
+            self.task_items[task_item.task.id] = task_item
+            self._track_deadline(task_item)
+        if tasks:
+            self._last_task = tasks[-1]
+        self._has_more = has_more
+        self._prefetch_ids = [task.id for task in tasks[: self.PREFETCH_CARDS]]
+
+        if has_more and self.card_list is not None:
+            self.card_list.show_more_button(self._load_more)
+        elif has_more:
+            self._more_button = ModernButton(
+                self.tasks_frame,
+                "⬇ Показать ещё",
+                self._load_more,
+                bg_color=COLORS["bg_light"],
+                hover_color=COLORS["accent"],
+                width=200,
+                height=36,
+            )
+            self._more_button.pack(pady=(8, 16))
 
-        # Обновляем область прокрутки
-        self.canvas.update_idletasks()
-        self.canvas.configure(scrollregion=self.canvas.bbox("all"))
+        self._update_scrollregion()
+
+    def _update_scrollregion(self):
+        """Обновить область прокрутки"""
+        if self.card_list is not None:
+            self.card_list.update_scrollregion()
+        else:
+            self.canvas.update_idletasks()
+            self.canvas.configure(scrollregion=self.canvas.bbox("all"))
 
 
 def main():
     """Точка входа в приложение"""
+    # Способ отрисовки карточек: --canvas-cards или ROUTINE_CARD_RENDERER=canvas
+    card_renderer = os.environ.get("ROUTINE_CARD_RENDERER", "frame")
+    if "--canvas-cards" in sys.argv:
+        card_renderer = "canvas"
+
     root = tk.Tk()
-    app = TodoApp(root)
+    app = TodoApp(root, card_renderer=card_renderer)
     root.mainloop()
 
 
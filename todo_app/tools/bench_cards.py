@@ -0,0 +1,79 @@
+# tools/bench_cards.py - сравнение карточек TaskItem и карточек на Canvas
+#
+# Запуск из todo_app (нужен дисплей, на сервере — xvfb-run):
+#     python -m tools.bench_cards --tasks 500
+
+import argparse
+import os
+import tempfile
+import time
+import tkinter as tk
+import tracemalloc
+
+from core.database import TaskQuery
+from main_gui import TodoApp
+from tools.seed import seed_database
+
+
+def count_widgets(widget) -> int:
+    """Число Tk-виджетов в дереве, включая сам widget"""
+    return 1 + sum(count_widgets(child) for child in widget.winfo_children())
+
+
+def rss_kb() -> int:
+    """Текущий RSS процесса в КБ (Linux), 0 если недоступно"""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return 0
+
+
+def bench(renderer: str, db, tasks) -> dict:
+    root = tk.Tk()
+    root.geometry("1200x900")
+    app = TodoApp(root, db=db, card_renderer=renderer)
+    app.reminders.stop()
+    root.update()
+
+    widgets_before = count_widgets(root)
+    rss_before = rss_kb()
+    tracemalloc.start()
+    start = time.perf_counter()
+    app._display_tasks(tasks)
+    root.update_idletasks()
+    elapsed = time.perf_counter() - start
+    python_kb = tracemalloc.get_traced_memory()[0] // 1024
+    tracemalloc.stop()
+    result = {
+        "renderer": renderer,
+        "render_ms": elapsed * 1000,
+        "widgets": count_widgets(root) - widgets_before,
+        "python_kb": python_kb,
+        "rss_kb": rss_kb() - rss_before,
+    }
+    root.destroy()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сравнение карточек TaskItem и Canvas")
+    parser.add_argument("--tasks", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(os.path.join(tmp, "bench.db"), args.tasks)
+        tasks = db.query_tasks(TaskQuery())
+        print(f"Карточек: {len(tasks)}")
+        print(f"{'renderer':<10}{'render, ms':>12}{'widgets':>10}{'python, KB':>12}{'RSS, KB':>10}")
+        for renderer in ("frame", "canvas"):
+            r = bench(renderer, db, tasks)
+            print(f"{r['renderer']:<10}{r['render_ms']:>12.1f}{r['widgets']:>10}"
+                  f"{r['python_kb']:>12}{r['rss_kb']:>10}")
+
+
+if __name__ == "__main__":
+    main()
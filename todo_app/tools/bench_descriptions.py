@@ -0,0 +1,68 @@
+# tools/bench_descriptions.py - память и время выборки списка с длинными описаниями
+#
+# Сравнивает облегчённую проекцию списка (превью описания) с выборкой
+# полных строк. Запуск из todo_app:
+#     python -m tools.bench_descriptions --tasks 5000 --description-size 10240
+
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+from core.database import TASK_COLUMNS, TaskQuery
+from tools.seed import seed_database
+
+
+def measure(fetch) -> dict:
+    """Время и пик памяти Python для одной выборки"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    tasks = fetch()
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "rows": len(tasks),
+        "ms": elapsed * 1000,
+        "kept_kb": current // 1024,
+        "peak_kb": peak // 1024,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Выборка списка с длинными описаниями")
+    parser.add_argument("--tasks", type=int, default=5000)
+    parser.add_argument("--description-size", type=int, default=10 * 1024)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(
+            os.path.join(tmp, "bench.db"), args.tasks, description_size=args.description_size
+        )
+
+        def full_rows():
+            # Прежняя выборка: все колонки, описание целиком
+            with db.get_connection() as conn:
+                rows = conn.execute(f"SELECT {TASK_COLUMNS} FROM tasks ORDER BY id").fetchall()
+            return [db._row_to_task(row) for row in rows]
+
+        def list_rows():
+            return db.query_tasks(TaskQuery())
+
+        print(f"Задач: {args.tasks}, описание: {args.description_size} символов")
+        print(f"{'projection':<12}{'rows':>8}{'ms':>10}{'kept, KB':>12}{'peak, KB':>12}")
+        for name, fetch in (("full", full_rows), ("list", list_rows)):
+            r = measure(fetch)
+            print(f"{name:<12}{r['rows']:>8}{r['ms']:>10.1f}{r['kept_kb']:>12}{r['peak_kb']:>12}")
+
+        # Полный текст одной задачи по требованию (открытие EditTaskDialog)
+        task_id = db.query_tasks(TaskQuery(limit=1))[0].id
+        start = time.perf_counter()
+        task = db.get_task_by_id(task_id)
+        print(f"get_task_by_id: {(time.perf_counter() - start) * 1000:.2f} ms, "
+              f"описание {len(task.description)} символов")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+# tools/bench_enums.py - размер БД и скорость запросов: текстовые значения против кодов
+#
+# Строит БД в старой схеме (статус, приоритет и категория — текст в каждой
+# строке), замеряет её, мигрирует через TodoDatabase в схему с целыми кодами
+# и замеряет снова. Запуск из todo_app:
+#     python -m tools.bench_enums --rows 1000000
+
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from core.database import TodoDatabase
+from core.models import PRIORITY_CODES, STATUS_CODES
+from tools.seed import CATEGORIES, PRIORITIES, STATUSES, TITLES
+
+LEGACY_RANK_SQL = (
+    "(CASE priority WHEN 'срочно' THEN 0 WHEN 'важно' THEN 1 "
+    "WHEN 'обычно' THEN 2 ELSE 3 END)"
+)
+
+
+def build_legacy(path: str, rows: int, seed: int = 0):
+    """БД в схеме до перехода на коды, с теми же индексами, что были тогда"""
+    rng = random.Random(seed)
+    now = datetime.now()
+    conn = sqlite3.connect(path)
+    conn.execute("""
+        CREATE TABLE tasks (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            title TEXT NOT NULL,
+            description TEXT DEFAULT '',
+            completed BOOLEAN NOT NULL CHECK (completed IN (0, 1)) DEFAULT 0,
+            category TEXT DEFAULT 'Без категории',
+            status TEXT DEFAULT 'не выполнено',
+            priority TEXT DEFAULT 'нет',
+            due_date TEXT,
+            created_at TEXT,
+            completed_at TEXT,
+            parent_id INTEGER
+        )
+    """)
+    conn.execute("CREATE TABLE categories (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT NOT NULL UNIQUE)")
+    conn.executemany("INSERT INTO categories (name) VALUES (?)", [(c,) for c in CATEGORIES])
+
+    def generate():
+        for i in range(rows):
+            status = rng.choice(STATUSES)
+            due = None
+            if rng.random() < 0.6:
+                due = (now + timedelta(hours=rng.randint(-24 * 30, 24 * 30))).strftime(
+                    "%Y-%m-%d %H:%M:%S"
+                )
+            yield (
+                f"{rng.choice(TITLES)} {i}", "", status == "выполнено",
+                rng.choice(CATEGORIES), status, rng.choice(PRIORITIES), due,
+                now.strftime("%Y-%m-%d %H:%M:%S"),
+            )
+
+    conn.executemany(
+        """INSERT INTO tasks (title, description, completed, category, status, priority, due_date, created_at)
+           VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+        generate(),
+    )
+    conn.execute("CREATE INDEX idx_tasks_status ON tasks (status)")
+    conn.execute("CREATE INDEX idx_tasks_completed ON tasks (status, completed_at)")
+    conn.execute(
+        f"CREATE INDEX idx_tasks_sort_priority ON tasks ({LEGACY_RANK_SQL}, "
+        "(due_date IS NULL), COALESCE(due_date, ''), title, id)"
+    )
+    conn.commit()
+    conn.close()
+
+
+def index_sizes(conn) -> dict:
+    """Размер индексов в КБ через dbstat (если SQLite собран с ним)"""
+    try:
+        rows = conn.execute(
+            "SELECT name, SUM(pgsize) FROM dbstat WHERE name LIKE 'idx_tasks_%' GROUP BY name"
+        ).fetchall()
+    except sqlite3.OperationalError:
+        return {}
+    return {name: size // 1024 for name, size in rows}
+
+
+def timed(conn, sql: str, params=(), repeat: int = 3) -> float:
+    """Лучшее время запроса из repeat попыток, мс"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        conn.execute(sql, params).fetchall()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def measure(path: str, queries) -> dict:
+    conn = sqlite3.connect(path)
+    conn.execute("VACUUM")
+    result = {
+        "size_kb": os.path.getsize(path) // 1024,
+        "indexes": index_sizes(conn),
+        "queries": {name: timed(conn, sql, params) for name, sql, params in queries},
+    }
+    conn.close()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Текстовые значения против целых кодов")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    legacy_queries = [
+        ("count status+priority",
+         "SELECT COUNT(*) FROM tasks WHERE status = ? AND priority = ?", ("выполнено", "срочно")),
+        ("group by status, priority",
+         "SELECT status, priority, COUNT(*) FROM tasks GROUP BY status, priority", ()),
+        ("page by priority",
+         f"SELECT id FROM tasks ORDER BY {LEGACY_RANK_SQL}, (due_date IS NULL), "
+         "COALESCE(due_date, ''), title, id LIMIT 100", ()),
+        ("open tasks by rank",
+         f"SELECT {LEGACY_RANK_SQL}, COUNT(*) FROM tasks WHERE status != 'выполнено' "
+         f"GROUP BY {LEGACY_RANK_SQL}", ()),
+    ]
+    coded_queries = [
+        ("count status+priority",
+         "SELECT COUNT(*) FROM tasks WHERE status = ? AND priority = ?",
+         (STATUS_CODES["выполнено"], PRIORITY_CODES["срочно"])),
+        ("group by status, priority",
+         "SELECT status, priority, COUNT(*) FROM tasks GROUP BY status, priority", ()),
+        ("page by priority",
+         "SELECT id FROM tasks ORDER BY priority, (due_date IS NULL), "
+         "COALESCE(due_date, ''), title, id LIMIT 100", ()),
+        ("open tasks by rank",
+         f"SELECT priority, COUNT(*) FROM tasks WHERE status != {STATUS_CODES['выполнено']} "
+         "GROUP BY priority", ()),
+    ]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "enums.db")
+        print(f"Строк: {args.rows}")
+        start = time.perf_counter()
+        build_legacy(path, args.rows)
+        print(f"Построение старой схемы: {time.perf_counter() - start:.1f} s")
+        before = measure(path, legacy_queries)
+
+        start = time.perf_counter()
+        TodoDatabase(path)
+        print(f"Миграция на коды: {time.perf_counter() - start:.1f} s")
+        after = measure(path, coded_queries)
+
+        print(f"\n{'':<28}{'текст':>12}{'коды':>12}")
+        print(f"{'размер БД, KB':<28}{before['size_kb']:>12}{after['size_kb']:>12}")
+        for name in sorted(set(before["indexes"]) | set(after["indexes"])):
+            print(f"{name + ', KB':<28}{before['indexes'].get(name, '-'):>12}"
+                  f"{after['indexes'].get(name, '-'):>12}")
+        for name, _, _ in legacy_queries:
+            print(f"{name + ', ms':<28}{before['queries'][name]:>12.1f}"
+                  f"{after['queries'][name]:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+# tools/bench_fuzzy.py - задержка и полнота нечёткого поиска на заголовках с опечатками
+#
+# Строит БД из псевдослов с частотами по закону Ципфа (заголовки 2-4 слова,
+# описания до 20 слов), затем ищет заголовки случайных задач с одной
+# опечаткой и проверяет, что задача попала в первую страницу. Запуск из todo_app:
+#     python -m tools.bench_fuzzy --tasks 100000 --queries 300
+
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import datetime
+
+from core.database import TaskQuery, TodoDatabase
+from core.metrics import percentile
+
+SYLLABLES = [c + v for c in "бвгджзклмнпрстфхцчш" for v in "аеиоуыя"]
+LETTERS = "абвгдежзийклмнопрстуфхцчшщыэюя"
+
+
+def make_vocabulary(rng: random.Random, size: int) -> list:
+    words = set()
+    while len(words) < size:
+        words.add("".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4))))
+    return sorted(words)
+
+
+def zipf_picker(rng: random.Random, vocabulary: list):
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    return lambda count: rng.choices(vocabulary, weights, k=count)
+
+
+def with_typo(rng: random.Random, text: str) -> str:
+    """Одна опечатка в случайном слове: замена, пропуск или перестановка букв"""
+    words = text.split()
+    index = rng.randrange(len(words))
+    word = words[index]
+    pos = rng.randrange(len(word) - 1)
+    kind = rng.choice(["replace", "drop", "swap"])
+    if kind == "replace":
+        word = word[:pos] + rng.choice(LETTERS) + word[pos + 1:]
+    elif kind == "drop":
+        word = word[:pos] + word[pos + 1:]
+    else:
+        word = word[:pos] + word[pos + 1] + word[pos] + word[pos + 2:]
+    words[index] = word
+    return " ".join(words)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Замер нечёткого поиска по триграммам")
+    parser.add_argument("--tasks", type=int, default=100000)
+    parser.add_argument("--queries", type=int, default=300)
+    parser.add_argument("--vocabulary", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pick = zipf_picker(rng, make_vocabulary(rng, args.vocabulary))
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = TodoDatabase(os.path.join(tmp, "fuzzy.db"))
+        rows = [
+            (" ".join(pick(rng.randint(2, 4))).capitalize(), " ".join(pick(rng.randint(0, 20))), now)
+            for _ in range(args.tasks)
+        ]
+        with db.get_connection() as conn:
+            conn.executemany(
+                "INSERT INTO tasks (title, description, created_at) VALUES (?, ?, ?)", rows
+            )
+        start = time.perf_counter()
+        db.rebuild_search_index()
+        print(f"Задач: {args.tasks}, индекс поиска: {time.perf_counter() - start:.1f} s")
+
+        fuzzy_times, like_times, found = [], [], 0
+        for _ in range(args.queries):
+            task_id = rng.randint(1, args.tasks)
+            text = with_typo(rng, rows[task_id - 1][0])
+            start = time.perf_counter()
+            result = db.query_tasks(TaskQuery(search=text, fuzzy=True, limit=51))
+            fuzzy_times.append((time.perf_counter() - start) * 1000)
+            found += any(task.id == task_id for task in result)
+            start = time.perf_counter()
+            db.query_tasks(TaskQuery(search=text, limit=51))
+            like_times.append((time.perf_counter() - start) * 1000)
+
+        print(f"Найдено в первой странице: {found}/{args.queries}")
+        for name, times in (("fuzzy", fuzzy_times), ("LIKE", like_times)):
+            print(f"{name:<6} p50 {percentile(times, 50):6.1f} ms  p95 {percentile(times, 95):6.1f} ms  "
+                  f"max {max(times):6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
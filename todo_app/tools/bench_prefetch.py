@@ -0,0 +1,142 @@
+# tools/bench_prefetch.py - доля попаданий и задержка упреждающей загрузки видов
+#
+# Имитирует сеанс без окна: после каждого показа страницы QueryPrefetcher
+# получает те же предсказания, что и TodoApp (следующая страница, переключение
+# статуса, полные задачи первых карточек), пользователь "думает" --think-ms,
+# затем выбирает действие: следующая страница, другой статус, редактирование
+# карточки, другой фильтр (не предсказывается) или правка задачи (сбрасывает
+# кэш). Каждое попадание сверяется с чтением из БД. Запуск из todo_app:
+#     python -m tools.bench_prefetch --tasks 100000 --steps 300
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import replace
+
+from core.database import TaskQuery, sort_cursor
+from core.metrics import metrics, percentile
+from core.prefetch import QueryPrefetcher
+from tools.check_columnar import random_mutation
+from tools.seed import CATEGORIES, PRIORITIES, STATUSES, seed_database
+
+PAGE_SIZE = 100
+PREFETCH_CARDS = 20
+
+
+def page_query(filters: dict) -> TaskQuery:
+    """Запрос первой страницы, как его строит TodoApp._build_page_query"""
+    return TaskQuery(
+        category=filters["category"],
+        priority=filters["priority"],
+        status=filters["status"],
+        sort=filters["sort"],
+        limit=PAGE_SIZE + 1,
+        roots_only=not (filters["category"] or filters["priority"] or filters["status"]),
+    )
+
+
+def predictions(filters: dict, query: TaskQuery, tasks: list) -> list:
+    queries = []
+    if len(tasks) > PAGE_SIZE:
+        queries.append(replace(query, after=sort_cursor(tasks[PAGE_SIZE - 1], query.sort)))
+    for status in (None,) + tuple(STATUSES):
+        if status != filters["status"]:
+            queries.append(page_query(dict(filters, status=status)))
+    return queries
+
+
+def random_filters(rng: random.Random) -> dict:
+    return {
+        "category": rng.choice([None, None] + CATEGORIES),
+        "priority": rng.choice([None, None] + PRIORITIES),
+        "status": rng.choice([None] + STATUSES),
+        "sort": rng.choice(["oldest", "newest", "priority", "due_date"]),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Упреждающая загрузка следующих видов")
+    parser.add_argument("--tasks", type=int, default=20000)
+    parser.add_argument("--steps", type=int, default=300)
+    parser.add_argument("--think-ms", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(os.path.join(tmp, "prefetch.db"), args.tasks, seed=args.seed)
+        ids = [task.id for task in db.get_all_tasks()]
+        prefetcher = QueryPrefetcher(db)
+        prefetcher.start()
+
+        filters = random_filters(rng)
+        query = page_query(filters)
+        tasks = db.query_tasks(query)
+        hit_times, miss_times, mismatches = [], [], 0
+        for _ in range(args.steps):
+            visible = tasks[:PAGE_SIZE]
+            prefetcher.prefetch(
+                predictions(filters, query, tasks), [task.id for task in visible[:PREFETCH_CARDS]]
+            )
+            time.sleep(args.think_ms / 1000)
+
+            action = rng.choices(["page", "status", "edit", "filter", "write"],
+                                 [35, 25, 25, 10, 5])[0]
+            if action == "write":
+                random_mutation(rng, db, ids)
+                action = "filter"
+            if action == "page" and len(tasks) <= PAGE_SIZE:
+                action = "filter"
+            if action == "edit" and not visible:
+                action = "filter"
+
+            start = time.perf_counter()
+            if action == "edit":
+                # Чаще редактируют карточки в начале страницы
+                task_id = visible[min(int(rng.expovariate(1 / 10)), len(visible) - 1)].id
+                result = prefetcher.get_task(task_id)
+                hit = result is not None
+                if not hit:
+                    result = db.get_task_by_id(task_id)
+                elapsed = time.perf_counter() - start
+                expected = db.get_task_by_id(task_id)
+            else:
+                if action == "page":
+                    next_query = replace(query, after=sort_cursor(visible[-1], query.sort))
+                else:
+                    if action == "status":
+                        filters = dict(filters, status=rng.choice(
+                            [s for s in (None,) + tuple(STATUSES) if s != filters["status"]]
+                        ))
+                    else:
+                        filters = random_filters(rng)
+                    next_query = page_query(filters)
+                result = prefetcher.get(next_query)
+                hit = result is not None
+                if not hit:
+                    result = db.query_tasks(next_query)
+                elapsed = time.perf_counter() - start
+                expected = db.query_tasks(next_query)
+                query, tasks = next_query, result
+            (hit_times if hit else miss_times).append(elapsed * 1000)
+            if hit and result != expected:
+                mismatches += 1
+        prefetcher.stop()
+
+        print(f"Шагов: {args.steps}, попаданий: {prefetcher.hit_rate:.0%}, "
+              f"расхождений с БД: {mismatches}")
+        for name, values in (("из кэша", hit_times), ("из БД", miss_times)):
+            if values:
+                print(f"{name}: n={len(values)} p50={percentile(values, 50):.3f} ms "
+                      f"p95={percentile(values, 95):.3f} ms")
+        query_time = metrics.summary("prefetch.query")
+        print(f"Фоновые запросы: n={query_time['count']} p50={query_time['p50']:.2f} ms, "
+              f"отброшено устаревших: {metrics.counters['prefetch.stale']}")
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+# tools/bench_scroll.py - время кадра при прокрутке большого списка
+#
+# Запуск из todo_app (нужен дисплей, на сервере — xvfb-run):
+#     python -m tools.bench_scroll --tasks 10000 --renderer canvas
+
+import argparse
+import os
+import tempfile
+import time
+import tkinter as tk
+from types import SimpleNamespace
+
+from core.metrics import metrics
+from main_gui import TodoApp
+from tools.seed import seed_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Время кадра при прокрутке списка задач")
+    parser.add_argument("--tasks", type=int, default=10000)
+    parser.add_argument("--renderer", choices=["frame", "canvas"], default="canvas")
+    parser.add_argument("--events", type=int, default=2000, help="событий колеса")
+    parser.add_argument("--burst", type=int, default=8, help="событий за один кадр")
+    parser.add_argument("--kinetic", action="store_true", help="с инерционной прокруткой")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(os.path.join(tmp, "bench.db"), args.tasks)
+        root = tk.Tk()
+        root.geometry("1200x900")
+        TodoApp.PAGE_SIZE = args.tasks
+        app = TodoApp(root, db=db, card_renderer=args.renderer)
+        app.reminders.stop()
+        app.scroller.kinetic = args.kinetic
+        root.update()
+        metrics.reset()
+
+        # Пачки мелких событий, как от тачпада высокого разрешения
+        direction = -1
+        for i in range(args.events):
+            if i % 500 == 0:
+                direction = -direction
+            app.scroller.on_wheel(
+                SimpleNamespace(num=0, delta=-direction * app.scroller.DELTA_PER_NOTCH / 8)
+            )
+            if i % args.burst == args.burst - 1:
+                # Кадр: ждём таймер сдвига и замеряем перерисовку, которую Tk
+                # делает в простое
+                time.sleep(app.scroller.FRAME_MS / 1000)
+                with metrics.timer("scroll.redraw"):
+                    root.update()
+        app.scroller.stop()
+        root.update()
+
+        print(f"Карточек: {args.tasks}, отрисовка: {args.renderer}")
+        print(metrics.report())
+        root.destroy()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+# tools/check_columnar.py - сверка колоночного снимка с выборками SQLite
+#
+# Случайные правки через TodoDatabase вперемешку со случайными фильтрами:
+# результат ColumnarTaskStore.query должен совпадать с filter_tasks задача
+# в задачу (порядок, поля, метки, свёртка подзадач). Запуск из todo_app:
+#     python -m tools.check_columnar --tasks 3000 --rounds 500
+#     python -m tools.check_columnar --no-numpy   # запасной путь на array
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import core.columnar
+from core.columnar import ColumnarTaskStore
+from core.database import SORT_KEYS, TaskQuery, sort_cursor
+from tools.seed import CATEGORIES, PRIORITIES, STATUSES, TITLES, seed_database
+
+
+def random_filters(rng: random.Random, db) -> dict:
+    """Случайный набор фильтров в аргументах filter_tasks"""
+    now = datetime.now()
+
+    def day(offset: int) -> str:
+        return (now + timedelta(days=offset)).strftime("%Y-%m-%d")
+
+    filters = {"sort": rng.choice(list(SORT_KEYS))}
+    if rng.random() < 0.4:
+        filters["category"] = rng.choice(db.get_categories() + ["Все", "нет такой"])
+    if rng.random() < 0.4:
+        filters["priority"] = rng.choice(PRIORITIES + ["Все"])
+    if rng.random() < 0.4:
+        filters["status"] = rng.choice(STATUSES + ["Все"])
+    if rng.random() < 0.3:
+        filters["date_from"] = day(rng.randint(-30, 10))
+    if rng.random() < 0.3:
+        filters["date_to"] = day(rng.randint(-10, 30)) + rng.choice(["", " 12:00"])
+    if rng.random() < 0.5:
+        filters["limit"] = rng.randint(1, 60)
+    return filters
+
+
+def random_mutation(rng: random.Random, db, ids: list):
+    """Одна случайная правка через публичные методы TodoDatabase"""
+    action = rng.choice(["add", "add_sub", "update", "status", "cascade", "delete", "tags"])
+    due = None
+    if rng.random() < 0.7:
+        due = (datetime.now() + timedelta(hours=rng.randint(-24 * 30, 24 * 30))).strftime(
+            "%Y-%m-%d %H:%M"
+        )
+    if action in ("add", "add_sub") or not ids:
+        parent = rng.choice(ids) if action == "add_sub" and ids else None
+        ids.append(db.add_task(
+            f"{rng.choice(TITLES)} {rng.randint(0, 99)}", "", rng.choice(CATEGORIES),
+            rng.choice(PRIORITIES), due, parent_id=parent,
+        ))
+        return
+    task_id = rng.choice(ids)
+    if action == "update":
+        db.update_task(task_id, rng.choice(TITLES), "x" * rng.randint(0, 300),
+                       rng.choice(CATEGORIES), rng.choice(PRIORITIES), due)
+    elif action == "status":
+        db.update_task_status(task_id, rng.choice(STATUSES))
+    elif action == "cascade":
+        db.set_status_cascade(task_id, rng.choice(STATUSES))
+    elif action == "tags":
+        db.set_task_tags(task_id, rng.sample(["дом", "срочно", "позже"], rng.randint(0, 2)))
+    else:
+        removed = set(db.get_subtree_ids(task_id))
+        db.delete_task(task_id)
+        ids[:] = [tid for tid in ids if tid not in removed]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сверка ColumnarTaskStore с filter_tasks")
+    parser.add_argument("--tasks", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=500)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-numpy", action="store_true", help="проверить путь без numpy")
+    args = parser.parse_args()
+
+    if args.no_numpy:
+        core.columnar.np = None
+    rng = random.Random(args.seed)
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(os.path.join(tmp, "columnar.db"), args.tasks, seed=args.seed)
+        start = time.perf_counter()
+        store = ColumnarTaskStore(db)
+        print(f"Загрузка {len(store)} задач: {(time.perf_counter() - start) * 1000:.0f} ms, "
+              f"numpy: {'да' if store.vectorized else 'нет'}")
+        ids = [task.id for task in db.get_all_tasks()]
+        sql_time = store_time = 0.0
+        for round_no in range(args.rounds):
+            for _ in range(rng.randint(0, 3)):
+                random_mutation(rng, db, ids)
+            if rng.random() < 0.02:
+                db.delete_category(rng.choice(CATEGORIES[:-1]))
+
+            filters = random_filters(rng, db)
+            start = time.perf_counter()
+            expected = db.filter_tasks(**filters)
+            sql_time += time.perf_counter() - start
+            if expected and rng.random() < 0.5:
+                cursor_task = rng.choice(expected)
+                filters["after"] = sort_cursor(cursor_task, filters["sort"])
+                if rng.random() < 0.3:
+                    # Задачу курсора удалили: страница продолжается с того же места
+                    removed = set(db.get_subtree_ids(cursor_task.id))
+                    db.delete_task(cursor_task.id)
+                    ids[:] = [tid for tid in ids if tid not in removed]
+                expected = db.filter_tasks(**filters)
+
+            query = TaskQuery(
+                category=filters.get("category"), priority=filters.get("priority"),
+                status=filters.get("status"), date_from=filters.get("date_from"),
+                date_to=filters.get("date_to"), sort=filters["sort"],
+                limit=filters.get("limit"), after=filters.get("after"),
+            )
+            start = time.perf_counter()
+            actual = store.query(query)
+            store_time += time.perf_counter() - start
+            if actual != expected:
+                failures += 1
+                print(f"[{round_no}] расхождение для {filters}: "
+                      f"SQL {[t.id for t in expected][:10]} / снимок {[t.id for t in actual][:10]}")
+
+            parent = rng.choice(ids) if ids else 0
+            for query in (TaskQuery(roots_only=True, sort="title", limit=50),
+                          TaskQuery(parent_id=parent)):
+                if store.query(query) != db.query_tasks(query):
+                    failures += 1
+                    print(f"[{round_no}] расхождение для {query}")
+
+        print(f"Раундов: {args.rounds}, расхождений: {failures}")
+        print(f"filter_tasks: {sql_time * 1000 / args.rounds:.2f} ms/запрос, "
+              f"снимок: {store_time * 1000 / args.rounds:.2f} ms/запрос")
+        store.close()
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# tools/check_fuzzy.py - проверка допуска нечёткого поиска на одну опечатку
+#
+# Для случайных слов перебираются все варианты с одной правкой (замена,
+# вставка, пропуск буквы, перестановка соседних). Каждый вариант должен
+# портить не больше MAX_TRIGRAMS_PER_EDIT триграмм, проходить within_one_edit
+# и находить задачу с исходным словом через fuzzy_scores. Запуск из todo_app:
+#     python -m tools.check_fuzzy --words 200
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+
+from core.database import TodoDatabase
+from core.trigrams import MAX_TRIGRAMS_PER_EDIT, within_one_edit, word_trigrams
+
+LETTERS = "абвгдежзийклмнопрстуфхцчшщыэюя"
+
+
+def one_edit_variants(word: str) -> set:
+    """Все слова на расстоянии одной правки от word"""
+    variants = set()
+    for i in range(len(word) + 1):
+        for letter in LETTERS:
+            variants.add(word[:i] + letter + word[i:])
+            if i < len(word):
+                variants.add(word[:i] + letter + word[i + 1:])
+        if i < len(word):
+            variants.add(word[:i] + word[i + 1:])
+        if i + 1 < len(word):
+            variants.add(word[:i] + word[i + 1] + word[i] + word[i + 2:])
+    variants.discard(word)
+    return {variant for variant in variants if variant}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Допуск нечёткого поиска на одну опечатку")
+    parser.add_argument("--words", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    vocabulary = sorted({
+        "".join(rng.choice(LETTERS) for _ in range(rng.randint(2, 10)))
+        for _ in range(args.words)
+    })
+    failures = 0
+    checked = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        db = TodoDatabase(os.path.join(tmp, "fuzzy.db"))
+        ids = {word: db.add_task(word) for word in vocabulary}
+        for word in vocabulary:
+            trigrams = word_trigrams(word)
+            variants = one_edit_variants(word)
+            # Поиск по БД — на выборке вариантов, чтобы проверка шла секунды
+            searched = set(rng.sample(sorted(variants), min(10, len(variants))))
+            for variant in variants:
+                checked += 1
+                spoiled = len(word_trigrams(variant) - trigrams)
+                if spoiled > MAX_TRIGRAMS_PER_EDIT or not within_one_edit(variant, word):
+                    failures += 1
+                    print(f"{word} -> {variant}: испорчено триграмм {spoiled}")
+                elif variant in searched and ids[word] not in db.fuzzy_scores(variant):
+                    failures += 1
+                    print(f"{word} -> {variant}: задача не найдена")
+
+    print(f"Слов: {len(vocabulary)}, вариантов с опечаткой: {checked}, ошибок: {failures}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
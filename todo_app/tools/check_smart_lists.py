@@ -0,0 +1,90 @@
+# tools/check_smart_lists.py - сверка состава умных списков с выборками SQLite
+#
+# Случайные правки через TodoDatabase и прямые UPDATE в обход него (как из
+# стороннего скрипта): после каждого раунда состав и счётчик каждого умного
+# списка должны совпадать с выборкой по его фильтрам. Запуск из todo_app:
+#     python -m tools.check_smart_lists --tasks 3000 --rounds 300
+
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import date
+
+from core.database import TaskQuery
+from core.models import SmartList
+from tools.check_columnar import random_mutation
+from tools.seed import CATEGORIES, PRIORITIES, STATUSES, seed_database
+
+SMART_LISTS = [
+    SmartList("Срочное на работе", category="Работа", priority="срочно", exclude_status="выполнено"),
+    SmartList("Срок на неделе", due_within_days=7, exclude_status="выполнено"),
+    SmartList("В процессе", status="в процессе"),
+    SmartList("Дом без меток позже", category="Дом", exclude_tags=("позже",)),
+    SmartList("Срочно с меткой дом", tags=("дом",), priority="срочно"),
+]
+
+
+def raw_update(rng: random.Random, db, ids: list):
+    """Правка в обход TodoDatabase: её видно только по журналу task_changes"""
+    if not ids:
+        return
+    with db.get_connection() as conn:
+        conn.execute(
+            "UPDATE tasks SET status = ?, priority = ? WHERE id = ?",
+            (rng.randrange(len(STATUSES)), rng.randrange(len(PRIORITIES)), rng.choice(ids)),
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Сверка умных списков с выборками по фильтрам")
+    parser.add_argument("--tasks", type=int, default=3000)
+    parser.add_argument("--rounds", type=int, default=300)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    failures = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(os.path.join(tmp, "smart.db"), args.tasks, seed=args.seed)
+        for smart_list in SMART_LISTS:
+            db.add_smart_list(smart_list)
+        ids = [task.id for task in db.get_all_tasks()]
+        sync_time = open_time = filter_time = 0.0
+        for round_no in range(args.rounds):
+            for _ in range(rng.randint(0, 4)):
+                random_mutation(rng, db, ids)
+            if rng.random() < 0.3:
+                raw_update(rng, db, ids)
+            if rng.random() < 0.01:
+                db.delete_category(rng.choice(CATEGORIES[:-1]))
+
+            start = time.perf_counter()
+            lists = db.get_smart_lists()
+            sync_time += time.perf_counter() - start
+            for smart_list in lists:
+                start = time.perf_counter()
+                actual = [task.id for task in db.query_tasks(TaskQuery(smart_list=smart_list.id))]
+                open_time += time.perf_counter() - start
+                start = time.perf_counter()
+                expected = [task.id for task in db.query_tasks(
+                    db._smart_list_query(smart_list, date.today())
+                )]
+                filter_time += time.perf_counter() - start
+                if actual != expected or smart_list.task_count != len(expected):
+                    failures += 1
+                    print(f"[{round_no}] {smart_list.name}: счётчик {smart_list.task_count}, "
+                          f"в списке {len(actual)}, по фильтрам {len(expected)}")
+
+        opened = args.rounds * len(SMART_LISTS)
+        print(f"Раундов: {args.rounds}, расхождений: {failures}")
+        print(f"get_smart_lists (с догонянием журнала): {sync_time * 1000 / args.rounds:.2f} ms")
+        print(f"Открытие списка: {open_time * 1000 / opened:.2f} ms, "
+              f"те же фильтры заново: {filter_time * 1000 / opened:.2f} ms")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# tools/replay.py - воспроизведение записанной сессии и задержки по типам действий
+#
+# Запись: ROUTINE_RECORD=session.jsonl python main_gui.py
+# Воспроизведение из todo_app (без дисплея поднимается Xvfb, если он установлен):
+#     python -m tools.replay session.jsonl --tasks 5000 --json before.json
+# Задержка действия — от начала обработки до конца перерисовки (root.update()).
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+import tkinter as tk
+from types import SimpleNamespace
+
+from core.database import TaskQuery
+from core.metrics import metrics
+from main_gui import EditTaskDialog, TodoApp
+from tools.seed import seed_database
+
+
+def ensure_display():
+    """Поднять Xvfb, если дисплея нет; вернуть процесс (или None)"""
+    if os.environ.get("DISPLAY") or not shutil.which("Xvfb"):
+        return None
+    display = ":97"
+    process = subprocess.Popen(
+        ["Xvfb", display, "-screen", "0", "1280x1024x24"],
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    time.sleep(0.5)
+    os.environ["DISPLAY"] = display
+    return process
+
+
+class Replayer:
+    """Выполнение записанных действий над TodoApp"""
+
+    def __init__(self, root, app: TodoApp):
+        self.root = root
+        self.app = app
+        self.db = app.db
+
+    def resolve_id(self, task_id: int) -> int:
+        """id из записи, если такая задача есть в засеянной БД, иначе близкий по номеру"""
+        if self.db.get_task_by_id(task_id):
+            return task_id
+        ids = list(self.app.task_items) or [
+            task.id for task in self.db.query_tasks(TaskQuery(limit=1000))
+        ]
+        return ids[task_id % len(ids)] if ids else task_id
+
+    def run(self, entry: dict):
+        action = entry["action"]
+        with metrics.timer(f"replay.{action}"):
+            getattr(self, f"do_{action}")(entry)
+            self.root.update()
+
+    def do_add(self, entry: dict):
+        app = self.app
+        app.title_var.set(entry["title"])
+        app.desc_text.delete(1.0, tk.END)
+        app.desc_text.insert(1.0, entry.get("description", ""))
+        app.category_var.set(entry.get("category", "Без категории"))
+        app.priority_var.set(entry.get("priority", "нет"))
+        app.tags_var.set(" ".join(entry.get("tags", [])))
+        due = entry.get("due_date")
+        app.date_var.set(due[:10] if due else "")
+        app.time_var.set(due[11:16] if due else "")
+        app._add_task()
+
+    def do_edit(self, entry: dict):
+        task = self.db.get_task_by_id(self.resolve_id(entry["task_id"]))
+        if task is None:
+            return
+        dialog = EditTaskDialog.open_cached(
+            self.root, task, self.app.refresh_tasks, build_args=(self.db,)
+        )
+        dialog.title_var.set(entry["title"])
+        dialog.desc_text.delete(1.0, tk.END)
+        dialog.desc_text.insert(1.0, entry.get("description", ""))
+        dialog.category_var.set(entry.get("category", task.category))
+        dialog.priority_var.set(entry.get("priority", task.priority))
+        dialog.status_var.set(entry.get("status", task.status))
+        dialog.tags_var.set(" ".join(entry.get("tags", [])))
+        dialog.datetime_input.clear()
+        if entry.get("due_date"):
+            dialog.datetime_input.set_datetime(entry["due_date"])
+        dialog._save_task()
+
+    def do_filter(self, entry: dict):
+        self.app.filter_panel.set_state(entry["state"])
+
+    def do_search(self, entry: dict):
+        self.app.filter_panel.search_var.set(entry["search"])
+
+    def do_status(self, entry: dict):
+        task_id = self.resolve_id(entry["task_id"])
+        item = self.app.task_items.get(task_id)
+        if item is not None:
+            item.status_var.set(entry["status"])
+            item._on_status_change()
+        else:
+            self.db.update_task_status(task_id, entry["status"])
+            self.app.refresh_tasks()
+
+    def do_scroll(self, entry: dict):
+        self.app.scroller.on_wheel(
+            SimpleNamespace(num=entry.get("num", 0), delta=entry.get("delta", 0))
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Воспроизведение записанной сессии TodoApp")
+    parser.add_argument("log", help="файл JSONL, записанный с ROUTINE_RECORD")
+    parser.add_argument("--tasks", type=int, default=2000, help="задач в засеянной БД")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--renderer", choices=["frame", "canvas"], default="frame")
+    parser.add_argument("--realtime", action="store_true", help="соблюдать паузы из записи")
+    parser.add_argument("--json", help="сохранить сводку задержек в файл для сравнения")
+    args = parser.parse_args()
+
+    with open(args.log, encoding="utf-8") as f:
+        entries = [json.loads(line) for line in f if line.strip()]
+
+    xvfb = ensure_display()
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            db = seed_database(os.path.join(tmp, "replay.db"), args.tasks, seed=args.seed)
+            root = tk.Tk()
+            root.geometry("1200x900")
+            app = TodoApp(root, db=db, card_renderer=args.renderer)
+            app.reminders.stop()
+            root.update()
+            metrics.reset()
+
+            replayer = Replayer(root, app)
+            start = time.perf_counter()
+            skipped = 0
+            for entry in entries:
+                if not hasattr(replayer, f"do_{entry.get('action')}"):
+                    skipped += 1
+                    continue
+                if args.realtime:
+                    delay = entry.get("t", 0) - (time.perf_counter() - start)
+                    if delay > 0:
+                        time.sleep(delay)
+                replayer.run(entry)
+            app.scroller.stop()
+            root.update()
+
+            print(f"Действий: {len(entries) - skipped} (пропущено {skipped}), задач: {args.tasks}")
+            print(f"{'action':<12}{'n':>6}{'p50, ms':>10}{'p90, ms':>10}{'p99, ms':>10}{'max, ms':>10}")
+            summary = {}
+            for name in sorted(metrics.timings):
+                if not name.startswith("replay."):
+                    continue
+                s = metrics.summary(name)
+                summary[name[len("replay."):]] = s
+                print(f"{name[len('replay.'):]:<12}{s['count']:>6}{s['p50']:>10.1f}"
+                      f"{s['p90']:>10.1f}{s['p99']:>10.1f}{s['max']:>10.1f}")
+            if args.json:
+                with open(args.json, "w", encoding="utf-8") as f:
+                    json.dump(summary, f, ensure_ascii=False, indent=2)
+            root.destroy()
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+# tools/report.py - отчёт по задачам без GUI (например, еженедельно из cron)
+#
+# Запуск из todo_app:
+#     python -m tools.report weekly.html
+#     python -m tools.report weekly.csv --db todo.db --workers 2
+
+import argparse
+import os
+import sys
+import time
+
+from core.database import TodoDatabase
+from core.reports import REPORT_FORMATS, ReportJob
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Отчёт по задачам в HTML, Markdown или CSV")
+    parser.add_argument("path", help="файл отчёта; формат по расширению (.html, .md, .csv)")
+    parser.add_argument("--db", default="todo.db")
+    parser.add_argument("--format", choices=list(REPORT_FORMATS), help="формат вместо расширения")
+    parser.add_argument("--workers", type=int, help="процессов форматирования")
+    parser.add_argument("--chunk", type=int, default=1000, help="задач в пачке")
+    args = parser.parse_args()
+
+    fmt = args.format
+    if fmt is None:
+        extension = os.path.splitext(args.path)[1]
+        fmt = next((name for name, ext in REPORT_FORMATS.items() if ext == extension), "html")
+
+    start = time.perf_counter()
+    job = ReportJob(TodoDatabase(args.db), args.path, fmt, args.chunk, args.workers)
+    job.start()
+    try:
+        while not job.wait(1.0):
+            print(f"\rЗадач: {job.rows_done}/{job.rows_total}", end="", flush=True)
+    except KeyboardInterrupt:
+        job.cancel()
+        job.wait()
+        print("\nОтменено")
+        sys.exit(1)
+    if job.error is not None:
+        print(f"\nОшибка: {job.error}")
+        sys.exit(1)
+    print(f"\rЗадач: {job.rows_done}, {args.path} за {time.perf_counter() - start:.1f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+# tools/seed.py - заполнение тестовой БД для замеров
+
+import random
+from datetime import datetime, timedelta
+
+from core.database import TodoDatabase
+from core.models import PRIORITY_CODES, STATUS_CODES
+
+TITLES = [
+    "Купить продукты", "Подготовить отчёт", "Позвонить врачу", "Пробежка",
+    "Прочитать главу", "Оплатить счета", "Убрать квартиру", "Встреча с командой",
+    "Записаться в зал", "Сделать домашнее задание",
+]
+CATEGORIES = ["Работа", "Дом", "Учеба", "Спорт", "Покупки", "Здоровье", "Без категории"]
+PRIORITIES = ["срочно", "важно", "обычно", "нет"]
+STATUSES = ["не выполнено", "в процессе", "выполнено"]
+
+
+def seed_database(db_path: str, count: int, seed: int = 0,
+                  description_size: int = 80) -> TodoDatabase:
+    """Создать БД и добавить count случайных задач (воспроизводимо по seed)"""
+    rng = random.Random(seed)
+    db = TodoDatabase(db_path)
+    with db.get_connection() as conn:
+        category_ids = {name: db._category_id(conn.cursor(), name) for name in CATEGORIES}
+    now = datetime.now()
+    rows = []
+    for i in range(count):
+        status = rng.choice(STATUSES)
+        due = None
+        if rng.random() < 0.6:
+            due = (now + timedelta(hours=rng.randint(-24 * 30, 24 * 30))).strftime(
+                "%Y-%m-%d %H:%M:%S"
+            )
+        description = ("Описание задачи " * (description_size // 16 + 1))[:description_size]
+        rows.append((
+            f"{rng.choice(TITLES)} {i}",
+            description,
+            status == "выполнено",
+            category_ids[rng.choice(CATEGORIES)],
+            STATUS_CODES[status],
+            PRIORITY_CODES[rng.choice(PRIORITIES)],
+            due,
+            (now - timedelta(minutes=count - i)).strftime("%Y-%m-%d %H:%M:%S"),
+        ))
+    with db.get_connection() as conn:
+        conn.executemany(
+            """INSERT INTO tasks (title, description, completed, category_id, status, priority, due_date, created_at)
+               VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+            rows,
+        )
+    db.rebuild_search_index()
+    return db
@@ -0,0 +1,63 @@
+# tools/soak.py - длительный прогон обновлений списка с поиском утечек
+#
+# Запуск из todo_app (нужен дисплей, на сервере — xvfb-run):
+#     python -m tools.soak --cycles 5000 --every 250 --renderer frame
+# Код возврата 1, если LeakDetector сообщил о росте выше порогов.
+
+import argparse
+import os
+import sys
+import tempfile
+import tkinter as tk
+
+from core.diagnostics import LeakDetector
+from main_gui import SORT_OPTIONS, TodoApp
+from tools.seed import seed_database
+
+SEARCHES = ["", "отчёт", "Купить", "", "зал", ""]
+STATUSES = ["Все", "не выполнено", "в процессе", "выполнено"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Поиск утечек на тысячах обновлений списка")
+    parser.add_argument("--tasks", type=int, default=300)
+    parser.add_argument("--cycles", type=int, default=5000)
+    parser.add_argument("--every", type=int, default=250, help="замер каждые N обновлений")
+    parser.add_argument("--renderer", choices=["frame", "canvas"], default="frame")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db = seed_database(os.path.join(tmp, "soak.db"), args.tasks)
+        root = tk.Tk()
+        root.geometry("1200x900")
+        app = TodoApp(root, db=db, card_renderer=args.renderer)
+        app.reminders.stop()
+        root.update()
+        app.leak_detector = LeakDetector(root, every=args.every)
+
+        sorts = list(SORT_OPTIONS)
+        panel = app.filter_panel
+        for cycle in range(args.cycles):
+            # Чередуем поиск, фильтры, сортировку и правки задач, как в обычной работе
+            panel.status_var.set(STATUSES[cycle % len(STATUSES)])
+            panel.sort_var.set(sorts[cycle % len(sorts)])
+            panel.search_var.set(SEARCHES[cycle % len(SEARCHES)])  # trace вызывает apply_filters
+            if cycle % 10 == 0:
+                task_id = db.add_task(f"Задача прогона {cycle}", tags=["soak"])
+                app.refresh_tasks()
+                db.delete_task(task_id)
+            root.update()
+            if cycle % 500 == 0:
+                print(f"цикл {cycle}/{args.cycles}", flush=True)
+
+        detector = app.leak_detector
+        print(detector.summary())
+        leaked = bool(detector.reports)
+        print("Утечки обнаружены" if leaked else "Рост в пределах порогов")
+        detector.stop()
+        root.destroy()
+    sys.exit(1 if leaked else 0)
+
+
+if __name__ == "__main__":
+    main()